@@ -0,0 +1,123 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[Benchmark]
+import argparse
+import os
+import sys
+import time
+
+#[Pandas]
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from migration import flatten_channel_document
+from storage import VIDEO_COLUMNS, COMMENT_COLUMNS
+
+
+# ==================================================       /     SYNTHETIC DOCUMENT    /      =================================================== #
+def make_document(video_count: int, comments_per_video: int):
+    """
+    Builds a single channel document shaped like the ones stored by format_channel_data and format_video_data.
+    """
+    channel_data = {"Channel_Details": {"Channel_name": "Bench channel", "Playlist_id": "UUbench"}}
+    for i in range(1, video_count + 1):
+        channel_data[f"Video_ID_{i}"] = {
+            "Video_id": f"video{i}",
+            "Video_name": f"Video {i}",
+            "Description": "A description " * 10,
+            "Thumbnail": f"https://i.ytimg.com/vi/video{i}/default.jpg",
+            "Published_date": "2022-05-01T10:00:00Z",
+            "Duration": 300 + i % 600,
+            "View_count": str(1000 + i),
+            "Like_count": str(10 + i),
+            "Comment_count": str(comments_per_video),
+            "Favorite_count": "0",
+            "Caption_status": "false",
+            "comments": {
+                f"Comment_ID_{j}": {
+                    "Comment_ID": f"comment{i}_{j}",
+                    "Comment_Text": f"Comment {j} on video {i}",
+                    "Comment_Author": f"Author {j}",
+                    "Comment_PublishedAt": "2022-05-02T10:00:00Z"
+                }
+                for j in range(1, comments_per_video + 1)
+            }
+        }
+    return {"_id": "UCbench", "Channel_data": channel_data}
+
+
+# ==================================================       /     LEGACY LOOPS    /      =================================================== #
+def legacy_flatten(document: dict):
+    # The loops the migration used before flatten_channel_document, kept as the baseline
+    list_video = []
+    for i in range(1,len(document['Channel_data'])):
+        video_details_dict = {
+            'Video_Id': document['Channel_data'][f"Video_ID_{i}"]['Video_id'],
+            'Playlist_Id':document['Channel_data']['Channel_Details']['Playlist_id'],
+            'Video_Name': document['Channel_data'][f"Video_ID_{i}"]['Video_name'],
+            'Video_Description': document['Channel_data'][f"Video_ID_{i}"]['Description'],
+            'Published_date': document['Channel_data'][f"Video_ID_{i}"]['Published_date'],
+            'View_Count': document['Channel_data'][f"Video_ID_{i}"]['View_count'],
+            'Like_Count': document['Channel_data'][f"Video_ID_{i}"]['Like_count'],
+            'Favorite_Count': document['Channel_data'][f"Video_ID_{i}"]['Favorite_count'],
+            'Comment_Count': document['Channel_data'][f"Video_ID_{i}"]['Comment_count'],
+            'Duration': document['Channel_data'][f"Video_ID_{i}"]['Duration'],
+            'Thumbnail': document['Channel_data'][f"Video_ID_{i}"]['Thumbnail'],
+            'Caption_Status': document['Channel_data'][f"Video_ID_{i}"]['Caption_status']
+            }
+        list_video.append(video_details_dict)
+    df_video = pd.DataFrame(list_video, columns=VIDEO_COLUMNS)
+
+    list_comment = []
+    for i in range(1,len(document['Channel_data'])):
+        comments_section = document['Channel_data'][f"Video_ID_{i}"]['comments']
+        if len(comments_section) != 0:
+            for j in range(1, len(comments_section)+1):
+                comment_details_dict = {
+                    "Comment_id": document['Channel_data'][f"Video_ID_{i}"]["comments"][f"Comment_ID_{j}"]['Comment_ID'],
+                    "Video_id": document['Channel_data'][f"Video_ID_{i}"]['Video_id'],
+                    "Comment_text": document['Channel_data'][f"Video_ID_{i}"]["comments"][f"Comment_ID_{j}"]['Comment_Text'],
+                    "Comment_author": document['Channel_data'][f"Video_ID_{i}"]["comments"][f"Comment_ID_{j}"]['Comment_Author'],
+                    "Comment_published_date": document['Channel_data'][f"Video_ID_{i}"]["comments"][f"Comment_ID_{j}"]['Comment_PublishedAt']
+                }
+            list_comment.append(comment_details_dict)
+    df_comment = pd.DataFrame(list_comment, columns=COMMENT_COLUMNS)
+    return df_video, df_comment
+
+
+# ==================================================       /     BENCHMARK    /      =================================================== #
+def best_time(function, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start_time)
+    return min(timings), result
+
+
+def main(argv: list = None):
+    """
+    Compares the legacy loops with flatten_channel_document on a synthetic document:
+
+        python benchmarks/bench_flatten.py --videos 10000 --comments 20
+    """
+    parser = argparse.ArgumentParser(description="Benchmark flattening of the single channel document.")
+    parser.add_argument("--videos", type=int, default=10000, help="videos in the synthetic document")
+    parser.add_argument("--comments", type=int, default=20, help="comments per video")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per implementation, the best is reported")
+    args = parser.parse_args(argv)
+
+    document = make_document(args.videos, args.comments)
+    legacy_seconds, (legacy_video, legacy_comment) = best_time(lambda: legacy_flatten(document), args.repeat)
+    columnar_seconds, (df_video, df_comment) = best_time(lambda: flatten_channel_document(document["Channel_data"]), args.repeat)
+
+    pd.testing.assert_frame_equal(legacy_video, df_video)
+    assert len(df_comment) == args.videos * args.comments
+
+    print(f"{args.videos} videos, {args.comments} comments per video, best of {args.repeat}")
+    print(f"  legacy loops:    {legacy_seconds:8.3f}s  {len(legacy_video)} videos, {len(legacy_comment)} comments")
+    print(f"  columnar single: {columnar_seconds:8.3f}s  {len(df_video)} videos, {len(df_comment)} comments")
+    print(f"  speedup:         {legacy_seconds / columnar_seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
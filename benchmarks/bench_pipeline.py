@@ -0,0 +1,303 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[Benchmark]
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from functools import partial
+
+#[Pandas]
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from harvester import Api_key_client, HarvestEngine
+from warehouse import (connect_mysql, create_schema, bulk_load, refresh_channel_summary,
+                       ANALYTICS_QUERIES, PAGINATED_QUERIES, count_query, page_query)
+from telemetry import Telemetry
+from columnar import DuckDBWarehouse, DUCKDB_ANALYTICS_QUERIES, DUCKDB_PAGINATED_QUERIES, export_parquet
+from mock_youtube_api import MockChannelData, MockYouTubeServer
+
+# Scratch database of the warehouse benchmark, dropped and recreated for every size
+BENCH_DATABASE = "youtube_bench_db"
+
+
+# ==================================================       /     HARVEST BENCHMARK    /      =================================================== #
+class CountingCommentWriter:
+    """
+    Stands in for storage.CommentWriter, so the harvest benchmark measures the API side only.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def add(self, comment: dict):
+        self.count += 1
+
+    def mark_done(self, video_id: str):
+        pass
+
+    def flush(self):
+        pass
+
+
+def bench_harvest(videos: int, comments: int, latency: float, error_rate: float, threads: int):
+    """
+    Harvests one synthetic channel from the mock API.
+
+    Returns:
+        tuple: Videos, Comments, Requests, Seconds, Videos/sec and Requests/sec, and the
+            telemetry of the harvest.
+    """
+    server = MockYouTubeServer(MockChannelData(videos, comments), latency=latency, error_rate=error_rate).start()
+    telemetry = Telemetry()
+    try:
+        engine = HarvestEngine(partial(Api_key_client, server.endpoint), max_workers=threads, requests_per_second=0,
+                               backoff_base=0.05, telemetry=telemetry)
+        comment_writer = CountingCommentWriter()
+        start_time = time.perf_counter()
+        fetched_data, missing_video_ids, skipped = engine.harvest("UCbench", comment_writer=comment_writer)
+        seconds = time.perf_counter() - start_time
+    finally:
+        server.stop()
+    return {
+        "Videos": len(fetched_data) - 1,
+        "Comments": comment_writer.count,
+        "Skipped": len(skipped),
+        "Requests": server.request_count,
+        "Seconds": round(seconds, 3),
+        "Videos/sec": round((len(fetched_data) - 1) / seconds, 1),
+        "Requests/sec": round(server.request_count / seconds, 1)
+    }, telemetry
+
+
+# ==================================================       /     WAREHOUSE BENCHMARK    /      =================================================== #
+def synthetic_frames(video_count: int, videos_per_channel: int = 1000, comments_per_video: int = 1, seed: int = 0):
+    """
+    Builds Channel, Playlist, Video and Comment frames of a synthetic warehouse.
+    """
+    rng = np.random.default_rng(seed)
+    channel_count = max(1, video_count // videos_per_channel)
+    channel_ids = np.array([f"UC{number:08d}" for number in range(channel_count)])
+    playlist_ids = np.array([f"UU{number:08d}" for number in range(channel_count)])
+
+    df_channel = pd.DataFrame({
+        "Channel_name": [f"Channel {number}" for number in range(channel_count)],
+        "Channel_id": channel_ids,
+        "Channel_description": "Synthetic channel",
+        "Subscription_count": rng.integers(0, 10**7, channel_count),
+        "Video_count": np.bincount(np.arange(video_count) % channel_count, minlength=channel_count),
+        "View_count": rng.integers(0, 10**9, channel_count)
+    })
+    df_playlist = pd.DataFrame({"Playlist_id": playlist_ids, "Channel_id": channel_ids})
+
+    video_ids = np.array([f"v{number:09d}" for number in range(video_count)])
+    df_video = pd.DataFrame({
+        "Video_Id": video_ids,
+        "Playlist_Id": playlist_ids[np.arange(video_count) % channel_count],
+        "Video_Name": [f"Video {number}" for number in rng.permutation(video_count)],
+        "Video_Description": "Synthetic video",
+        "Published_date": pd.Timestamp("2015-01-01") + pd.to_timedelta(rng.integers(0, 10 * 365 * 86400, video_count), unit="s"),
+        "View_Count": rng.integers(0, 10**7, video_count),
+        "Like_Count": rng.integers(0, 10**5, video_count),
+        "Favorite_Count": 0,
+        "Comment_Count": rng.integers(0, 10**4, video_count),
+        "Duration": rng.integers(10, 7200, video_count),
+        "Thumbnail": "https://i.ytimg.com/vi/default.jpg",
+        "Caption_Status": "false"
+    })
+
+    comment_video_ids = np.repeat(video_ids, comments_per_video)
+    df_comment = pd.DataFrame({
+        "Comment_id": [f"c{number:010d}" for number in range(len(comment_video_ids))],
+        "Video_id": comment_video_ids,
+        "Comment_text": "Synthetic comment",
+        "Comment_author": "Author",
+        "Comment_published_date": pd.Timestamp("2023-01-01")
+    })
+    return df_channel, df_playlist, df_video, df_comment
+
+
+def percentile_ms(timings: list, percent: int):
+    if len(timings) == 1:
+        return round(timings[0] * 1000, 2)
+    return round(statistics.quantiles(timings, n=100)[percent - 1] * 1000, 2)
+
+
+def time_query(cur, sql: str, params: tuple, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        cur.execute(sql, params)
+        cur.fetchall()
+        timings.append(time.perf_counter() - start_time)
+    return timings
+
+
+def time_questions(cur, analytics_queries: dict, paginated_queries: dict, video_count: int, repeat: int,
+                   placeholder: str = "%s"):
+    """
+    Times the ten questions. Paginated questions are timed as the page view runs them:
+    a row count, the first page, and a page from the middle of the result.
+
+    Returns:
+        list: p50/p95 milliseconds of each question.
+    """
+    latency = []
+    for question, sql in analytics_queries.items():
+        timings = time_query(cur, sql, None, repeat)
+        latency.append({"Question": question, "View": "query",
+                        "p50 ms": percentile_ms(timings, 50), "p95 ms": percentile_ms(timings, 95)})
+
+    for question, query in paginated_queries.items():
+        timings = time_query(cur, count_query(query), None, repeat)
+        latency.append({"Question": question, "View": "row count",
+                        "p50 ms": percentile_ms(timings, 50), "p95 ms": percentile_ms(timings, 95)})
+
+        first_sql, first_params = page_query(query, placeholder=placeholder)
+        timings = time_query(cur, first_sql, first_params, repeat)
+        latency.append({"Question": question, "View": "first page",
+                        "p50 ms": percentile_ms(timings, 50), "p95 ms": percentile_ms(timings, 95)})
+
+        # Order keys of the row in the middle of the result
+        key_count = len(query["order_keys"])
+        cur.execute(f"SELECT {', '.join(query['order_keys'])} FROM {query['from']} "
+                    f"ORDER BY {', '.join(query['order_keys'])} LIMIT 1 OFFSET {placeholder}", (video_count // 2,))
+        middle_key = cur.fetchone()
+        if middle_key is not None:
+            middle_sql, middle_params = page_query(query, tuple(middle_key[:key_count]), placeholder=placeholder)
+            timings = time_query(cur, middle_sql, middle_params, repeat)
+            latency.append({"Question": question, "View": "middle page",
+                            "p50 ms": percentile_ms(timings, 50), "p95 ms": percentile_ms(timings, 95)})
+    return sorted(latency, key=lambda row: row["Question"])
+
+
+def bench_warehouse(video_count: int, repeat: int, chunk_size: int, infile_threshold: int):
+    """
+    Loads a synthetic warehouse into a scratch database and times the ten questions.
+
+    Returns:
+        tuple: The bulk_load report of each table, and p50/p95 milliseconds of each question.
+    """
+    myconnection = connect_mysql(database=None)
+    with myconnection.cursor() as cur:
+        cur.execute(f"DROP DATABASE IF EXISTS {BENCH_DATABASE}")
+    myconnection.close()
+    create_schema(BENCH_DATABASE)
+
+    myconnection = connect_mysql(BENCH_DATABASE)
+    try:
+        load_report = []
+        for table, df in zip(["Channel", "Playlist", "Video", "Comment"], synthetic_frames(video_count)):
+            load_report.append(bulk_load(myconnection, table, df, chunk_size=chunk_size, infile_threshold=infile_threshold))
+        refresh_channel_summary(myconnection)
+
+        with myconnection.cursor() as cur:
+            latency = time_questions(cur, ANALYTICS_QUERIES, PAGINATED_QUERIES, video_count, repeat)
+    finally:
+        myconnection.close()
+    return load_report, latency
+
+
+def bench_duckdb(video_count: int, repeat: int):
+    """
+    Writes the same synthetic warehouse as bench_warehouse to a scratch Parquet dataset
+    and times the ten questions on the DuckDB engine.
+
+    Returns:
+        tuple: Export seconds and rows, and p50/p95 milliseconds of each question.
+    """
+    root = tempfile.mkdtemp(prefix="youtube_bench_parquet_")
+    try:
+        start_time = time.perf_counter()
+        rows = export_parquet(root, *synthetic_frames(video_count))
+        seconds = time.perf_counter() - start_time
+        warehouse = DuckDBWarehouse(root)
+        try:
+            with warehouse.cursor() as cur:
+                latency = time_questions(cur, DUCKDB_ANALYTICS_QUERIES, DUCKDB_PAGINATED_QUERIES, video_count, repeat,
+                                         placeholder="?")
+        finally:
+            warehouse.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return {"Table": "Parquet", "Rows": rows, "Seconds": round(seconds, 3),
+            "Rows/sec": round(rows / seconds) if seconds else None}, latency
+
+
+# ==================================================       /     COMMAND LINE    /      =================================================== #
+def main(argv: list = None):
+    """
+    Runs the harvest benchmark against the mock API, and with --mysql and --duckdb the
+    load and query benchmarks on synthetic warehouses:
+
+        python benchmarks/bench_pipeline.py --harvest-videos 2000 --latency 0.02
+        python benchmarks/bench_pipeline.py --mysql --sizes 1000 100000 1000000
+        python benchmarks/bench_pipeline.py --harvest-videos 0 --mysql --duckdb --sizes 100000
+    """
+    parser = argparse.ArgumentParser(description="End-to-end throughput benchmarks on an offline mock API.")
+    parser.add_argument("--harvest-videos", type=int, default=2000, help="videos of the harvested channel, 0 to skip")
+    parser.add_argument("--comments", type=int, default=20, help="comments per video")
+    parser.add_argument("--latency", type=float, default=0.02, help="mean seconds the mock API adds to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of mock API requests failing with 503")
+    parser.add_argument("--threads", type=int, default=8, help="API requests in flight at once")
+    parser.add_argument("--mysql", action="store_true", help=f"also benchmark the warehouse, in the {BENCH_DATABASE} database")
+    parser.add_argument("--duckdb", action="store_true", help="also benchmark the DuckDB engine on a Parquet copy")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1000, 100000, 1000000], help="videos per synthetic warehouse")
+    parser.add_argument("--repeat", type=int, default=20, help="runs of every query")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="rows per executemany call")
+    parser.add_argument("--infile-threshold", type=int, default=100000, help="rows above which LOAD DATA is used")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    if args.harvest_videos:
+        results["harvest"], telemetry = bench_harvest(args.harvest_videos, args.comments, args.latency, args.error_rate,
+                                                      args.threads)
+        results["harvest_stages"] = telemetry.summary()
+        results["harvest_requests"] = telemetry.request_summary()
+        print("Harvest (mock API)")
+        print(pd.DataFrame([results["harvest"]]).to_string(index=False))
+        print("\nHarvest stages, seconds summed over threads")
+        print(pd.DataFrame(results["harvest_stages"]).to_string(index=False))
+        print(pd.DataFrame(results["harvest_requests"]).to_string(index=False))
+
+    if args.mysql:
+        results["warehouse"] = {}
+        for size in args.sizes:
+            load_report, latency = bench_warehouse(size, args.repeat, args.chunk_size, args.infile_threshold)
+            results["warehouse"][size] = {"load": load_report, "queries": latency}
+            print(f"\nWarehouse of {size} videos: load")
+            print(pd.DataFrame(load_report).to_string(index=False))
+            print(f"\nWarehouse of {size} videos: query latency over {args.repeat} runs")
+            print(pd.DataFrame(latency).to_string(index=False))
+
+    if args.duckdb:
+        results["duckdb"] = {}
+        for size in args.sizes:
+            export_report, latency = bench_duckdb(size, args.repeat)
+            results["duckdb"][size] = {"export": export_report, "queries": latency}
+            print(f"\nDuckDB on Parquet, {size} videos: export")
+            print(pd.DataFrame([export_report]).to_string(index=False))
+            print(f"\nDuckDB on Parquet, {size} videos: query latency over {args.repeat} runs")
+            print(pd.DataFrame(latency).to_string(index=False))
+
+            # p50 of both engines side by side
+            if args.mysql:
+                df_compare = pd.DataFrame(results["warehouse"][size]["queries"]).merge(
+                    pd.DataFrame(latency), on=["Question", "View"], suffixes=(" MySQL", " DuckDB"))
+                df_compare["Speedup"] = (df_compare["p50 ms MySQL"] / df_compare["p50 ms DuckDB"]).round(1)
+                print(f"\nMySQL vs DuckDB, {size} videos: p50 ms")
+                print(df_compare[["Question", "View", "p50 ms MySQL", "p50 ms DuckDB", "Speedup"]].to_string(index=False))
+
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump(results, json_file, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[Benchmark]
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from harvester import format_video_data
+from records import VideoRecord, comments_from_response, duration_to_seconds
+
+
+# ==================================================       /     SYNTHETIC RESPONSES    /      =================================================== #
+def api_video_item(number: int):
+    """
+    Builds a videos().list item with every field the API sends for part=snippet,statistics,contentDetails.
+    """
+    video_id = f"v{number:010d}"
+    thumbnails = {size: {"url": f"https://i.ytimg.com/vi/{video_id}/{size}.jpg", "width": width, "height": height}
+                  for size, width, height in [("default", 120, 90), ("medium", 320, 180), ("high", 480, 360),
+                                              ("standard", 640, 480), ("maxres", 1280, 720)]}
+    return {
+        "kind": "youtube#video",
+        "etag": f"etag-{video_id}",
+        "id": video_id,
+        "snippet": {
+            "publishedAt": f"{2015 + number % 10}-{1 + number % 12:02d}-{1 + number % 28:02d}T12:00:00Z",
+            "channelId": "UCbenchbenchbenchbenchbe",
+            "title": f"Benchmark video number {number} with a title of typical length",
+            "description": f"Description of video {number}. " * 8,
+            "thumbnails": thumbnails,
+            "channelTitle": "Benchmark channel",
+            "tags": [f"tag{number % 50}", "benchmark", "youtube", "data"],
+            "categoryId": "22",
+            "liveBroadcastContent": "none",
+            "defaultAudioLanguage": "en",
+            "localized": {"title": f"Benchmark video number {number} with a title of typical length",
+                          "description": f"Description of video {number}. " * 8}
+        },
+        "contentDetails": {"duration": f"PT{number % 60}M{number % 59}S", "dimension": "2d", "definition": "hd",
+                           "caption": "false", "licensedContent": True, "contentRating": {}, "projection": "rectangular"},
+        "statistics": {"viewCount": str(number * 37 % 1000000), "likeCount": str(number * 7 % 50000),
+                       "favoriteCount": "0", "commentCount": str(number % 500)}
+    }
+
+
+def api_comment_thread(video_id: str, number: int):
+    """
+    Builds a commentThreads().list item with every field the API sends for part=snippet.
+    """
+    return {
+        "kind": "youtube#commentThread",
+        "etag": f"etag-{video_id}-{number}",
+        "id": f"{video_id}-c{number}",
+        "snippet": {
+            "channelId": "UCbenchbenchbenchbenchbe",
+            "videoId": video_id,
+            "topLevelComment": {
+                "kind": "youtube#comment",
+                "etag": f"etag-{video_id}-{number}-top",
+                "id": f"{video_id}-c{number}",
+                "snippet": {
+                    "channelId": "UCbenchbenchbenchbenchbe",
+                    "videoId": video_id,
+                    "textDisplay": f"Comment {number} on {video_id}",
+                    "textOriginal": f"Comment {number} on {video_id}",
+                    "authorDisplayName": f"@author{number % 50}",
+                    "authorProfileImageUrl": f"https://yt3.ggpht.com/author{number % 50}=s48-c-k-c0x00ffffff-no-rj",
+                    "authorChannelUrl": f"http://www.youtube.com/@author{number % 50}",
+                    "authorChannelId": {"value": f"UCauthor{number % 50:016d}"},
+                    "canRate": True,
+                    "viewerRating": "none",
+                    "likeCount": number % 10,
+                    "publishedAt": "2023-01-01T00:00:00Z",
+                    "updatedAt": "2023-01-01T00:00:00Z"
+                }
+            },
+            "canReply": True,
+            "totalReplyCount": 0,
+            "isPublic": True
+        }
+    }
+
+
+def response_bodies(video_count: int, comments_per_video: int, batch_size: int = 50):
+    """
+    Serializes the videos().list batches and the first commentThreads().list page of every video,
+    as the harvest receives them.
+
+    Returns:
+        list: (videos().list body, commentThreads().list body of each video) per batch.
+    """
+    bodies = []
+    for start in range(0, video_count, batch_size):
+        items = [api_video_item(number) for number in range(start, min(video_count, start + batch_size))]
+        comment_bodies = [json.dumps({"items": [api_comment_thread(item["id"], number) for number in range(comments_per_video)]})
+                          for item in items]
+        bodies.append((json.dumps({"items": items}), comment_bodies))
+    return bodies
+
+
+# ==================================================       /     REPRESENTATIONS    /      =================================================== #
+def legacy_format_video_data(video_data: list):
+    # The former format_video_data: every count and date kept as the API's string
+    video_stats = {}
+    for i, video in enumerate(video_data):
+        comments = {}
+        if video["comment_threads"] is not None:
+            for index, comment_thread in enumerate(video['comment_threads']['items']):
+                comment = comment_thread['snippet']['topLevelComment']['snippet']
+                comments[f"Comment_ID_{index + 1}"] = {
+                    'Comment_ID': comment_thread['id'],
+                    'Comment_Text': comment['textDisplay'],
+                    'Comment_Author': comment['authorDisplayName'],
+                    'Comment_PublishedAt': comment['publishedAt']
+                }
+        video_stats[f"Video_ID_{i + 1}"] = {
+            "Video_id": video["id"],
+            "Video_name": video["snippet"]["title"],
+            "Description": video['snippet']['description'],
+            "Thumbnail": video["snippet"]["thumbnails"]['default']['url'],
+            "Published_date": video['snippet']['publishedAt'],
+            "Duration": video['contentDetails']['duration'],
+            "View_count": video['statistics']['viewCount'],
+            "Like_count": video['statistics'].get('likeCount'),
+            "Comment_count": video['statistics'].get('commentCount'),
+            "Favorite_count": video['statistics']['favoriteCount'],
+            "Caption_status": video['contentDetails']['caption'],
+            "comments": comments
+        }
+    return video_stats
+
+
+def collect_items(bodies: list):
+    # The former harvest: whole API items kept until the end, with the comment page attached
+    videos = []
+    for video_body, comment_bodies in bodies:
+        items = json.loads(video_body)["items"]
+        for item, comment_body in zip(items, comment_bodies):
+            item['contentDetails']['duration'] = duration_to_seconds(item['contentDetails']['duration'])
+            item['comment_threads'] = json.loads(comment_body)
+        videos.extend(items)
+    return videos
+
+
+def collect_records(bodies: list):
+    # Each item is parsed into a VideoRecord as its batch arrives, and the batch is dropped
+    videos = []
+    for video_body, comment_bodies in bodies:
+        for item, comment_body in zip(json.loads(video_body)["items"], comment_bodies):
+            video = VideoRecord.from_api(item)
+            video.comments = comments_from_response(video.video_id, json.loads(comment_body))
+            videos.append(video)
+    return videos
+
+
+# ==================================================       /     BENCHMARK    /      =================================================== #
+def measure(collect, format_videos, bodies: list):
+    """
+    Collects the videos, then formats them into the stored "Video_ID_{i}" entries.
+
+    Returns:
+        dict: MB held once every video is collected, peak MB over collecting and formatting,
+            and seconds of both.
+    """
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    videos = collect(bodies)
+    held, _ = tracemalloc.get_traced_memory()
+    video_stats = format_videos(videos)
+    seconds = time.perf_counter() - start_time
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(video_stats) == len(videos)
+    return {"Held MB": held / 2**20, "Peak MB": peak / 2**20, "Seconds": seconds}
+
+
+def main(argv: list = None):
+    """
+    Compares the memory of harvested videos kept as API items and as VideoRecord, on
+    synthetic responses shaped like the API's:
+
+        python benchmarks/bench_records.py --videos 10000 --comments 20
+    """
+    parser = argparse.ArgumentParser(description="Benchmark memory of harvested video records.")
+    parser.add_argument("--videos", type=int, default=10000, help="videos harvested")
+    parser.add_argument("--comments", type=int, default=20, help="comments on the first page of every video")
+    args = parser.parse_args(argv)
+
+    bodies = response_bodies(args.videos, args.comments)
+    scale = 10000 / args.videos
+    results = {
+        "API items": measure(collect_items, legacy_format_video_data, bodies),
+        "VideoRecord": measure(collect_records, format_video_data, bodies)
+    }
+
+    print(f"{args.videos} videos, {args.comments} comments per video, MB scaled to 10k videos")
+    for name, result in results.items():
+        print(f"  {name:12} held {result['Held MB'] * scale:8.1f} MB  peak {result['Peak MB'] * scale:8.1f} MB  "
+              f"{result['Seconds']:6.2f}s")
+    print(f"  held memory:  {results['API items']['Held MB'] / results['VideoRecord']['Held MB']:8.1f}x smaller")
+    print(f"  peak memory:  {results['API items']['Peak MB'] / results['VideoRecord']['Peak MB']:8.1f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[Server]
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+# ==================================================       /     SYNTHETIC DATA    /      =================================================== #
+class MockChannelData:
+    """
+    Deterministic synthetic channels, shaped like the YouTube Data API v3 responses
+    the harvester reads. Any channel id is accepted except ids containing "invalid";
+    the handle or username "name" belongs to the channel "UCname".
+
+    Args:
+        videos_per_channel (int): Videos of a channel without an entry in channel_sizes.
+        comments_per_video (int): Top-level comments of every video.
+        channel_sizes (dict): Video count of single channels, keyed by channel id.
+        missing_every (int): Every n-th video is deleted (left out of videos().list), 0 for none.
+        comments_disabled_every (int): Every n-th video has comments disabled, 0 for none.
+    """
+
+    def __init__(self, videos_per_channel: int = 200, comments_per_video: int = 20, channel_sizes: dict = None,
+                 missing_every: int = 0, comments_disabled_every: int = 0):
+        self.videos_per_channel = videos_per_channel
+        self.comments_per_video = comments_per_video
+        self.channel_sizes = channel_sizes or {}
+        self.missing_every = missing_every
+        self.comments_disabled_every = comments_disabled_every
+
+    def video_count(self, channel_id: str):
+        return self.channel_sizes.get(channel_id, self.videos_per_channel)
+
+    @staticmethod
+    def video_number(video_id: str):
+        return int(video_id.rsplit("-", 1)[1])
+
+    def channel(self, channel_id: str):
+        return {
+            "id": channel_id,
+            "snippet": {"title": f"Mock channel {channel_id}", "description": f"Synthetic channel {channel_id}",
+                        "localized": {"title": f"Mock channel {channel_id}", "description": f"Synthetic channel {channel_id}"}},
+            "contentDetails": {"relatedPlaylists": {"uploads": f"UU{channel_id}"}},
+            "statistics": {"subscriberCount": "1000", "videoCount": str(self.video_count(channel_id)),
+                           "viewCount": str(1000 * self.video_count(channel_id))}
+        }
+
+    def video(self, video_id: str):
+        number = self.video_number(video_id)
+        return {
+            "id": video_id,
+            "snippet": {
+                "title": f"Mock video {number}",
+                "description": f"Synthetic video {video_id}",
+                "publishedAt": f"{2015 + number % 10}-{1 + number % 12:02d}-{1 + number % 28:02d}T12:00:00Z",
+                "thumbnails": {"default": {"url": f"https://i.ytimg.com/vi/{video_id}/default.jpg"}}
+            },
+            "contentDetails": {"duration": f"PT{number % 60}M{number % 59}S", "caption": "false"},
+            "statistics": {"viewCount": str(number * 37 % 100000), "likeCount": str(number * 7 % 5000),
+                           "favoriteCount": "0", "commentCount": str(self.comments_per_video)}
+        }
+
+    def comment(self, video_id: str, number: int):
+        return {
+            "id": f"{video_id}-c{number}",
+            "snippet": {"topLevelComment": {"snippet": {
+                "textDisplay": f"Comment {number} on {video_id}",
+                "authorDisplayName": f"Author {number % 50}",
+                "publishedAt": "2023-01-01T00:00:00Z"
+            }}}
+        }
+
+    def is_missing(self, video_id: str):
+        return bool(self.missing_every) and self.video_number(video_id) % self.missing_every == self.missing_every - 1
+
+    def comments_disabled(self, video_id: str):
+        return bool(self.comments_disabled_every) and self.video_number(video_id) % self.comments_disabled_every == 0
+
+
+# ==================================================       /     HTTP SERVER    /      =================================================== #
+def _page(make_item, total: int, params: dict, max_results_cap: int):
+    # Offset pagination, the page token is the offset of the page. Only the items of the page are built.
+    start = int(params.get("pageToken", "0") or 0)
+    max_results = min(int(params.get("maxResults", "5")), max_results_cap)
+    response = {"items": [make_item(number) for number in range(start, min(total, start + max_results))],
+                "pageInfo": {"totalResults": total}}
+    if start + max_results < total:
+        response["nextPageToken"] = str(start + max_results)
+    return response
+
+
+class MockYouTubeHandler(BaseHTTPRequestHandler):
+    """
+    Serves /youtube/v3/channels, playlistItems, videos and commentThreads from the server's MockChannelData.
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status: int, reason: str):
+        self._send_json(status, {"error": {"code": status, "message": reason, "errors": [{"reason": reason}]}})
+
+    def do_GET(self):
+        server = self.server
+        server.count_request()
+        if server.latency:
+            time.sleep(server.latency * random.uniform(0.5, 1.5))
+        if server.error_rate and random.random() < server.error_rate:
+            return self._send_error(503, "backendError")
+
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        resource = url.path.rstrip("/").rsplit("/", 1)[-1]
+        data = server.data
+
+        if resource == "channels":
+            if "forHandle" in params or "forUsername" in params:
+                ids = ["UC" + params.get("forHandle", params.get("forUsername", "")).lstrip("@")]
+            else:
+                ids = [channel_id for channel_id in params.get("id", "").split(",") if channel_id][:50]
+            body = {"items": [data.channel(channel_id) for channel_id in ids if "invalid" not in channel_id]}
+        elif resource == "playlistItems":
+            channel_id = params["playlistId"][2:]
+            body = _page(lambda number: {"contentDetails": {"videoId": f"{channel_id}-{number}"}},
+                         data.video_count(channel_id), params, 50)
+        elif resource == "videos":
+            ids = params.get("id", "").split(",")
+            body = {"items": [data.video(video_id) for video_id in ids if video_id and not data.is_missing(video_id)]}
+        elif resource == "commentThreads":
+            video_id = params["videoId"]
+            if data.comments_disabled(video_id):
+                return self._send_error(403, "commentsDisabled")
+            body = _page(lambda number: data.comment(video_id, number), data.comments_per_video, params, 100)
+        else:
+            return self._send_error(404, "notFound")
+
+        # ETag of the body, a matching If-None-Match is answered with 304
+        body["etag"] = hashlib.md5(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()
+        if self.headers.get("If-None-Match") == body["etag"]:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self._send_json(200, body)
+
+
+class MockYouTubeServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the YouTube Data API endpoints the harvester uses, for
+    benchmarks that must not spend real quota. Point Api_key_client at it with
+    api_endpoint=server.endpoint.
+
+    Args:
+        data (MockChannelData): Channels served.
+        latency (float): Mean seconds added to every response, varied by +/-50%.
+        error_rate (float): Share of requests answered with 503 backendError.
+        port (int): Port to listen on, 0 for any free port.
+    """
+    daemon_threads = True
+
+    def __init__(self, data: MockChannelData = None, latency: float = 0.0, error_rate: float = 0.0, port: int = 0):
+        super().__init__(("127.0.0.1", port), MockYouTubeHandler)
+        self.data = data or MockChannelData()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.request_count = 0
+        self.lock = threading.Lock()
+        self.thread = None
+
+    @property
+    def endpoint(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count_request(self):
+        with self.lock:
+            self.request_count += 1
+
+    def start(self):
+        """
+        Serves in a background thread.
+        """
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+# ==================================================       /     COMMAND LINE    /      =================================================== #
+def main(argv: list = None):
+    """
+    Runs the mock API in the foreground:
+
+        python benchmarks/mock_youtube_api.py --port 8765 --videos 5000 --latency 0.05 --error-rate 0.01
+    """
+    parser = argparse.ArgumentParser(description="Offline mock of the YouTube Data API v3.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--videos", type=int, default=200, help="videos per channel")
+    parser.add_argument("--comments", type=int, default=20, help="comments per video")
+    parser.add_argument("--latency", type=float, default=0.0, help="mean seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failing with 503")
+    parser.add_argument("--missing-every", type=int, default=0, help="every n-th video is deleted")
+    parser.add_argument("--comments-disabled-every", type=int, default=0, help="every n-th video has comments disabled")
+    args = parser.parse_args(argv)
+
+    data = MockChannelData(args.videos, args.comments, missing_every=args.missing_every,
+                           comments_disabled_every=args.comments_disabled_every)
+    server = MockYouTubeServer(data, args.latency, args.error_rate, args.port)
+    print(f"Mock YouTube API on {server.endpoint}, use Api_key_client(api_endpoint=\"{server.endpoint}\")")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[Concurrency]
+import threading
+
+#[Records]
+from records import VideoRecord
+
+
+# ==================================================       /     HARVEST CHECKPOINT    /      =================================================== #
+class HarvestCheckpoint:
+    """
+    Saves the progress of a channel harvest to MongoDB so that an interrupted job
+    resumes from its last finished stage instead of calling the API again.
+
+    Progress is kept as small documents in a checkpoint collection, all tagged with
+    the channel id:
+        - "<channel_id>:channel": the channels().list response.
+        - "<channel_id>:playlist": the playlist pages read so far and the next page token.
+        - "<channel_id>:batch:<n>": the videos of the n-th playlist page, as VideoRecord documents.
+        - "<channel_id>:comments:<video_id>": the first comment page of a video.
+        - "<channel_id>:comments_done": videos whose streamed comments are all written.
+
+    Args:
+        collection (Collection): MongoDB collection to store checkpoints in.
+        channel_id (str): Unique Youtube channel id of the job.
+    """
+
+    def __init__(self, collection, channel_id: str):
+        self.collection = collection
+        self.channel_id = channel_id
+        self.lock = threading.Lock()
+        self.load()
+
+    def _key(self, *parts):
+        return ":".join([self.channel_id, *map(str, parts)])
+
+    def load(self):
+        """
+        Reads every saved stage of the channel into memory.
+        """
+        self.channel_data = None
+        self.playlist = {"pages": [], "next_page_token": None, "complete": False}
+        self.video_batches = {}
+        self.comments = {}
+        self.comment_videos_done = set()
+
+        for doc in self.collection.find({"channel_id": self.channel_id}):
+            stage = doc["stage"]
+            if stage == "channel":
+                self.channel_data = doc["data"]
+            elif stage == "playlist":
+                self.playlist = {key: doc[key] for key in ("pages", "next_page_token", "complete")}
+            elif stage == "batch":
+                videos = [VideoRecord.from_document(video) for video in doc["videos"]]
+                self.video_batches[doc["index"]] = (videos, doc["missing"])
+            elif stage == "comments":
+                self.comments[doc["video_id"]] = doc["data"]
+            elif stage == "comments_done":
+                self.comment_videos_done.update(doc["video_ids"])
+
+    def has_progress(self):
+        """
+        Returns:
+            bool: True if an earlier run of this channel left saved progress.
+        """
+        return self.channel_data is not None
+
+    def _save(self, key: str, stage: str, fields: dict):
+        self.collection.replace_one(
+            {"_id": key},
+            {"channel_id": self.channel_id, "stage": stage, **fields},
+            upsert = True)
+
+    def save_channel(self, channel_data: dict):
+        self.channel_data = channel_data
+        self._save(self._key("channel"), "channel", {"data": channel_data})
+
+    def save_playlist_page(self, video_ids: list, next_page_token):
+        """
+        Appends a playlist page and moves the pagination cursor past it.
+
+        Args:
+            video_ids (list): Video ids of the page.
+            next_page_token (str): Token of the following page, None on the last page.
+        """
+        self.playlist["pages"].append(video_ids)
+        self.playlist["next_page_token"] = next_page_token
+        self.playlist["complete"] = next_page_token is None
+        self._save(self._key("playlist"), "playlist", self.playlist)
+
+    def save_video_batch(self, index: int, videos: list, missing_video_ids: list):
+        with self.lock:
+            self.video_batches[index] = (videos, missing_video_ids)
+        self._save(self._key("batch", index), "batch",
+                   {"index": index, "videos": [video.to_document() for video in videos], "missing": missing_video_ids})
+
+    def save_comments(self, video_id: str, comment_response: dict):
+        with self.lock:
+            self.comments[video_id] = comment_response
+        self._save(self._key("comments", video_id), "comments",
+                   {"video_id": video_id, "data": comment_response})
+
+    def save_comment_videos_done(self, video_ids: list):
+        """
+        Records videos whose streamed comments are all written to storage.
+
+        Args:
+            video_ids (list): Video ids to record.
+        """
+        with self.lock:
+            self.comment_videos_done.update(video_ids)
+        self.collection.update_one(
+            {"_id": self._key("comments_done")},
+            {"$set": {"channel_id": self.channel_id, "stage": "comments_done"},
+             "$addToSet": {"video_ids": {"$each": list(video_ids)}}},
+            upsert = True)
+
+    def clear(self):
+        """
+        Removes the saved progress once the channel is stored in full.
+        """
+        self.collection.delete_many({"channel_id": self.channel_id})
+        self.load()
@@ -0,0 +1,317 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[Pandas]
+import pandas as pd
+
+#[Columnar]
+# Optional: without pyarrow no Parquet files are written, without duckdb the DuckDB engine is unavailable
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as pa_dataset
+except ImportError:
+    pa = None
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+#[Files]
+import csv
+import logging
+import os
+import shutil
+import threading
+import uuid
+
+
+# ==================================================       /     PARQUET EXPORT    /      =================================================== #
+# Columns and Arrow types of each exported table. Channel_id and Year are partition
+# columns, stored in the folder names: <table>/Channel_id=<id>/Year=<year>/part-0.parquet
+PARQUET_TABLES = {
+    "channel": {
+        "Channel_id": "string",
+        "Channel_name": "string",
+        "Channel_description": "string",
+        "Subscription_count": "int64",
+        "Video_count": "int64",
+        "View_count": "int64",
+        "Playlist_id": "string"
+    },
+    "video": {
+        "Channel_id": "string",
+        "Year": "int64",
+        "Video_Id": "string",
+        "Playlist_Id": "string",
+        "Video_Name": "string",
+        "Video_Description": "string",
+        "Published_date": "timestamp[us]",
+        "View_Count": "int64",
+        "Like_Count": "int64",
+        "Favorite_Count": "int64",
+        "Comment_Count": "int64",
+        "Duration": "int64",
+        "Thumbnail": "string",
+        "Caption_Status": "string"
+    },
+    "comment": {
+        "Channel_id": "string",
+        "Year": "int64",
+        "Comment_id": "string",
+        "Video_id": "string",
+        "Comment_text": "string",
+        "Comment_author": "string",
+        "Comment_published_date": "timestamp[us]"
+    }
+}
+
+# Tables the DuckDB engine loads into memory, the others are read from the files by every query
+DUCKDB_LOADED_TABLES = ["channel", "video"]
+
+# Partition columns of each exported table
+PARQUET_PARTITIONS = {
+    "channel": ["Channel_id"],
+    "video": ["Channel_id", "Year"],
+    "comment": ["Channel_id", "Year"]
+}
+
+
+# Folder pyarrow writes rows with a null partition value to
+HIVE_DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+logger = logging.getLogger(__name__)
+
+
+def parquet_available():
+    return pa is not None
+
+
+def _arrow_table(table: str, df: pd.DataFrame):
+    # Casts the frame to the table's fixed schema, so the files of every channel read back alike
+    columns = PARQUET_TABLES[table]
+    df = df.reindex(columns=list(columns))
+    for column, type_name in columns.items():
+        if type_name == "int64":
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype("Int64")
+        elif type_name == "string":
+            df[column] = df[column].astype(object).where(df[column].notna(), None)
+            df[column] = df[column].map(lambda value: value if value is None else str(value))
+    schema = pa.schema([(column, pa.type_for_alias(type_name)) for column, type_name in columns.items()])
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+
+def export_parquet(root: str, df_channel: pd.DataFrame, df_playlist: pd.DataFrame, df_video: pd.DataFrame,
+                   df_comment: pd.DataFrame):
+    """
+    Writes the warehouse frames of one or more channels as Parquet files partitioned
+    by channel, and videos and comments also by publish year. The partitions of each
+    channel in df_channel are replaced as a whole, so a channel migrated again leaves
+    no files of an earlier migration behind. Videos and comments without a partition
+    value (no channel, or no publish date) are dropped and counted in a warning, since
+    they would land in a shared default partition that no channel swap replaces.
+
+    Args:
+        root (str): Folder of the Parquet dataset.
+        df_channel (DataFrame): Channel rows, see migration.read_channel_frames.
+        df_playlist (DataFrame): Playlist rows of the channels.
+        df_video (DataFrame): Video rows of the channels.
+        df_comment (DataFrame): Comment rows of the channels.
+
+    Returns:
+        int: Number of video and comment rows written.
+    """
+    if pa is None:
+        raise RuntimeError("Parquet export needs the pyarrow package")
+
+    channel_ids = df_channel["Channel_id"].astype(str).tolist()
+    channel_by_playlist = dict(zip(df_playlist["Playlist_id"], df_playlist["Channel_id"]))
+    channel_by_video = dict(zip(df_video["Video_Id"], df_video["Playlist_Id"].map(channel_by_playlist)))
+
+    frames = {
+        "channel": df_channel.merge(df_playlist, on="Channel_id", how="left"),
+        "video": df_video.assign(
+            Channel_id=df_video["Playlist_Id"].map(channel_by_playlist),
+            Year=pd.to_datetime(df_video["Published_date"]).dt.year),
+        "comment": df_comment.assign(
+            Channel_id=df_comment["Video_id"].map(channel_by_video),
+            Year=pd.to_datetime(df_comment["Comment_published_date"]).dt.year)
+    }
+    for table in ["video", "comment"]:
+        df = frames[table]
+        partitioned = df[PARQUET_PARTITIONS[table]].notna().all(axis=1)
+        if not partitioned.all():
+            logger.warning("Parquet export drops %d %s row(s) without a channel or publish year",
+                           (~partitioned).sum(), table)
+            frames[table] = df[partitioned]
+
+    # Every table is written to a staging folder first, then swapped in channel by channel
+    staging = os.path.join(root, ".staging", uuid.uuid4().hex)
+    try:
+        for table, df in frames.items():
+            # Sorted by partition, each partition is written as one file
+            partitions = PARQUET_PARTITIONS[table]
+            df = df.sort_values(partitions)
+            pa_dataset.write_dataset(_arrow_table(table, df), os.path.join(staging, table), format="parquet",
+                                     partitioning=partitions, partitioning_flavor="hive",
+                                     max_partitions=max(1024, len(df[partitions].drop_duplicates())))
+        for table in frames:
+            os.makedirs(os.path.join(root, table), exist_ok=True)
+            # Written by exports that kept rows without a channel, nothing replaces it
+            default_partition = os.path.join(root, table, f"Channel_id={HIVE_DEFAULT_PARTITION}")
+            if os.path.exists(default_partition):
+                os.rename(default_partition, os.path.join(staging, f"old-{table}-default"))
+            for channel_id in channel_ids:
+                partition = f"Channel_id={channel_id}"
+                target = os.path.join(root, table, partition)
+                if os.path.exists(target):
+                    os.rename(target, os.path.join(staging, f"old-{table}-{partition}"))
+                if os.path.exists(os.path.join(staging, table, partition)):
+                    os.rename(os.path.join(staging, table, partition), target)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return len(frames["video"]) + len(frames["comment"])
+
+
+# ==================================================       /     DUCKDB ANALYTICS    /      =================================================== #
+# The questions of warehouse.ANALYTICS_QUERIES on the Parquet dataset. Videos carry their
+# Channel_id, so no Playlist join is needed, per-channel aggregates are computed by the
+# scan instead of read from Channel_summary, and question 8 filters on the Year partition column.
+DUCKDB_ANALYTICS_QUERIES = {
+    2: "SELECT Channel_name, Video_count FROM Channel WHERE Video_count IN (SELECT MAX(Video_count) FROM Channel)",
+    3: """SELECT T3.Channel_name, T1.Video_Name, T1.View_Count FROM Video AS T1
+           INNER JOIN Channel AS T3 ON T1.Channel_id = T3.Channel_id
+           ORDER BY T1.View_Count DESC LIMIT 10""",
+    5: """SELECT T3.Channel_name, T1.Video_Name, T1.Like_Count FROM Video AS T1
+           INNER JOIN (SELECT Channel_id, MAX(Like_Count) AS Max_like_count FROM Video GROUP BY Channel_id) AS T2
+                   ON T1.Channel_id = T2.Channel_id AND T1.Like_Count = T2.Max_like_count
+           INNER JOIN Channel AS T3 ON T1.Channel_id = T3.Channel_id
+           ORDER BY T1.Like_Count DESC""",
+    7: "SELECT Channel_name, View_count FROM Channel",
+    8: """SELECT T3.Channel_name as Channel_names, T1.Video_Name, T1.Published_date FROM Video AS T1
+           INNER JOIN Channel AS T3 ON T1.Channel_id = T3.Channel_id
+           WHERE T1.Year = 2022""",
+    9: """SELECT T3.Channel_name, CAST(to_seconds(CAST(floor(AVG(T1.Duration)) AS BIGINT)) AS VARCHAR) AS Duration FROM Video AS T1
+           INNER JOIN Channel AS T3 ON T1.Channel_id = T3.Channel_id
+           GROUP BY T3.Channel_id, T3.Channel_name
+           ORDER BY Duration""",
+    10: """SELECT T3.Channel_name, T1.Video_Name, T1.Comment_Count FROM Video AS T1
+           INNER JOIN (SELECT Channel_id, MAX(Comment_Count) AS Max_comment_count FROM Video GROUP BY Channel_id) AS T2
+                   ON T1.Channel_id = T2.Channel_id AND T1.Comment_Count = T2.Max_comment_count
+           INNER JOIN Channel AS T3 ON T1.Channel_id = T3.Channel_id
+           ORDER BY T1.Comment_Count DESC"""
+}
+
+# The questions of warehouse.PAGINATED_QUERIES on the Parquet dataset, read with
+# warehouse.page_query(..., placeholder="?"), in the same order. DuckDB has no such
+# indexes and sorts the scanned rows for every page
+DUCKDB_PAGINATED_QUERIES = {
+    1: {
+        "fields": "T3.Channel_name, T1.Video_Name",
+        "from": "Video AS T1 INNER JOIN Channel AS T3 ON T1.Channel_id = T3.Channel_id",
+        "order_keys": ["T1.Playlist_Id", "T1.Video_Name", "T1.Video_Id"]
+    },
+    4: {
+        "fields": "T3.Channel_name, T1.Video_Name, T1.Comment_Count",
+        "from": "Video AS T1 INNER JOIN Channel AS T3 ON T1.Channel_id = T3.Channel_id",
+        "order_keys": ["T1.Playlist_Id", "T1.Video_Name", "T1.Video_Id"]
+    },
+    6: {
+        "fields": "Video_Name, Like_Count",
+        "from": "Video",
+        "order_keys": ["Video_Name", "Video_Id"]
+    }
+}
+
+
+def duckdb_available():
+    return duckdb is not None
+
+
+class DuckDBWarehouse:
+    """
+    Embedded DuckDB engine answering the analytics questions from the Parquet dataset
+    written by export_parquet, with no server to run.
+
+    A channel and year partition is one small file, and opening thousands of them
+    costs more than the questions themselves, so the Channel and Video tables are
+    loaded into DuckDB's in-memory columnar tables and loaded again only when a
+    migration changes the dataset, see version. Comment stays a view reading the files.
+
+    Args:
+        root (str): Folder of the Parquet dataset.
+    """
+
+    def __init__(self, root: str):
+        if duckdb is None:
+            raise RuntimeError("The DuckDB engine needs the duckdb package")
+        self.root = root
+        self.connection = duckdb.connect()
+        self.lock = threading.Lock()
+        self.loaded_version = None
+
+    def has_data(self):
+        """
+        Returns:
+            bool: True once a channel has been exported.
+        """
+        return os.path.isdir(os.path.join(self.root, "channel")) and any(
+            name.startswith("Channel_id=") for name in os.listdir(os.path.join(self.root, "channel")))
+
+    def refresh(self):
+        """
+        Loads the tables again if the dataset changed since they were loaded.
+        Queries running meanwhile keep reading the previous tables.
+        """
+        with self.lock:
+            version = self.version()
+            if version == self.loaded_version:
+                return
+            for table in PARQUET_TABLES:
+                table_dir = os.path.join(self.root, table)
+                # Reading a table without files fails, such tables are left out until a channel is exported
+                if not os.path.isdir(table_dir) or not any(name.startswith("Channel_id=") for name in os.listdir(table_dir)):
+                    continue
+                path = os.path.join(table_dir, "**", "*.parquet").replace("'", "''")
+                kind = "TABLE" if table in DUCKDB_LOADED_TABLES else "VIEW"
+                self.connection.execute(f"""CREATE OR REPLACE {kind} {table.capitalize()} AS
+                                            SELECT * FROM read_parquet('{path}', hive_partitioning = true, union_by_name = true)""")
+            self.loaded_version = version
+
+    def cursor(self):
+        """
+        Returns:
+            DuckDBPyConnection: A cursor of its own for the calling thread, usable as a
+                context manager, with execute and fetchall like a pymysql cursor.
+        """
+        self.refresh()
+        return self.connection.cursor()
+
+    def version(self):
+        """
+        Returns:
+            int: Changes whenever a channel's partitions are swapped in, see warehouse.warehouse_version.
+        """
+        versions = [os.stat(os.path.join(self.root, table)).st_mtime_ns for table in PARQUET_TABLES
+                    if os.path.isdir(os.path.join(self.root, table))]
+        return max(versions, default=0)
+
+    def export_csv(self, sql: str, path: str, columns: list, params: tuple = None, chunk_size: int = 10000):
+        """
+        Streams the result of a query to a CSV file chunk by chunk, see warehouse.export_query_csv.
+
+        Returns:
+            int: Number of rows written.
+        """
+        row_count = 0
+        with open(path, "w", encoding="utf-8", newline="") as csv_file, self.cursor() as cur:
+            writer = csv.writer(csv_file)
+            writer.writerow(columns)
+            cur.execute(sql, params)
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                writer.writerows(rows)
+                row_count += len(rows)
+        return row_count
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,996 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[API]
+import googleapiclient.discovery
+import googleapiclient.errors
+import httplib2
+import json
+
+#[Concurrency]
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+#[Format dtype]
+import re
+from records import ChannelRecord, CommentRecord, VideoRecord, comments_from_response, parse_video_statistics
+
+#[Quota]
+from quota import QuotaExhausted, QuotaLedger
+
+#[Cache]
+from contextlib import contextmanager
+from http_cache import ResponseCache
+
+#[Telemetry]
+from telemetry import TELEMETRY, Telemetry
+
+
+# ==================================================       /     API CLIENT    /      =================================================== #
+def Api_key_client(api_endpoint: str = None):
+    """
+    Creates a client object for interacting with an API using an API key.
+
+    Args:
+        api_endpoint (str): Base URL of the API, None for YouTube itself. Benchmarks
+            point it at benchmarks/mock_youtube_api.py.
+
+    Returns:
+        object: An object representing the API client
+    """
+    api_key = "YOUR-API-KEY"
+    api_service_name = "youtube"
+    api_version = "v3"
+    # The discovery document bundled with the library is used, it is not downloaded
+    client_options = {"api_endpoint": api_endpoint} if api_endpoint else None
+    youtube = googleapiclient.discovery.build(api_service_name, api_version, developerKey=api_key, static_discovery=True,
+                                              client_options=client_options)
+    return youtube
+
+
+# HTTP statuses and 403 reasons of transient errors worth retrying
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+RETRYABLE_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "backendError"}
+
+# 403 reasons meaning a video has no readable comments
+COMMENTS_UNAVAILABLE_REASONS = {"commentsDisabled", "forbidden"}
+
+
+def http_error_reason(error: Exception):
+    """
+    Returns:
+        str: The reason of an API HttpError, e.g. "quotaExceeded", or None.
+    """
+    if not isinstance(error, googleapiclient.errors.HttpError):
+        return None
+    try:
+        return json.loads(error.content.decode("utf-8"))["error"]["errors"][0]["reason"]
+    except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+        return None
+
+
+def is_retryable(error: Exception):
+    """
+    Tells transient failures (server errors, rate limiting, dropped connections)
+    from errors that fail the same way again, like a used-up daily quota.
+
+    Returns:
+        bool: True if the request should be sent again.
+    """
+    if isinstance(error, googleapiclient.errors.HttpError):
+        status = error.resp.status
+        return status in RETRYABLE_STATUSES or (status == 403 and http_error_reason(error) in RETRYABLE_REASONS)
+    return isinstance(error, (OSError, httplib2.HttpLib2Error))
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 32.0):
+    """
+    Exponential backoff with full jitter, so threads failing together do not retry together.
+
+    Args:
+        attempt (int): Number of failed attempts so far, starting at 0.
+        base (float): Delay ceiling of the first retry in seconds.
+        cap (float): Largest delay ceiling in seconds.
+
+    Returns:
+        float: Seconds to wait before the next attempt.
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def skipped_video(video_id: str, stage: str, error: Exception):
+    """
+    Returns:
+        dict: Report entry of a video left out of a harvest: Video_id, Stage
+            ("videos", "comments" or "statistics") and Error.
+    """
+    return {"Video_id": video_id, "Stage": stage, "Error": f"{type(error).__name__}: {error}"}
+
+
+class RateLimiter:
+    """
+    Spaces out requests so that all worker threads together send at most
+    `requests_per_second` requests to the API.
+    """
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+
+    def wait(self):
+        """
+        Blocks the calling thread until its request slot is due.
+        """
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class CommentBudget:
+    """
+    Caps the number of comments collected across all videos of a harvest.
+
+    Args:
+        limit (int): Maximum number of comments, None for no cap.
+    """
+
+    def __init__(self, limit: int = None):
+        self.remaining = limit
+        self.lock = threading.Lock()
+
+    def take(self):
+        """
+        Returns:
+            bool: True if one more comment may be collected.
+        """
+        if self.remaining is None:
+            return True
+        with self.lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+
+class HarvestProgress:
+    """
+    Counts the videos and comments of a running harvest, so that another thread can
+    report its progress while the harvest goes on.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.total_videos = None
+        self.videos = 0
+        self.comments = 0
+
+    def set_total(self, total_videos: int):
+        with self.lock:
+            self.total_videos = total_videos
+
+    def add_videos(self, count: int = 1):
+        with self.lock:
+            self.videos += count
+
+    def add_comments(self, count: int = 1):
+        with self.lock:
+            self.comments += count
+
+    def report(self):
+        """
+        Returns:
+            dict: Videos fetched, Total videos (None until the channel is read), Comments,
+                Seconds since the start and ETA seconds (None until the first video is done).
+        """
+        with self.lock:
+            seconds = time.time() - self.started_at
+            eta = None
+            if self.total_videos is not None and self.videos:
+                eta = round(seconds / self.videos * max(0, self.total_videos - self.videos))
+            return {"Videos": self.videos, "Total videos": self.total_videos, "Comments": self.comments,
+                    "Seconds": round(seconds), "ETA seconds": eta}
+
+
+# ==================================================       /     DATA FORMATTING    /      =================================================== #
+def format_channel_data(channel_id: str, channel_data: dict):
+    """
+    Extracts neccessary info from channel response.
+
+    Args:
+        channel_id (str): Unique Youtube channel id.
+        channel_data (dict): Response of channels().list for the channel.
+
+    Returns:
+        dict: Channel details keyed by "Channel_Details", counts parsed to int.
+    """
+    return {"Channel_Details": ChannelRecord.from_api(channel_id, channel_data["items"][0]).to_document()}
+
+
+def format_video_data(video_data: list, start: int = 1):
+    """
+    Formats video data with comments.
+
+    Args:
+        video_data (list): VideoRecord of each video, with its comments attached.
+        start (int): Number of the first "Video_ID_{i}" key.
+
+    Returns:
+        dict: Video details keyed "Video_ID_{start}".."Video_ID_{start + N - 1}".
+    """
+    return {f"Video_ID_{i + start}": video.to_document() for i, video in enumerate(video_data)}
+
+
+# ==================================================       /     CHANNEL REFERENCES    /      =================================================== #
+# A channel id, "UC" followed by 22 characters
+CHANNEL_ID_PATTERN = re.compile(r"^UC[\w-]{22}$")
+
+# Channel URLs: youtube.com/channel/<id>, youtube.com/user/<username>, youtube.com/c/<name> and youtube.com/@<handle>
+CHANNEL_URL_PATTERN = re.compile(r"^(?:https?://)?(?:www\.|m\.)?youtube\.com/(channel/|user/|c/)?([^/?#]+)")
+
+
+def parse_channel_reference(reference: str):
+    """
+    Tells how to look up a channel given by a user, as a channel id, a handle
+    ("@name"), a legacy username or a channel URL of any of them.
+
+    Args:
+        reference (str): The channel as given by the user.
+
+    Returns:
+        tuple: Kind ("id", "handle" or "username") and the value to look up.
+    """
+    reference = reference.strip()
+    match = CHANNEL_URL_PATTERN.match(reference)
+    if match:
+        prefix, reference = match.groups()
+        if prefix == "user/":
+            return "username", reference
+        if prefix == "c/":
+            # Custom URLs were migrated to handles
+            return "handle", "@" + reference
+    if reference.startswith("@"):
+        return "handle", reference
+    if CHANNEL_ID_PATTERN.match(reference):
+        return "id", reference
+    return "username", reference
+
+
+# ==================================================       /     HARVEST ENGINE    /      =================================================== #
+class HarvestEngine:
+    """
+    Fetches channel, playlist, video and comment data through a bounded thread pool.
+
+    Every request passes through a shared rate limiter and is charged to the quota
+    ledger under the channel being harvested. API clients are built once and kept in
+    a pool; a client is lent to one request at a time, since the underlying HTTP
+    connection is not thread-safe. With a response cache, GET responses are reused
+    while fresh and revalidated with their ETag afterwards. Requests, retries, errors
+    and response bytes are counted per call type, and each stage of a harvest is
+    timed, in the telemetry.
+
+    Args:
+        client_factory (callable): Returns a new YouTube API client.
+        max_workers (int): Maximum number of requests in flight at once.
+        requests_per_second (float): Request rate cap across all workers, 0 to disable.
+        ledger (QuotaLedger): Counts quota units, an in-memory ledger by default.
+        max_retries (int): Retries of a request failing with a transient error.
+        backoff_base (float): Delay ceiling of the first retry in seconds, doubled on each retry.
+        backoff_max (float): Largest delay ceiling in seconds.
+        response_cache (ResponseCache): On-disk response cache, None to disable.
+        telemetry (Telemetry): Counters and stage timings, the process-wide TELEMETRY by default.
+    """
+
+    def __init__(self, client_factory=Api_key_client, max_workers: int = 8, requests_per_second: float = 10.0,
+                 ledger: QuotaLedger = None, max_retries: int = 5, backoff_base: float = 1.0, backoff_max: float = 32.0,
+                 response_cache: ResponseCache = None, telemetry: Telemetry = None):
+        self.client_factory = client_factory
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.ledger = ledger if ledger is not None else QuotaLedger()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.response_cache = response_cache
+        self.telemetry = telemetry if telemetry is not None else TELEMETRY
+        self._clients = queue.LifoQueue()
+        self._local = threading.local()
+
+    @contextmanager
+    def client(self):
+        """
+        Lends an idle API client for the duration of a with block, building one
+        only when every client is in use.
+
+        Yields:
+            object: A YouTube API client.
+        """
+        try:
+            youtube = self._clients.get_nowait()
+        except queue.Empty:
+            youtube = self.client_factory()
+        try:
+            yield youtube
+        finally:
+            self._clients.put(youtube)
+
+    def _bind_channel(self, channel_id: str):
+        # Channel the quota of the calling thread's requests is charged to
+        self._local.channel_id = channel_id
+
+    def _bind_progress(self, progress: HarvestProgress):
+        # Progress of the harvest running on the calling thread
+        self._local.progress = progress
+
+    def _bind_thread(self, channel_id: str, progress: HarvestProgress):
+        self._bind_channel(channel_id)
+        self._bind_progress(progress)
+
+    def _progress(self):
+        return getattr(self._local, "progress", None)
+
+    def _pool(self):
+        """
+        Returns a thread pool whose threads charge their requests to the channel of the
+        calling thread, and count their videos and comments in its progress.
+        """
+        return ThreadPoolExecutor(max_workers=self.max_workers, initializer=self._bind_thread,
+                                  initargs=(getattr(self._local, "channel_id", None), self._progress()))
+
+    def execute(self, build_request):
+        """
+        Sends one API request once the rate limiter allows it, and records its quota cost.
+        Transient errors are retried with jittered exponential backoff. A fresh cached
+        response is returned without sending the request.
+
+        Args:
+            build_request (callable): Takes the API client and returns the request to execute.
+
+        Returns:
+            dict: The API response.
+
+        Raises:
+            QuotaExhausted: The remaining daily quota cannot pay for the request.
+            HttpError: The request failed with a permanent error, or on every retry.
+        """
+        with self.client() as youtube:
+            request = build_request(youtube)
+            call_type = getattr(request, "methodId", None) or "unknown"
+
+            # Only GET requests are cached, keyed by their full URL
+            url = getattr(request, "uri", None) if getattr(request, "method", None) == "GET" else None
+            cached = self.response_cache.get(url) if self.response_cache is not None and url else None
+            if cached is not None:
+                if self.response_cache.is_fresh(cached):
+                    self.telemetry.increment("api_cache_hits", call=call_type)
+                    return cached["body"]
+                if cached["etag"]:
+                    request.headers["If-None-Match"] = cached["etag"]
+
+            try:
+                response = self._send(request, call_type)
+            except googleapiclient.errors.HttpError as error:
+                # Not modified since it was cached
+                if cached is not None and error.resp.status == 304:
+                    self.telemetry.increment("api_not_modified", call=call_type)
+                    self.response_cache.touch(url, cached)
+                    return cached["body"]
+                raise
+
+            if url is not None and self.response_cache is not None:
+                self.response_cache.set(url, response, response.get("etag"))
+            return response
+
+    def _send(self, request, call_type: str):
+        # Sends a request, retrying transient errors
+        self._count_response_bytes(request, call_type)
+        attempt = 0
+        while True:
+            # Charged before sending, so failed requests are charged as well
+            self.ledger.charge(call_type, getattr(self._local, "channel_id", None))
+            self.rate_limiter.wait()
+            self.telemetry.increment("api_requests", call=call_type)
+            try:
+                return request.execute()
+            except Exception as error:
+                # Not modified: a successful revalidation, answered from the cache by execute
+                if isinstance(error, googleapiclient.errors.HttpError) and error.resp.status == 304:
+                    raise
+                self.telemetry.increment("api_errors", call=call_type)
+                if attempt >= self.max_retries or not is_retryable(error):
+                    raise
+            self.telemetry.increment("api_retries", call=call_type)
+            time.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max))
+            attempt += 1
+
+    def _count_response_bytes(self, request, call_type: str):
+        # The request parses the response body in postproc, which sees its raw bytes
+        postproc = getattr(request, "postproc", None)
+        if postproc is None:
+            return
+
+        def counting_postproc(resp, content):
+            self.telemetry.increment("api_response_bytes", len(content or b""), call=call_type)
+            return postproc(resp, content)
+        request.postproc = counting_postproc
+
+    def get_channel_info(self, channel_id: str):
+        """
+        Collects channel infromation from YouTube API.
+
+        Args:
+            Channel_id (str): Unique Youtube chnanel id.
+
+        Returns:
+            dict: A dict containing channel information or None if entered invalid channel-id.
+        """
+        self._bind_channel(channel_id)
+        with self.telemetry.stage("get_channel_info") as timing:
+            channel_response = self.execute(lambda youtube: youtube.channels().list(
+                part= "snippet,contentDetails,statistics",
+                id= channel_id
+            ))
+            timing["rows"] = len(channel_response.get("items", []))
+
+        # Input validation, an unknown id returns no items
+        if not channel_response.get("items"):
+            return None
+        return channel_response
+
+    def get_channels_info(self, channel_ids: list, batch_size: int = 50):
+        """
+        Collects the information of many channels, 50 channel ids per request.
+
+        Args:
+            channel_ids (list): Unique Youtube channel ids.
+            batch_size (int): Number of channel ids sent in each request (API maximum is 50).
+
+        Returns:
+            dict: Information of each channel found, shaped as get_channel_info returns it,
+                keyed by channel id. Unknown ids are left out.
+        """
+        def get_channel_batch(batch_ids):
+            with self.telemetry.stage("get_channel_info") as timing:
+                channel_response = self.execute(lambda youtube: youtube.channels().list(
+                    part= "snippet,contentDetails,statistics",
+                    id= ",".join(batch_ids),
+                    maxResults= batch_size
+                ))
+                timing["rows"] = len(channel_response.get("items", []))
+            return {item["id"]: {"items": [item]} for item in channel_response.get("items", [])}
+
+        channels = {}
+        with self._pool() as pool:
+            batches = [channel_ids[start:start + batch_size] for start in range(0, len(channel_ids), batch_size)]
+            for channel_batch in pool.map(get_channel_batch, batches):
+                channels.update(channel_batch)
+        return channels
+
+    def lookup_channel(self, kind: str, value: str):
+        """
+        Looks up a channel by handle or legacy username. A username that matches no
+        channel is tried as a handle, since users mix the two up.
+
+        Args:
+            kind (str): "handle" or "username", see parse_channel_reference.
+            value (str): Handle or username.
+
+        Returns:
+            dict: The channel item, or None if no channel matches.
+        """
+        lookups = [("forHandle", value)] if kind == "handle" else [("forUsername", value), ("forHandle", "@" + value)]
+        for parameter, lookup_value in lookups:
+            with self.telemetry.stage("lookup_channel") as timing:
+                channel_response = self.execute(lambda youtube: youtube.channels().list(
+                    part= "snippet,contentDetails,statistics",
+                    **{parameter: lookup_value}
+                ))
+                timing["rows"] = len(channel_response.get("items", []))
+            if channel_response.get("items"):
+                return channel_response["items"][0]
+        return None
+
+    def resolve_channels(self, references: list):
+        """
+        Resolves channel ids, handles, usernames and channel URLs, and collects the
+        information of every channel found. Channel ids are looked up 50 per request,
+        handles and usernames take one request each and are sent in parallel.
+
+        Args:
+            references (list): Channels as given by the user, see parse_channel_reference.
+
+        Returns:
+            tuple: The channel id of each reference (None if no channel matches it), and
+                the information of each channel found, keyed by channel id, see get_channels_info.
+        """
+        # Lookups are not charged to the last harvested channel
+        self._bind_channel(None)
+        parsed = {reference: parse_channel_reference(reference) for reference in references}
+        channel_ids = {}
+        channels = {}
+
+        lookups = [reference for reference, (kind, _) in parsed.items() if kind != "id"]
+        with self._pool() as pool:
+            for reference, item in zip(lookups, pool.map(lambda reference: self.lookup_channel(*parsed[reference]), lookups)):
+                channel_ids[reference] = item["id"] if item is not None else None
+                if item is not None:
+                    channels[item["id"]] = {"items": [item]}
+
+        ids = list(dict.fromkeys(value for kind, value in parsed.values() if kind == "id" and value not in channels))
+        channels.update(self.get_channels_info(ids))
+        for reference, (kind, value) in parsed.items():
+            if kind == "id":
+                channel_ids[reference] = value if value in channels else None
+        return channel_ids, channels
+
+    def iter_video_id_pages(self, channel_playlist_id: str, checkpoint=None):
+        """
+        Walks the playlist pages and yields the video ids of each page.
+
+        Args:
+            channel_playlist_id (str): Unique playlist id from channel.
+            checkpoint (HarvestCheckpoint): Replays saved pages and resumes from the saved cursor.
+
+        Yields:
+            list: Video ids of one playlist page (up to 50).
+        """
+        next_page_token = None
+
+        if checkpoint is not None:
+            yield from checkpoint.playlist["pages"]
+            if checkpoint.playlist["complete"]:
+                return
+            next_page_token = checkpoint.playlist["next_page_token"]
+
+        while True:
+            # Generate playlist details
+            with self.telemetry.stage("get_video_ids") as timing:
+                playlist_response = self.execute(lambda youtube: youtube.playlistItems().list(
+                    playlistId = channel_playlist_id,
+                    part = "contentDetails",
+                    maxResults = 50,
+                    pageToken = next_page_token
+                ))
+                page_ids = [item["contentDetails"]["videoId"] for item in playlist_response['items']]
+                timing["rows"] = len(page_ids)
+
+            # Check if there's next page in playlist
+            next_page_token = playlist_response.get("nextPageToken")
+
+            if checkpoint is not None:
+                checkpoint.save_playlist_page(page_ids, next_page_token)
+            yield page_ids
+
+            if next_page_token is None:
+                break
+
+    def get_video_ids(self, channel_playlist_id: str):
+        """
+        Collects video ids of videos available in playlist.
+
+        Args:
+            channel_playlist_id (str): Unique playlist id from channel.
+
+        Returns:
+            list: A list of video ids.
+        """
+        return [video_id for page in self.iter_video_id_pages(channel_playlist_id) for video_id in page]
+
+    def get_video_comments(self, video_id: str, max_comments_per_video=100):
+        """
+        Collects all the comment details of a video
+
+        Args:
+            video_id (str): a unique identifier of YouTube video.
+            max_comments_per_video (int): Comment count.
+
+        Returns:
+            dict: A dict containing comment details or None if comments are unavailable.
+        """
+        with self.telemetry.stage("get_video_comments") as timing:
+            try:
+                comment_response = self.execute(lambda youtube: youtube.commentThreads().list(
+                    part= "snippet",
+                    videoId= video_id,
+                    maxResults= max_comments_per_video,
+                ))
+            except googleapiclient.errors.HttpError as error:
+                # Comments are disabled on the video, other errors are the caller's to handle
+                if error.resp.status == 403 and http_error_reason(error) in COMMENTS_UNAVAILABLE_REASONS:
+                    return None
+                raise
+            timing["rows"] = len(comment_response.get("items", []))
+        if self._progress() is not None:
+            self._progress().add_comments(timing["rows"])
+        return comment_response
+
+    def iter_video_comments(self, video_id: str, max_comments: int = None, budget: CommentBudget = None):
+        """
+        Yields every comment thread of a video, following nextPageToken page by page
+        so that only one page is held in memory at a time.
+
+        Args:
+            video_id (str): a unique identifier of YouTube video.
+            max_comments (int): Per-video cap, None for all comments.
+            budget (CommentBudget): Cap shared by all videos of the harvest.
+
+        Yields:
+            CommentRecord: Each comment, parsed as it arrives.
+        """
+        next_page_token = None
+        count = 0
+
+        while True:
+            try:
+                comment_response = self.execute(lambda youtube: youtube.commentThreads().list(
+                    part= "snippet",
+                    videoId= video_id,
+                    maxResults= 100,
+                    pageToken= next_page_token
+                ))
+            except googleapiclient.errors.HttpError as error:
+                # Comments are disabled on the video
+                if (next_page_token is None and error.resp.status == 403
+                        and http_error_reason(error) in COMMENTS_UNAVAILABLE_REASONS):
+                    return
+                raise
+
+            for comment_thread in comment_response["items"]:
+                if max_comments is not None and count >= max_comments:
+                    return
+                if budget is not None and not budget.take():
+                    return
+                count += 1
+                yield CommentRecord.from_api(video_id, comment_thread)
+
+            next_page_token = comment_response.get("nextPageToken")
+            # A cap reached on this page needs no request for the next one
+            if next_page_token is None or (max_comments is not None and count >= max_comments):
+                return
+
+    def stream_video_comments(self, video_id: str, comment_writer, max_comments: int = None,
+                              budget: CommentBudget = None, checkpoint=None):
+        """
+        Writes every comment of a video to storage through a chunked writer.
+
+        Args:
+            video_id (str): a unique identifier of YouTube video.
+            comment_writer (CommentWriter): Buffers comments and writes them in fixed-size chunks.
+            max_comments (int): Per-video cap, None for all comments.
+            budget (CommentBudget): Cap shared by all videos of the harvest.
+            checkpoint (HarvestCheckpoint): Skips videos whose comments an earlier run stored.
+
+        Returns:
+            None: Streamed comments are not attached to the video.
+        """
+        if checkpoint is not None and video_id in checkpoint.comment_videos_done:
+            return None
+        progress = self._progress()
+        with self.telemetry.stage("get_video_comments") as timing:
+            for comment in self.iter_video_comments(video_id, max_comments, budget):
+                comment_writer.add(comment)
+                timing["rows"] += 1
+                if progress is not None:
+                    progress.add_comments()
+        comment_writer.mark_done(video_id)
+        return None
+
+    def comment_task(self, checkpoint=None, comment_writer=None, max_comments_per_video: int = None,
+                     max_comments_total: int = None):
+        """
+        Picks how the comments of each video are collected.
+
+        Args:
+            checkpoint (HarvestCheckpoint): Progress store of the channel, if any.
+            comment_writer (CommentWriter): Streams all comment pages to storage. Without it
+                only the first page (up to 100 comments) is attached to each video.
+            max_comments_per_video (int): Per-video cap for streamed comments.
+            max_comments_total (int): Cap across all videos for streamed comments.
+
+        Returns:
+            callable: Takes a video id and returns its commentThreads().list response to attach, or None.
+        """
+        if comment_writer is not None:
+            budget = CommentBudget(max_comments_total)
+            return lambda video_id: self.stream_video_comments(
+                video_id, comment_writer, max_comments_per_video, budget, checkpoint)
+        if checkpoint is not None:
+            return lambda video_id: self.get_checkpointed_video_comments(video_id, checkpoint)
+        return lambda video_id: self.get_video_comments(video_id, 100)
+
+    def get_video_batch(self, batch_ids: list):
+        """
+        Collects video details of up to 50 video ids in a single request.
+
+        Args:
+            batch_ids (list): Video ids to request.
+
+        Returns:
+            tuple: VideoRecord of each video in the order of batch_ids, and the ids that
+                returned no item (deleted or private videos).
+        """
+        with self.telemetry.stage("get_video_info") as timing:
+            video_response = self.execute(lambda youtube: youtube.videos().list(
+                part='snippet,statistics,contentDetails',
+                id=",".join(batch_ids)
+            ))
+            timing["rows"] = len(video_response.get("items", []))
+
+        # Items are not guaranteed to follow the requested order
+        videos_by_id = {item["id"]: item for item in video_response.get("items", [])}
+
+        videos = []
+        missing_video_ids = []
+        for video_id in batch_ids:
+            video = videos_by_id.get(video_id)
+            if video is None:
+                missing_video_ids.append(video_id)
+                continue
+
+            # Only the warehouse fields of the item are kept, parsed once
+            videos.append(VideoRecord.from_api(video))
+        return videos, missing_video_ids
+
+    def get_checkpointed_video_batch(self, index: int, batch_ids: list, checkpoint):
+        """
+        Returns the saved video batch if an earlier run finished it, otherwise
+        fetches the batch and saves it.
+
+        Args:
+            index (int): Position of the batch in the playlist.
+            batch_ids (list): Video ids to request.
+            checkpoint (HarvestCheckpoint): Progress store of the channel.
+
+        Returns:
+            tuple: Video records and missing video ids, as get_video_batch.
+        """
+        if index in checkpoint.video_batches:
+            return checkpoint.video_batches[index]
+        videos, missing_video_ids = self.get_video_batch(batch_ids)
+        checkpoint.save_video_batch(index, videos, missing_video_ids)
+        return videos, missing_video_ids
+
+    def get_checkpointed_video_comments(self, video_id: str, checkpoint):
+        """
+        Returns the saved comments of a video, otherwise fetches and saves them.
+        Failed requests are not saved, so they are retried by the next run.
+
+        Args:
+            video_id (str): a unique identifier of YouTube video.
+            checkpoint (HarvestCheckpoint): Progress store of the channel.
+
+        Returns:
+            dict: A dict containing comment details or None if comments are unavailable.
+        """
+        if video_id in checkpoint.comments:
+            return checkpoint.comments[video_id]
+        comment_response = self.get_video_comments(video_id, 100)
+        if comment_response is not None:
+            checkpoint.save_comments(video_id, comment_response)
+        return comment_response
+
+    def get_video_statistics(self, video_ids: list, batch_size: int = 50):
+        """
+        Collects only the statistics of videos, 50 ids per request.
+
+        Args:
+            video_ids (list): A list of video ids
+            batch_size (int): Number of video ids sent in each request (API maximum is 50).
+
+        Returns:
+            tuple: Parsed statistics of each video keyed by video id (see parse_video_statistics),
+                with deleted or private videos left out, and the skipped videos of batches that
+                failed, see skipped_video.
+        """
+        def get_statistics_batch(batch_ids):
+            with self.telemetry.stage("get_video_statistics") as timing:
+                video_response = self.execute(lambda youtube: youtube.videos().list(
+                    part='statistics',
+                    id=",".join(batch_ids)
+                ))
+                timing["rows"] = len(video_response.get("items", []))
+            return {item["id"]: parse_video_statistics(item["statistics"]) for item in video_response.get("items", [])}
+
+        statistics = {}
+        skipped = []
+        with self._pool() as pool:
+            batches = [video_ids[start:start + batch_size] for start in range(0, len(video_ids), batch_size)]
+            batch_futures = [(batch_ids, pool.submit(get_statistics_batch, batch_ids)) for batch_ids in batches]
+            for batch_ids, future in batch_futures:
+                try:
+                    statistics.update(future.result())
+                except QuotaExhausted:
+                    raise
+                except Exception as error:
+                    # A failed batch skips its videos instead of aborting the refresh
+                    skipped.extend(skipped_video(video_id, "statistics", error) for video_id in batch_ids)
+        return statistics, skipped
+
+    def _collect_videos(self, pool, batch_futures: list, comment_task):
+        """
+        Waits for video batches in order and queues the comment request of each video
+        as soon as its batch arrives.
+
+        A batch or a comment task that fails after its retries is recorded as skipped
+        and the harvest goes on. Videos of a failed batch are left out; a video whose
+        comments failed is kept without comments. Only a used-up quota stops the harvest.
+
+        Args:
+            pool (ThreadPoolExecutor): Pool the comment requests are submitted to.
+            batch_futures (list): (video ids, future of get_video_batch) pairs, in playlist order.
+            comment_task (callable): Collects the comments of a video, see comment_task.
+
+        Returns:
+            tuple: Video records with comments attached, ids of missing videos, and the
+                skipped videos, see skipped_video.
+        """
+        progress = self._progress()
+        video_info = []
+        missing_video_ids = []
+        skipped = []
+        comment_futures = []
+        for batch_ids, future in batch_futures:
+            try:
+                videos, batch_missing = future.result()
+            except QuotaExhausted:
+                raise
+            except Exception as error:
+                skipped.extend(skipped_video(video_id, "videos", error) for video_id in batch_ids)
+                if progress is not None:
+                    progress.add_videos(len(batch_ids))
+                continue
+            missing_video_ids.extend(batch_missing)
+            if progress is not None:
+                # Left out videos count as done
+                progress.add_videos(len(batch_ids) - len(videos))
+            for video in videos:
+                comment_future = pool.submit(comment_task, video.video_id)
+                if progress is not None:
+                    # A video is done once its comments are
+                    comment_future.add_done_callback(lambda _: progress.add_videos())
+                comment_futures.append(comment_future)
+                video_info.append(video)
+
+        for video, future in zip(video_info, comment_futures):
+            try:
+                video.comments = comments_from_response(video.video_id, future.result())
+            except QuotaExhausted:
+                raise
+            except Exception as error:
+                skipped.append(skipped_video(video.video_id, "comments", error))
+        return video_info, missing_video_ids, skipped
+
+    def get_video_info(self, video_ids: list, batch_size: int = 50, comment_task=None):
+        """
+        Collects video information along with comments information.
+        Video ids are requested in batches of up to 50 per API call.
+
+        Args:
+            video_ids (list): A list of video ids
+            batch_size (int): Number of video ids sent in each request (API maximum is 50).
+            comment_task (callable): Collects the comments of a video, first page by default.
+
+        Returns:
+            tuple: A list of VideoRecord in the order of video_ids, a list of video ids
+                that returned no item (deleted or private videos), and the skipped videos.
+        """
+        with self._pool() as pool:
+            batches = [video_ids[start:start + batch_size] for start in range(0, len(video_ids), batch_size)]
+            batch_futures = [(batch_ids, pool.submit(self.get_video_batch, batch_ids)) for batch_ids in batches]
+            return self._collect_videos(pool, batch_futures, comment_task or self.comment_task())
+
+    def harvest(self, channel_id: str, checkpoint=None, comment_writer=None,
+                max_comments_per_video: int = None, max_comments_total: int = None, progress: HarvestProgress = None,
+                channel_data: dict = None):
+        """
+        Collects the channel, its videos and their comments.
+
+        Video batches are queued while the playlist is still being paged through,
+        and comment requests are queued as each batch arrives. With a checkpoint,
+        every finished stage is saved and stages saved by an earlier run are reused.
+
+        Args:
+            channel_id (str): Unique Youtube channel id.
+            checkpoint (HarvestCheckpoint): Progress store of the channel, None to disable.
+            comment_writer (CommentWriter): Streams every comment page to storage instead of
+                attaching the first page to each video.
+            max_comments_per_video (int): Per-video cap for streamed comments.
+            max_comments_total (int): Cap across all videos for streamed comments.
+            progress (HarvestProgress): Counts the videos and comments fetched, None to disable.
+            channel_data (dict): Channel information already collected, e.g. by resolve_channels,
+                None to request it.
+
+        Returns:
+            tuple: The fetched_data dict (channel details and "Video_ID_{i}" entries), the
+                list of missing video ids and the list of skipped videos, or (None, [], [])
+                if the channel-id is invalid.
+        """
+        self._bind_channel(channel_id)
+        self._bind_progress(progress)
+        if checkpoint is not None and checkpoint.channel_data is not None:
+            channel_data = checkpoint.channel_data
+        else:
+            if channel_data is None:
+                channel_data = self.get_channel_info(channel_id)
+            if channel_data is None:
+                return None, [], []
+            if checkpoint is not None:
+                checkpoint.save_channel(channel_data)
+        channel_stats = format_channel_data(channel_id, channel_data)
+        channel_playlist_id = channel_stats["Channel_Details"]["Playlist_id"]
+        if progress is not None:
+            progress.set_total(channel_stats["Channel_Details"]["Video_count"] or 0)
+
+        comment_task = self.comment_task(checkpoint, comment_writer, max_comments_per_video, max_comments_total)
+        with self._pool() as pool:
+            if checkpoint is None:
+                batch_futures = [(page_ids, pool.submit(self.get_video_batch, page_ids))
+                                 for page_ids in self.iter_video_id_pages(channel_playlist_id)]
+            else:
+                batch_futures = [(page_ids, pool.submit(self.get_checkpointed_video_batch, index, page_ids, checkpoint))
+                                 for index, page_ids in enumerate(self.iter_video_id_pages(channel_playlist_id, checkpoint))]
+            video_data, missing_video_ids, skipped = self._collect_videos(pool, batch_futures, comment_task)
+
+        # Combine channel details and video details to a dictionary
+        fetched_data = {**channel_stats, **format_video_data(video_data)}
+        return fetched_data, missing_video_ids, skipped
+
+    def harvest_delta(self, channel_id: str, stored_video_ids: list, comment_writer=None,
+                      max_comments_per_video: int = None, max_comments_total: int = None,
+                      progress: HarvestProgress = None, channel_data: dict = None):
+        """
+        Collects what changed on an already stored channel. Full details and comments
+        are fetched only for videos that are not stored yet, stored videos only get
+        their statistics refreshed.
+
+        Args:
+            channel_id (str): Unique Youtube channel id.
+            stored_video_ids (list): Video ids already stored for the channel.
+            comment_writer (CommentWriter): Streams every comment page of new videos to storage.
+            max_comments_per_video (int): Per-video cap for streamed comments.
+            max_comments_total (int): Cap across all videos for streamed comments.
+            progress (HarvestProgress): Counts the new videos and comments fetched, None to disable.
+            channel_data (dict): Channel information already collected, None to request it.
+
+        Returns:
+            dict: "channel_stats" (channel details), "new_videos" (video records with comments
+                attached, in playlist order), "statistics" (parsed statistics of stored videos
+                keyed by video id), "missing_video_ids" and "skipped", or None if the channel-id is invalid.
+        """
+        self._bind_channel(channel_id)
+        self._bind_progress(progress)
+        if channel_data is None:
+            channel_data = self.get_channel_info(channel_id)
+        if channel_data is None:
+            return None
+        channel_stats = format_channel_data(channel_id, channel_data)
+
+        stored_video_ids = set(stored_video_ids)
+        video_ids = self.get_video_ids(channel_stats["Channel_Details"]["Playlist_id"])
+        new_video_ids = [video_id for video_id in video_ids if video_id not in stored_video_ids]
+        existing_video_ids = [video_id for video_id in video_ids if video_id in stored_video_ids]
+        if progress is not None:
+            progress.set_total(len(new_video_ids))
+
+        comment_task = self.comment_task(None, comment_writer, max_comments_per_video, max_comments_total)
+        new_videos, missing_video_ids, skipped = self.get_video_info(new_video_ids, comment_task=comment_task)
+        statistics, skipped_statistics = self.get_video_statistics(existing_video_ids)
+        skipped.extend(skipped_statistics)
+        skipped_ids = {entry["Video_id"] for entry in skipped_statistics}
+        missing_video_ids.extend(video_id for video_id in existing_video_ids
+                                 if video_id not in statistics and video_id not in skipped_ids)
+
+        return {
+            "channel_stats": channel_stats,
+            "new_videos": new_videos,
+            "statistics": statistics,
+            "missing_video_ids": missing_video_ids,
+            "skipped": skipped
+        }
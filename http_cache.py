@@ -0,0 +1,153 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[Cache]
+import hashlib
+import json
+import os
+import tempfile
+
+#[Concurrency]
+import threading
+import time
+
+
+# ==================================================       /     RESPONSE CACHE    /      =================================================== #
+class ResponseCache:
+    """
+    Persistent on-disk cache of API responses keyed by request URL, with size-based
+    LRU eviction. Each response is stored as one JSON file together with its ETag
+    and the time it was stored; the file's modification time marks its last use.
+
+    A response younger than max_age is served without contacting the API. An older
+    one is revalidated with If-None-Match, and a 304 answer reuses the stored body.
+
+    Args:
+        directory (str): Folder holding the cached responses.
+        max_bytes (int): Total size of the cache, least recently used responses are evicted first.
+        max_age (float): Seconds a response is served without revalidation, 0 to always revalidate.
+    """
+
+    def __init__(self, directory: str = ".http_cache", max_bytes: int = 512 * 1024 * 1024, max_age: float = 0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        # Size of every cached file, to evict without listing the folder on each write
+        self._scan()
+
+    @staticmethod
+    def key(url: str):
+        """
+        Returns:
+            str: File name of the cached response of a URL.
+        """
+        return hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json"
+
+    def get(self, url: str):
+        """
+        Reads a cached response and marks it as recently used.
+
+        Args:
+            url (str): Request URL.
+
+        Returns:
+            dict: "etag", "stored_at" and "body", or None if the URL is not cached.
+        """
+        path = os.path.join(self.directory, self.key(url))
+        try:
+            with open(path, encoding="utf-8") as cache_file:
+                entry = json.load(cache_file)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def is_fresh(self, entry: dict):
+        """
+        Returns:
+            bool: True if the entry may be served without revalidation.
+        """
+        return time.time() - entry["stored_at"] < self.max_age
+
+    def touch(self, url: str, entry: dict):
+        """
+        Restarts the max_age of a response the API confirmed as unchanged.
+        """
+        self.set(url, entry["body"], entry["etag"])
+
+    def set(self, url: str, body: dict, etag: str = None):
+        """
+        Stores a response, evicting the least recently used ones if the cache grows past max_bytes.
+
+        Args:
+            url (str): Request URL.
+            body (dict): Parsed response.
+            etag (str): ETag of the response, None if it has none.
+        """
+        name = self.key(url)
+        data = json.dumps({"etag": etag, "stored_at": time.time(), "body": body})
+
+        # Write to a temporary file first, so readers never see a partial response
+        with tempfile.NamedTemporaryFile("w", dir=self.directory, suffix=".tmp", encoding="utf-8", delete=False) as temp_file:
+            temp_file.write(data)
+        os.replace(temp_file.name, os.path.join(self.directory, name))
+
+        with self.lock:
+            size = len(data.encode("utf-8"))
+            self.total_bytes += size - self.sizes.get(name, 0)
+            self.sizes[name] = size
+            self.unscanned_bytes += size
+            # Other processes write to the same folder, so it is measured again after every max_bytes / 10 written here
+            if self.total_bytes > self.max_bytes or self.unscanned_bytes > self.max_bytes / 10:
+                self._evict()
+
+    def _scan(self):
+        """
+        Reads the size and last use of every cached file from disk, including the
+        files written by other processes sharing the folder.
+
+        Returns:
+            dict: (size, modification time) of every cached file, keyed by file name.
+        """
+        files = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files[entry.name] = (stat.st_size, stat.st_mtime)
+        self.sizes = {name: size for name, (size, _) in files.items()}
+        self.total_bytes = sum(self.sizes.values())
+        self.unscanned_bytes = 0
+        return files
+
+    def _evict(self):
+        # Oldest modification time first, until the cache is back under 90% of max_bytes
+        files = self._scan()
+        if self.total_bytes <= self.max_bytes:
+            return
+        for name in sorted(files, key=lambda name: files[name][1]):
+            if self.total_bytes <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            self.total_bytes -= self.sizes.pop(name)
+
+    def clear(self):
+        """
+        Removes every cached response.
+        """
+        with self.lock:
+            for name in self._scan():
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+            self.sizes.clear()
+            self.total_bytes = 0
@@ -0,0 +1,257 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[MongoDB]
+import pymongo
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+#[Harvest]
+from harvester import HarvestEngine, HarvestProgress
+from pipeline import harvest_channel
+
+#[Concurrency]
+import os
+import socket
+import threading
+import time
+import uuid
+
+
+# ==================================================       /     JOB QUEUE    /      =================================================== #
+# Statuses of a job, in the order a job goes through them; a job ends as Done or Failed
+JOB_STATUSES = ["Queued", "Running", "Done", "Failed"]
+
+
+class JobQueue:
+    """
+    Queue of channel harvests kept in a MongoDB collection, shared by the Streamlit
+    app that enqueues jobs and the worker processes that run them.
+
+    One document per job:
+        {"_id": "<job id>", "Channel_id": ..., "Options": {harvest_channel options}, "Status": ...,
+         "Created", "Started", "Finished", "Heartbeat": epoch seconds, "Worker": ..., "Attempts": n,
+         "Progress": HarvestProgress.report(), "Result": harvest_channel result, "Run summary": {...}, "Error": ...}
+    Queued and running jobs also carry "Active_channel": the channel id, unique among
+    them, so a channel never has two active jobs; it is removed when the job ends.
+
+    A worker claims the oldest queued job atomically, so no job runs twice at once.
+    Running jobs send a heartbeat with their progress; a job whose heartbeat stops,
+    because its worker died, is queued again and resumes from its harvest checkpoint.
+
+    Args:
+        collection (Collection): youtube_DB.harvest_jobs collection.
+        stale_after (float): Seconds without a heartbeat after which a running job is queued again.
+        max_attempts (int): Runs of a job before a job whose worker keeps dying is failed.
+    """
+
+    def __init__(self, collection, stale_after: float = 60, max_attempts: int = 3):
+        self.collection = collection
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+
+    def create_indexes(self):
+        self.collection.create_index([("Status", 1), ("Created", 1)])
+        self.collection.create_index("Channel_id")
+        self.collection.create_index("Active_channel", unique = True,
+                                     partialFilterExpression = {"Active_channel": {"$exists": True}})
+
+    def enqueue(self, channel_id: str, options: dict = None):
+        """
+        Queues a harvest of a channel, unless the channel is already queued or running.
+
+        Args:
+            channel_id (str): Unique Youtube channel id.
+            options (dict): Keyword arguments of harvest_channel, e.g. storage_layout.
+
+        Returns:
+            str: Id of the new job, or of the queued or running job of the channel.
+        """
+        # One upsert keyed on the active channel, so concurrent enqueues of a channel queue one job
+        job = {
+            "_id": uuid.uuid4().hex,
+            "Channel_id": channel_id,
+            "Options": options or {},
+            "Status": "Queued",
+            "Created": time.time(),
+            "Started": None,
+            "Finished": None,
+            "Heartbeat": None,
+            "Worker": None,
+            "Attempts": 0,
+            "Progress": None,
+            "Result": None,
+            "Run summary": None,
+            "Error": None
+        }
+        try:
+            active = self.collection.find_one_and_update(
+                {"Active_channel": channel_id}, {"$setOnInsert": job},
+                upsert = True, projection = {"_id": 1}, return_document = ReturnDocument.AFTER)
+        except DuplicateKeyError:
+            # Another process inserted the channel's job between the lookup and the insert of the upsert
+            active = self.collection.find_one({"Active_channel": channel_id}, {"_id": 1})
+        return active["_id"]
+
+    def claim(self, worker_id: str):
+        """
+        Marks the oldest queued job as running on a worker.
+
+        Returns:
+            dict: The claimed job, or None if no job is queued.
+        """
+        now = time.time()
+        return self.collection.find_one_and_update(
+            {"Status": "Queued"},
+            {"$set": {"Status": "Running", "Started": now, "Heartbeat": now, "Worker": worker_id},
+             "$inc": {"Attempts": 1}},
+            sort=[("Created", 1)],
+            return_document=ReturnDocument.AFTER)
+
+    def heartbeat(self, job_id: str, progress: dict):
+        self.collection.update_one({"_id": job_id, "Status": "Running"},
+                                   {"$set": {"Heartbeat": time.time(), "Progress": progress}})
+
+    def finish(self, job_id: str, result: dict, progress: dict, run_summary: dict):
+        """
+        Records the result of a job that ran to the end.
+        """
+        self.collection.update_one({"_id": job_id}, {"$set": {
+            "Status": "Done", "Finished": time.time(), "Progress": progress, "Result": result, "Run summary": run_summary},
+            "$unset": {"Active_channel": ""}})
+
+    def fail(self, job_id: str, error: str, progress: dict = None):
+        self.collection.update_one({"_id": job_id}, {"$set": {
+            "Status": "Failed", "Finished": time.time(), "Progress": progress, "Error": error},
+            "$unset": {"Active_channel": ""}})
+
+    def requeue_stale(self):
+        """
+        Queues running jobs whose worker stopped sending heartbeats again, or fails them
+        after max_attempts runs.
+
+        Returns:
+            int: Number of jobs queued again.
+        """
+        stale = {"Status": "Running", "Heartbeat": {"$lt": time.time() - self.stale_after}}
+        self.collection.update_many({**stale, "Attempts": {"$gte": self.max_attempts}}, {"$set": {
+            "Status": "Failed", "Finished": time.time(), "Error": f"Worker stopped responding {self.max_attempts} times"},
+            "$unset": {"Active_channel": ""}})
+        return self.collection.update_many(stale, {"$set": {"Status": "Queued", "Worker": None}}).modified_count
+
+    def get(self, job_id: str):
+        return self.collection.find_one({"_id": job_id})
+
+    def get_many(self, job_ids: list):
+        """
+        Returns:
+            dict: The jobs found, keyed by job id.
+        """
+        return {job["_id"]: job for job in self.collection.find({"_id": {"$in": list(job_ids)}})}
+
+    def list_jobs(self, limit: int = 20):
+        """
+        Returns:
+            list: The most recently created jobs, newest first.
+        """
+        return list(self.collection.find().sort("Created", pymongo.DESCENDING).limit(limit))
+
+
+# ==================================================       /     WORKER    /      =================================================== #
+def _process_alive(pid: int):
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    return True
+
+
+class JobWorker:
+    """
+    Runs queued harvests in a worker process. `concurrency` threads claim jobs and
+    harvest them through one shared engine, so its rate limit holds for all of them,
+    while the main thread saves the progress of the running jobs as their heartbeat
+    and queues the jobs of dead workers again.
+
+    Args:
+        db (Database): The youtube_DB database.
+        engine (HarvestEngine): Engine sending the API requests.
+        queue (JobQueue): Queue to take jobs from.
+        concurrency (int): Channels harvested at once.
+        poll_interval (float): Seconds an idle thread waits before looking for a job again.
+        heartbeat_interval (float): Seconds between progress saves, well below the queue's stale_after.
+    """
+
+    def __init__(self, db, engine: HarvestEngine, queue: JobQueue, concurrency: int = 2, poll_interval: float = 1.0,
+                 heartbeat_interval: float = 2.0):
+        self.db = db
+        self.engine = engine
+        self.queue = queue
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.lock = threading.Lock()
+        self.running = {}
+        self.stop_event = threading.Event()
+
+    def stop(self):
+        """
+        Stops claiming jobs; jobs already running are finished.
+        """
+        self.stop_event.set()
+
+    def run(self, parent_pid: int = None):
+        """
+        Works until stop is called, or until the parent process exits.
+
+        Args:
+            parent_pid (int): Process whose exit stops the worker, e.g. the Streamlit server that started it.
+        """
+        threads = [threading.Thread(target=self._work_loop, daemon=True) for _ in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        try:
+            while not self.stop_event.wait(self.heartbeat_interval):
+                self._heartbeat()
+                self.queue.requeue_stale()
+                if parent_pid is not None and not _process_alive(parent_pid):
+                    self.stop()
+        except KeyboardInterrupt:
+            self.stop()
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(self.heartbeat_interval)
+                self._heartbeat()
+
+    def _heartbeat(self):
+        with self.lock:
+            running = list(self.running.items())
+        for job_id, progress in running:
+            self.queue.heartbeat(job_id, progress.report())
+
+    def _work_loop(self):
+        while not self.stop_event.is_set():
+            job = self.queue.claim(self.worker_id)
+            if job is None:
+                self.stop_event.wait(self.poll_interval)
+                continue
+            self.run_job(job)
+
+    def run_job(self, job: dict):
+        """
+        Harvests the channel of a claimed job and records its result, or its error.
+        """
+        progress = HarvestProgress()
+        with self.lock:
+            self.running[job["_id"]] = progress
+        run_start = self.engine.telemetry.snapshot()
+        try:
+            result = harvest_channel(self.db, job["Channel_id"], self.engine, progress=progress, **job["Options"])
+        except Exception as e:
+            self.queue.fail(job["_id"], f"{type(e).__name__}: {e}", progress.report())
+        else:
+            run = self.engine.telemetry.since(run_start)
+            self.queue.finish(job["_id"], result, progress.report(),
+                              {"Stages": run.summary(), "Requests": run.request_summary()})
+        finally:
+            with self.lock:
+                del self.running[job["_id"]]
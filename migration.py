@@ -0,0 +1,325 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[MongoDB]
+from storage import connect_mongo, create_indexes, ChannelDocumentStore, NormalizedStore, VIDEO_COLUMNS, COMMENT_COLUMNS
+
+#[MySQL]
+from warehouse import connect_mysql, create_schema, bulk_load, bump_warehouse_version, refresh_channel_summary
+
+#[Parquet]
+from columnar import export_parquet
+
+#[Telemetry]
+from telemetry import TELEMETRY, MetricsServer
+
+#[Pandas]
+import pandas as pd
+
+#[CLI]
+import argparse
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+# ==================================================       /     MONGODB TO DATAFRAME    /      =================================================== #
+# Warehouse column and the field it is read from, in a "Video_ID_{i}" entry of the single channel document
+DOCUMENT_VIDEO_FIELDS = {
+    'Video_Id': 'Video_id',
+    'Video_Name': 'Video_name',
+    'Video_Description': 'Description',
+    'Published_date': 'Published_date',
+    'View_Count': 'View_count',
+    'Like_Count': 'Like_count',
+    'Favorite_Count': 'Favorite_count',
+    'Comment_Count': 'Comment_count',
+    'Duration': 'Duration',
+    'Thumbnail': 'Thumbnail',
+    'Caption_Status': 'Caption_status'
+}
+
+# Warehouse column and the field it is read from, in a "Comment_ID_{j}" entry of a video
+DOCUMENT_COMMENT_FIELDS = {
+    'Comment_id': 'Comment_ID',
+    'Comment_text': 'Comment_Text',
+    'Comment_author': 'Comment_Author',
+    'Comment_published_date': 'Comment_PublishedAt'
+}
+
+
+def flatten_channel_document(channel_data: dict):
+    """
+    Flattens the "Channel_data" of a single channel document into the Video and
+    Comment frames in one pass. Each video and comment entry is looked up once and
+    its fields are appended to per-column lists, which become the frame columns.
+
+    Args:
+        channel_data (dict): "Channel_Details" and the "Video_ID_{i}" entries.
+
+    Returns:
+        tuple: Video and Comment DataFrames.
+    """
+    playlist_id = channel_data['Channel_Details']['Playlist_id']
+    video_columns = {column: [] for column in DOCUMENT_VIDEO_FIELDS}
+    comment_columns = {column: [] for column in DOCUMENT_COMMENT_FIELDS}
+    comment_video_ids = []
+
+    for i in range(1, len(channel_data)):
+        video = channel_data[f"Video_ID_{i}"]
+        for column, field in DOCUMENT_VIDEO_FIELDS.items():
+            video_columns[column].append(video[field])
+
+        comments = list(video['comments'].values())
+        comment_video_ids.extend([video['Video_id']] * len(comments))
+        for column, field in DOCUMENT_COMMENT_FIELDS.items():
+            comment_columns[column].extend(comment[field] for comment in comments)
+
+    video_columns['Playlist_Id'] = [playlist_id] * len(video_columns['Video_Id'])
+    comment_columns['Video_id'] = comment_video_ids
+    df_video = pd.DataFrame(video_columns, columns=VIDEO_COLUMNS)
+    df_comment = pd.DataFrame(comment_columns, columns=COMMENT_COLUMNS)
+    return df_video, df_comment
+
+
+def parse_timestamps(values: pd.Series):
+    """
+    Parses ISO-8601 timestamps from the API, e.g. 2022-05-01T10:00:00Z, to naive UTC datetimes.
+
+    Args:
+        values (Series): Timestamp strings.
+
+    Returns:
+        Series: datetime64 values, NaT where a value is missing or not a timestamp.
+    """
+    return pd.to_datetime(values, utc=True, errors="coerce", format="ISO8601").dt.tz_localize(None)
+
+
+def read_channel_frames(db, channel_id: str):
+    """
+    Reads a stored channel from MongoDB into one DataFrame per warehouse table.
+
+    Args:
+        db (Database): The youtube_DB database.
+        channel_id (str): Unique Youtube channel id.
+
+    Returns:
+        tuple: Channel, Playlist, Video and Comment DataFrames.
+    """
+    normalized_store = NormalizedStore(db)
+    document_store = ChannelDocumentStore(db)
+    channel_details = normalized_store.read_channel(channel_id)
+
+    if channel_details is not None:
+        # Read videos and comments through cursors
+        df_video = pd.DataFrame.from_records(normalized_store.iter_videos(channel_id), columns=VIDEO_COLUMNS)
+        df_comment = pd.DataFrame.from_records(normalized_store.iter_comments(channel_id), columns=COMMENT_COLUMNS)
+    else:
+        # Fetch document with the specified channel name
+        document = document_store.collection.find_one({"_id": channel_id})
+        channel_details = document['Channel_data']['Channel_Details']
+
+        df_video, df_comment = flatten_channel_document(document['Channel_data'])
+
+        # Comments streamed to their own collection during harvest
+        df_streamed_comment = pd.DataFrame.from_records(document_store.iter_comments(channel_id), columns=COMMENT_COLUMNS)
+        df_comment = pd.concat([df_comment, df_streamed_comment], ignore_index=True).drop_duplicates("Comment_id")
+
+    # Dictionary to DataFrame conversion
+    dict_channel = {
+        "Channel_name": channel_details['Channel_name'],
+        "Channel_id": channel_id,
+        "Channel_description": channel_details['Channel_description'],
+        "Subscription_count": channel_details['Subscription_count'],
+        "Video_count": channel_details['Video_count'],
+        "View_count": channel_details['View_count'],
+        }
+    df_channel = pd.DataFrame.from_dict(dict_channel, orient='index').T
+
+
+    dict_playlist = {"Playlist_id": channel_details["Playlist_id"],
+                    "Channel_id": channel_id,
+                    }
+    df_playlist = pd.DataFrame.from_dict(dict_playlist, orient= "index").T
+
+    # The warehouse stores publish dates as DATETIME
+    df_video["Published_date"] = parse_timestamps(df_video["Published_date"])
+    df_comment["Comment_published_date"] = parse_timestamps(df_comment["Comment_published_date"])
+    return df_channel, df_playlist, df_video, df_comment
+
+
+# ==================================================       /     MIGRATION JOB    /      =================================================== #
+def list_stored_channels(db):
+    """
+    Returns:
+        dict: Channel name of every channel stored in either MongoDB layout, keyed by channel id.
+    """
+    return {**ChannelDocumentStore(db).list_channels(), **NormalizedStore(db).list_channels()}
+
+
+def migrate_channel(db, channel_id: str, upsert: bool = True, chunk_size: int = 1000, infile_threshold: int = 100000,
+                    pool=None, parquet_dir: str = None):
+    """
+    Moves one channel from MongoDB to MySQL over its own MySQL connection, and
+    optionally writes it to the Parquet dataset read by the DuckDB engine.
+
+    Args:
+        db (Database): The youtube_DB database.
+        channel_id (str): Unique Youtube channel id.
+        upsert (bool): Merge into existing rows instead of plain INSERT.
+        chunk_size (int): Number of rows per executemany call.
+        infile_threshold (int): Row count above which LOAD DATA is used.
+        pool (MySQLPool): Pool to borrow the connection from, None to open a new one.
+        parquet_dir (str): Folder of the Parquet dataset, see columnar.export_parquet, None to skip it.
+
+    Returns:
+        list: The bulk_load report of each table.
+    """
+    with TELEMETRY.stage("dataframe_build") as timing:
+        frames = read_channel_frames(db, channel_id)
+        timing["rows"] = len(frames[2]) + len(frames[3])
+
+    if pool is not None:
+        with pool.connection() as myconnection:
+            load_report = _load_channel_frames(myconnection, channel_id, frames, chunk_size, infile_threshold, upsert)
+    else:
+        myconnection = connect_mysql()
+        try:
+            load_report = _load_channel_frames(myconnection, channel_id, frames, chunk_size, infile_threshold, upsert)
+        finally:
+            myconnection.close()
+
+    # Partitions of the channel are replaced once MySQL holds the same rows
+    if parquet_dir is not None:
+        with TELEMETRY.stage("parquet_export") as timing:
+            timing["rows"] = export_parquet(parquet_dir, *frames)
+    return load_report
+
+
+def _load_channel_frames(myconnection, channel_id: str, frames: list, chunk_size: int, infile_threshold: int, upsert: bool):
+    # Insert channel, playlist, video and comment dataframe into SQL table, one transaction per table
+    load_report = []
+    for table, df in zip(["Channel", "Playlist", "Video", "Comment"], frames):
+        with TELEMETRY.stage("mysql_insert", table=table) as timing:
+            load_report.append(bulk_load(myconnection, table, df, chunk_size=chunk_size,
+                                         infile_threshold=infile_threshold, upsert=upsert))
+            timing["rows"] = load_report[-1]["Rows"]
+
+    # Recompute the aggregates of this channel only
+    with TELEMETRY.stage("refresh_channel_summary"):
+        refresh_channel_summary(myconnection, channel_id)
+
+    # Cached analytics results are outdated now
+    bump_warehouse_version(myconnection)
+    return load_report
+
+
+def _migrate_channel_status(db, channel_id: str, **options):
+    # Failures are reported per channel instead of stopping the batch
+    start_time = time.perf_counter()
+    status = {"Channel_id": channel_id, "Status": "Migrated", "Rows": 0, "Seconds": None, "Error": None}
+    try:
+        status["Rows"] = sum(report["Rows"] for report in migrate_channel(db, channel_id, **options))
+    except Exception as e:
+        status["Status"] = "Failed"
+        status["Error"] = f"{type(e).__name__}: {e}"
+    status["Seconds"] = round(time.perf_counter() - start_time, 3)
+    return status
+
+
+def iter_migrate_channels(db, channel_ids: list, workers: int = 4, **options):
+    """
+    Migrates several channels in parallel, each on its own MySQL connection.
+    A failing channel does not stop the others.
+
+    Args:
+        db (Database): The youtube_DB database, shared by the workers.
+        channel_ids (list): Channel ids to migrate.
+        workers (int): Number of channels migrated at once.
+        **options: upsert, chunk_size, infile_threshold, pool and parquet_dir, see migrate_channel.
+
+    Yields:
+        dict: Status of each channel as it finishes: Channel_id, Status, Rows, Seconds and Error.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_migrate_channel_status, db, channel_id, **options) for channel_id in channel_ids]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def select_channels(stored_channels: dict, channel_ids: list = None, name_pattern: str = None):
+    """
+    Filters stored channels by id and by a regular expression on the channel name.
+
+    Args:
+        stored_channels (dict): Channel names keyed by channel id.
+        channel_ids (list): Channel ids to keep, None for all.
+        name_pattern (str): Regular expression the channel name must contain, None for all.
+
+    Returns:
+        list: The selected channel ids.
+    """
+    selected = []
+    for channel_id, channel_name in stored_channels.items():
+        if channel_ids is not None and channel_id not in channel_ids:
+            continue
+        if name_pattern is not None and not re.search(name_pattern, channel_name):
+            continue
+        selected.append(channel_id)
+    return selected
+
+
+# ==================================================       /     COMMAND LINE    /      =================================================== #
+def main(argv: list = None):
+    """
+    Command line entry point of the batch migration:
+
+        python migration.py --all --workers 8
+        python migration.py --channels UC1 UC2 --channels-file more_channels.txt
+        python migration.py --all --name-filter "^Tech"
+        python migration.py --all --parquet-dir parquet
+    """
+    parser = argparse.ArgumentParser(description="Migrate channels from MongoDB to the MySQL warehouse.")
+    parser.add_argument("--all", action="store_true", help="migrate every stored channel")
+    parser.add_argument("--channels", nargs="*", default=[], help="channel ids to migrate")
+    parser.add_argument("--channels-file", help="file with one channel id per line")
+    parser.add_argument("--name-filter", help="regular expression the channel name must contain")
+    parser.add_argument("--workers", type=int, default=4, help="channels migrated in parallel")
+    parser.add_argument("--no-upsert", action="store_true", help="plain INSERT instead of merging into existing rows")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="rows per executemany call")
+    parser.add_argument("--infile-threshold", type=int, default=100000, help="rows above which LOAD DATA is used")
+    parser.add_argument("--parquet-dir", help="also write the channels to this Parquet dataset, for the DuckDB engine")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on this port while running")
+    args = parser.parse_args(argv)
+
+    channel_ids = list(args.channels)
+    if args.channels_file:
+        with open(args.channels_file) as channels_file:
+            channel_ids.extend(line.strip() for line in channels_file if line.strip())
+    if not args.all and not channel_ids and not args.name_filter:
+        parser.error("choose channels with --all, --channels, --channels-file or --name-filter")
+
+    client = connect_mongo()
+    db = client["youtube_DB"]
+    selected = select_channels(list_stored_channels(db), None if args.all or not channel_ids else channel_ids, args.name_filter)
+
+    metrics_server = MetricsServer(TELEMETRY, args.metrics_port).start() if args.metrics_port else None
+    run_start = TELEMETRY.snapshot()
+    create_schema()
+    create_indexes(db)
+    failed = 0
+    for done, status in enumerate(iter_migrate_channels(db, selected, workers=args.workers, upsert=not args.no_upsert,
+                                                        chunk_size=args.chunk_size, infile_threshold=args.infile_threshold,
+                                                        parquet_dir=args.parquet_dir), start=1):
+        print(f"[{done}/{len(selected)}] {status['Channel_id']}: {status['Status']} "
+              f"({status['Rows']} rows, {status['Seconds']}s){' - ' + status['Error'] if status['Error'] else ''}")
+        failed += status["Status"] == "Failed"
+    print("Run summary:")
+    TELEMETRY.since(run_start).print_summary()
+    if metrics_server is not None:
+        metrics_server.stop()
+    client.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
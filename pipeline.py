@@ -0,0 +1,418 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[API]
+from harvester import Api_key_client, HarvestEngine, HarvestProgress
+
+#[MongoDB]
+from checkpoint import HarvestCheckpoint
+from storage import connect_mongo, create_indexes, STORAGE_LAYOUTS
+
+#[Quota]
+from quota import DEFAULT_DAILY_QUOTA, DEFAULT_MAX_COMMENTS_PER_VIDEO, QuotaLedger, plan_harvest
+
+#[Cache]
+from http_cache import ResponseCache
+
+#[Telemetry]
+from telemetry import TELEMETRY, MetricsServer
+
+#[CLI]
+import argparse
+import csv
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+# ==================================================       /     HARVEST PIPELINE    /      =================================================== #
+def harvest_channel(db, channel_id: str, engine: HarvestEngine, storage_layout: str = "normalized", incremental: bool = True,
+                    max_comments_per_video: int = None, max_comments_total: int = None, comment_chunk_size: int = 1000,
+                    progress: HarvestProgress = None, channel_data: dict = None):
+    """
+    Harvests one channel and stores it in MongoDB.
+
+    A channel that is already stored is refreshed incrementally: only new videos are
+    fetched in full and stored videos get their statistics updated. Otherwise the
+    channel is fetched in full, resuming from the checkpoint of an interrupted run.
+
+    Args:
+        db (Database): The youtube_DB database.
+        channel_id (str): Unique Youtube channel id.
+        engine (HarvestEngine): Engine sending the API requests.
+        storage_layout (str): "normalized" or "document", see STORAGE_LAYOUTS.
+        incremental (bool): Refresh stored channels instead of harvesting them again.
+        max_comments_per_video (int): Per-video comment cap, None for all comments.
+        max_comments_total (int): Comment cap across the channel, None for no cap.
+        comment_chunk_size (int): Number of comments per bulk write.
+        progress (HarvestProgress): Counts the videos and comments fetched, None to disable.
+        channel_data (dict): Channel information already collected, e.g. by HarvestEngine.resolve_channels,
+            None to request it.
+
+    Returns:
+        dict: Channel_id, Channel_name, Mode, Status ("Harvested", "Refreshed" or
+            "Invalid channel"), New videos, Updated videos, Comments, Missing video ids,
+            Skipped (videos that failed after retries, see harvester.skipped_video) and Resumed.
+    """
+    store = STORAGE_LAYOUTS[storage_layout](db)
+    comment_limits = {
+        "max_comments_per_video": max_comments_per_video,
+        "max_comments_total": max_comments_total
+    }
+    result = {
+        "Channel_id": channel_id,
+        "Channel_name": None,
+        "Mode": "Full",
+        "Status": "Invalid channel",
+        "New videos": 0,
+        "Updated videos": 0,
+        "Comments": 0,
+        "Missing video ids": [],
+        "Skipped": [],
+        "Resumed": False
+    }
+
+    # Videos already stored for the channel, empty for a new channel
+    stored_video_ids = store.get_stored_video_ids(channel_id) if incremental else []
+
+    if stored_video_ids:
+        # Fetch only new videos and the statistics of stored videos
+        result["Mode"] = "Incremental"
+        comment_writer = store.comment_writer(channel_id, chunk_size=comment_chunk_size)
+        try:
+            delta = engine.harvest_delta(channel_id, stored_video_ids, comment_writer, progress=progress,
+                                         channel_data=channel_data, **comment_limits)
+        finally:
+            # Comments fetched before a failure are kept as well
+            comment_writer.flush()
+        if delta is None:
+            return result
+
+        # Patch the stored channel in place
+        with engine.telemetry.stage("mongo_upsert", data="videos") as timing:
+            result["New videos"] = store.apply_delta(channel_id, delta)
+            timing["rows"] = result["New videos"] + len(delta["statistics"])
+        result["Updated videos"] = len(delta["statistics"])
+        result["Channel_name"] = delta["channel_stats"]["Channel_Details"]["Channel_name"]
+        result["Missing video ids"] = delta["missing_video_ids"]
+        result["Skipped"] = delta["skipped"]
+        result["Status"] = "Refreshed"
+    else:
+        # Progress saved by an earlier, interrupted run of the same channel
+        checkpoint = HarvestCheckpoint(db["harvest_checkpoints"], channel_id)
+        result["Resumed"] = checkpoint.has_progress()
+
+        # Comments are streamed to their own collection in chunks
+        comment_writer = store.comment_writer(channel_id, chunk_size=comment_chunk_size,
+                                              on_flush=checkpoint.save_comment_videos_done)
+        try:
+            fetched_data, missing_video_ids, skipped = engine.harvest(channel_id, checkpoint, comment_writer, progress=progress,
+                                                                      channel_data=channel_data, **comment_limits)
+        finally:
+            # Comments fetched before a failure are stored and checkpointed, so a resumed run skips their videos
+            comment_writer.flush()
+        if fetched_data is None:
+            return result
+
+        # insert data or create new document
+        with engine.telemetry.stage("mongo_upsert", data="videos") as timing:
+            store.store_channel(channel_id, fetched_data)
+            timing["rows"] = len(fetched_data) - 1
+
+        # The channel is stored in full, its checkpoint is no longer needed
+        checkpoint.clear()
+
+        result["New videos"] = len(fetched_data) - 1
+        result["Channel_name"] = fetched_data["Channel_Details"]["Channel_name"]
+        result["Missing video ids"] = missing_video_ids
+        result["Skipped"] = skipped
+        result["Status"] = "Harvested"
+
+    result["Comments"] = comment_writer.count
+    return result
+
+
+def _harvest_channel_status(db, channel_id: str, engine: HarvestEngine, **options):
+    # Failures are reported per channel instead of stopping the batch
+    start_time = time.perf_counter()
+    try:
+        status = harvest_channel(db, channel_id, engine, **options)
+        status["Error"] = None
+    except Exception as e:
+        status = {"Channel_id": channel_id, "Status": "Failed", "Error": f"{type(e).__name__}: {e}"}
+    status["Seconds"] = round(time.perf_counter() - start_time, 3)
+    return status
+
+
+def iter_harvest_channels(db, channel_ids: list, engine: HarvestEngine, workers: int = 2, channel_options: dict = None,
+                          **options):
+    """
+    Harvests several channels in parallel. All channels share the engine, so its
+    rate limit holds for the whole batch. A failing channel does not stop the others.
+
+    Args:
+        db (Database): The youtube_DB database.
+        channel_ids (list): Channel ids to harvest.
+        engine (HarvestEngine): Engine sending the API requests.
+        workers (int): Number of channels harvested at once.
+        channel_options (dict): Options of single channels overriding **options, keyed by channel id.
+        **options: storage_layout, incremental, comment caps and comment_chunk_size, see harvest_channel.
+
+    Yields:
+        dict: Result of each channel as it finishes, with Error and Seconds added.
+    """
+    channel_options = channel_options or {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_harvest_channel_status, db, channel_id, engine, **{**options, **channel_options.get(channel_id, {})})
+                   for channel_id in channel_ids]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def plan_harvests(db, channel_ids: list, engine: HarvestEngine, storage_layout: str = "normalized",
+                  incremental: bool = True, max_comments_per_video: int = None, channels: dict = None):
+    """
+    Sizes a batch of harvests to the quota left today, in the order given. The video
+    counts are read with one channels().list request per 50 channels, and the units
+    of the channels scheduled before each channel are reserved.
+
+    Args:
+        db (Database): The youtube_DB database.
+        channel_ids (list): Channel ids to harvest.
+        engine (HarvestEngine): Engine sending the API requests, with its quota ledger.
+        storage_layout (str): "normalized" or "document", see STORAGE_LAYOUTS.
+        incremental (bool): Stored channels are refreshed, so their stored videos cost less.
+        max_comments_per_video (int): Requested per-video comment cap, None for the default cap of plan_harvest.
+        channels (dict): Channel information already collected, keyed by channel id, see
+            HarvestEngine.get_channels_info. None to request it.
+
+    Returns:
+        list: Channel_id, Videos, Status ("Scheduled", "Resized", "Postponed" or
+            "Invalid channel"), Units and Max comments per video of each channel.
+    """
+    store = STORAGE_LAYOUTS[storage_layout](db)
+    if channels is None:
+        channels = engine.get_channels_info(channel_ids)
+    reserved_units = 0
+    plans = []
+    for channel_id in channel_ids:
+        channel_data = channels.get(channel_id)
+        if channel_data is None:
+            plans.append({"Channel_id": channel_id, "Videos": None, "Status": "Invalid channel", "Units": 0,
+                          "Max comments per video": None})
+            continue
+
+        video_count = int(channel_data["items"][0]["statistics"].get("videoCount", 0))
+        stored_video_count = len(store.get_stored_video_ids(channel_id)) if incremental else 0
+        plan = plan_harvest(video_count, engine.ledger.remaining() - reserved_units, max_comments_per_video,
+                            stored_video_count)
+        if plan["Status"] != "Postponed":
+            reserved_units += plan["Units"]
+        plans.append({"Channel_id": channel_id, "Videos": video_count, **plan})
+    return plans
+
+
+def read_channel_ids(channels: list = None, channels_file: str = None):
+    """
+    Collects channels from the command line and from a file with one channel per line,
+    as ids, handles, usernames or channel URLs. Blank lines and lines starting with # are skipped.
+
+    Returns:
+        list: Channels without duplicates, in the order given.
+    """
+    channel_ids = list(channels or [])
+    if channels_file:
+        with open(channels_file) as file:
+            channel_ids.extend(line.strip() for line in file if line.strip() and not line.startswith("#"))
+    return list(dict.fromkeys(channel_ids))
+
+
+# Columns of the combined status report of a bulk harvest
+STATUS_REPORT_COLUMNS = ["Channel", "Channel_id", "Channel_name", "Status", "New videos", "Updated videos", "Comments",
+                         "Missing videos", "Skipped videos", "Seconds", "Error"]
+
+
+def combined_status_report(references: list, channel_ids: dict, plans: list, statuses: list):
+    """
+    Merges the outcome of every stage of a bulk harvest into one row per channel given,
+    in the order given: references no channel matched, harvests postponed for quota,
+    and the result of each harvest.
+
+    Args:
+        references (list): Channels as given by the user.
+        channel_ids (dict): Channel id of each reference, see HarvestEngine.resolve_channels.
+        plans (list): Plans of the resolved channels, see plan_harvests.
+        statuses (list): Results of the harvested channels, see iter_harvest_channels.
+
+    Returns:
+        list: One row per reference, with the STATUS_REPORT_COLUMNS.
+    """
+    plans_by_id = {plan["Channel_id"]: plan for plan in plans}
+    statuses_by_id = {status["Channel_id"]: status for status in statuses}
+    report = []
+    for reference in references:
+        row = dict.fromkeys(STATUS_REPORT_COLUMNS)
+        row.update({"Channel": reference, "Channel_id": channel_ids.get(reference), "Status": "Not found"})
+        status = statuses_by_id.get(row["Channel_id"])
+        if status is not None:
+            row.update({column: status.get(column) for column in STATUS_REPORT_COLUMNS[2:] if column in status})
+            row["Missing videos"] = len(status.get("Missing video ids", []))
+            row["Skipped videos"] = len(status.get("Skipped", []))
+        elif row["Channel_id"] in plans_by_id:
+            row["Status"] = plans_by_id[row["Channel_id"]]["Status"]
+        report.append(row)
+    return report
+
+
+# ==================================================       /     COMMAND LINE    /      =================================================== #
+def build_engine(db, args):
+    # Engine of the harvest and worker commands, charging the quota ledger shared through MongoDB
+    ledger = QuotaLedger(db["api_quota"], daily_limit=args.daily_quota)
+    response_cache = ResponseCache(args.http_cache, max_age=args.cache_max_age) if args.http_cache else None
+    return HarvestEngine(Api_key_client, max_workers=args.threads, requests_per_second=args.requests_per_second,
+                         ledger=ledger, response_cache=response_cache)
+
+
+def run_job_worker(args):
+    # Runs jobs queued by the Streamlit app until stopped, see jobs.JobWorker
+    from jobs import JobQueue, JobWorker
+
+    metrics_server = MetricsServer(TELEMETRY, args.metrics_port).start() if args.metrics_port else None
+    client = connect_mongo()
+    db = client["youtube_DB"]
+    create_indexes(db)
+    queue = JobQueue(db["harvest_jobs"])
+    queue.create_indexes()
+    worker = JobWorker(db, build_engine(db, args), queue, concurrency=args.concurrency)
+    print(f"Worker {worker.worker_id} running {args.concurrency} job(s) at once")
+    worker.run(parent_pid=args.parent_pid)
+    if metrics_server is not None:
+        metrics_server.stop()
+    client.close()
+    return 0
+
+
+def main(argv: list = None):
+    """
+    Command line worker for scheduled or queued runs:
+
+        python pipeline.py harvest --channels-file channels.txt --workers 4
+        python pipeline.py migrate --all --workers 8
+        python pipeline.py worker --concurrency 2
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["migrate"]:
+        from migration import main as migrate_main
+        return migrate_main(argv[1:])
+
+    # Options of the engine, shared by the harvest and worker commands
+    engine_parser = argparse.ArgumentParser(add_help=False)
+    engine_parser.add_argument("--threads", type=int, default=8, help="API requests in flight at once")
+    engine_parser.add_argument("--requests-per-second", type=float, default=10, help="API request rate cap, 0 to disable")
+    engine_parser.add_argument("--daily-quota", type=int, default=DEFAULT_DAILY_QUOTA, help="API quota units per day")
+    engine_parser.add_argument("--http-cache", default=".http_cache", help="folder of the API response cache, empty to disable")
+    engine_parser.add_argument("--cache-max-age", type=float, default=0, help="seconds a cached response is reused without revalidation")
+    engine_parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on this port while running")
+
+    parser = argparse.ArgumentParser(description="YouTube harvest and migration worker.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("migrate", help="migrate channels from MongoDB to MySQL, see migration.py --help")
+
+    harvest_parser = subparsers.add_parser("harvest", parents=[engine_parser], help="harvest channels into MongoDB")
+    harvest_parser.add_argument("--channels", nargs="*", default=[], help="channel ids, @handles, usernames or channel URLs")
+    harvest_parser.add_argument("--channels-file", help="file with one channel per line")
+    harvest_parser.add_argument("--workers", type=int, default=2, help="channels harvested in parallel")
+    harvest_parser.add_argument("--layout", choices=list(STORAGE_LAYOUTS), default="normalized", help="MongoDB storage layout")
+    harvest_parser.add_argument("--full", action="store_true", help="harvest stored channels again in full")
+    harvest_parser.add_argument("--max-comments-per-video", type=int, help=f"per-video comment cap (default {DEFAULT_MAX_COMMENTS_PER_VIDEO}, the page the quota plan counts)")
+    harvest_parser.add_argument("--max-comments-total", type=int, help="per-channel comment cap")
+    harvest_parser.add_argument("--skipped-report", help="CSV file listing videos skipped after failed retries")
+    harvest_parser.add_argument("--status-report", help="CSV file with the outcome of every channel given")
+
+    worker_parser = subparsers.add_parser("worker", parents=[engine_parser], help="run harvests queued by the Streamlit app")
+    worker_parser.add_argument("--concurrency", type=int, default=2, help="channels harvested at once")
+    worker_parser.add_argument("--parent-pid", type=int, help="stop once this process exits")
+    args = parser.parse_args(argv)
+
+    if args.command == "worker":
+        return run_job_worker(args)
+
+    references = read_channel_ids(args.channels, args.channels_file)
+    if not references:
+        harvest_parser.error("give channels with --channels or --channels-file")
+
+    metrics_server = MetricsServer(TELEMETRY, args.metrics_port).start() if args.metrics_port else None
+    run_start = TELEMETRY.snapshot()
+    client = connect_mongo()
+    create_indexes(client["youtube_DB"])
+    engine = build_engine(client["youtube_DB"], args)
+    ledger = engine.ledger
+
+    # Channel metadata of every channel, 50 ids per request, reused by the plans and the harvests
+    channel_ids_by_reference, channels = engine.resolve_channels(references)
+    not_found = [reference for reference, channel_id in channel_ids_by_reference.items() if channel_id is None]
+    for reference in not_found:
+        print(f"{reference}: Not found")
+    channel_ids = list(dict.fromkeys(channel_id for channel_id in channel_ids_by_reference.values() if channel_id is not None))
+
+    # Harvest only what fits the quota left today
+    plans = plan_harvests(client["youtube_DB"], channel_ids, engine, storage_layout=args.layout, incremental=not args.full,
+                          max_comments_per_video=args.max_comments_per_video, channels=channels)
+    for plan in plans:
+        if plan["Status"] != "Scheduled":
+            print(f"{plan['Channel_id']}: {plan['Status']} (about {plan['Units']} units, "
+                  f"{ledger.remaining()} left today, max {plan['Max comments per video']} comments per video)")
+    channel_ids = [plan["Channel_id"] for plan in plans if plan["Status"] in ("Scheduled", "Resized")]
+    channel_options = {plan["Channel_id"]: {"channel_data": channels[plan["Channel_id"]],
+                                            "max_comments_per_video": plan["Max comments per video"]}
+                       for plan in plans if plan["Channel_id"] in channel_ids}
+
+    failed = len(not_found) + sum(plan["Status"] in ("Postponed", "Invalid channel") for plan in plans)
+    skipped = []
+    statuses = []
+    for done, status in enumerate(iter_harvest_channels(
+            client["youtube_DB"], channel_ids, engine, workers=args.workers, channel_options=channel_options,
+            storage_layout=args.layout, incremental=not args.full, max_comments_per_video=args.max_comments_per_video,
+            max_comments_total=args.max_comments_total), start=1):
+        statuses.append(status)
+        if status["Status"] in ("Harvested", "Refreshed"):
+            print(f"[{done}/{len(channel_ids)}] {status['Channel_id']}: {status['Status']} "
+                  f"({status['New videos']} new, {status['Updated videos']} updated, {status['Comments']} comments, "
+                  f"{len(status['Missing video ids'])} missing, {len(status['Skipped'])} skipped, {status['Seconds']}s)")
+            skipped.extend({"Channel_id": status["Channel_id"], **entry} for entry in status["Skipped"])
+        else:
+            failed += 1
+            print(f"[{done}/{len(channel_ids)}] {status['Channel_id']}: {status['Status']}"
+                  f"{' - ' + status['Error'] if status['Error'] else ''}")
+    print(f"API quota: {ledger.used()} of {ledger.daily_limit} units used today")
+
+    # One line per outcome across every channel given, and one row per channel in the CSV
+    status_report = combined_status_report(references, channel_ids_by_reference, plans, statuses)
+    outcome_counts = {}
+    for row in status_report:
+        outcome_counts[row["Status"]] = outcome_counts.get(row["Status"], 0) + 1
+    print(f"{len(status_report)} channel(s): " + ", ".join(f"{count} {status}" for status, count in outcome_counts.items()))
+    if args.status_report:
+        with open(args.status_report, "w", newline="") as report_file:
+            writer = csv.DictWriter(report_file, fieldnames=STATUS_REPORT_COLUMNS)
+            writer.writeheader()
+            writer.writerows(status_report)
+    print("Run summary:")
+    TELEMETRY.since(run_start).print_summary()
+
+    # An incremental run of their channels fetches videos skipped at the "videos" stage as new videos and
+    # refreshes "statistics" skips; videos skipped at the "comments" stage are stored without comments
+    # and only get them back from a --full harvest
+    if skipped:
+        print(f"{len(skipped)} video(s) skipped in {len({entry['Channel_id'] for entry in skipped})} channel(s)")
+        if args.skipped_report:
+            with open(args.skipped_report, "w", newline="") as report_file:
+                writer = csv.DictWriter(report_file, fieldnames=["Channel_id", "Video_id", "Stage", "Error"])
+                writer.writeheader()
+                writer.writerows(skipped)
+    if metrics_server is not None:
+        metrics_server.stop()
+    client.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[MongoDB]
+from pymongo import ReturnDocument
+
+#[Concurrency]
+import threading
+
+#[Date]
+import datetime
+import math
+from zoneinfo import ZoneInfo
+
+
+# ==================================================       /     QUOTA COSTS    /      =================================================== #
+# Units charged per request by the YouTube Data API, keyed by the request's method id
+QUOTA_COSTS = {
+    "youtube.channels.list": 1,
+    "youtube.playlistItems.list": 1,
+    "youtube.videos.list": 1,
+    "youtube.commentThreads.list": 1,
+    "youtube.search.list": 100
+}
+
+# Default daily quota of a Google Cloud project
+DEFAULT_DAILY_QUOTA = 10000
+
+# The daily quota resets at midnight Pacific Time
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+# Per-video comment cap of a harvest planned without one. The comment pages of new videos
+# are unknown before the harvest, so the plan counts one page of 100 threads and caps it there
+DEFAULT_MAX_COMMENTS_PER_VIDEO = 100
+
+
+def quota_day():
+    """
+    Returns:
+        str: The current quota day, e.g. "2024-01-31".
+    """
+    return datetime.datetime.now(QUOTA_TIMEZONE).date().isoformat()
+
+
+class QuotaExhausted(Exception):
+    """
+    Raised instead of sending a request that the remaining daily quota cannot pay for.
+    """
+
+
+# ==================================================       /     QUOTA LEDGER    /      =================================================== #
+class QuotaLedger:
+    """
+    Counts the quota units spent on API requests, per call type and per channel,
+    and persists the daily totals to MongoDB so that every process harvesting with
+    the same API key shares one budget. Requests are charged to the stored day
+    document with one atomic update, and every check reads it again, so the
+    Streamlit page, the job workers and CLI runs never spend more than the limit together.
+
+    Daily totals are kept as one document per quota day:
+        {"_id": "<day>", "Units": n, "Calls": {"<call type>": n}, "Channels": {"<channel id>": n}}
+
+    Args:
+        collection (Collection): MongoDB collection of daily totals, None to count in memory only.
+        daily_limit (int): Units available per quota day.
+    """
+
+    def __init__(self, collection=None, daily_limit: int = DEFAULT_DAILY_QUOTA):
+        self.collection = collection
+        self.daily_limit = daily_limit
+        self.lock = threading.Lock()
+        self.day = None
+        self.totals = None
+
+    def _empty_totals(self):
+        return {"Units": 0, "Calls": {}, "Channels": {}}
+
+    def _set_totals(self, day: str, document: dict):
+        self.day = day
+        self.totals = {**self._empty_totals(), **(document or {})}
+        self.totals.pop("_id", None)
+
+    def _load(self):
+        # Stored totals are read again every time, in memory they start over when the quota day changes
+        day = quota_day()
+        if self.collection is not None:
+            self._set_totals(day, self.collection.find_one({"_id": day}))
+        elif day != self.day:
+            self._set_totals(day, None)
+
+    def refresh(self):
+        """
+        Re-reads today's totals, picking up units spent by other processes.
+        """
+        with self.lock:
+            self._load()
+
+    def charge(self, call_type: str, channel_id: str = None, units: int = None):
+        """
+        Adds the cost of one request to today's totals before it is sent, so failed
+        requests are charged as well. A request the remaining quota cannot pay for is
+        refused and its units are taken back.
+
+        Args:
+            call_type (str): Method id of the request, e.g. "youtube.videos.list".
+            channel_id (str): Channel the request is sent for, None if unknown.
+            units (int): Units charged, looked up in QUOTA_COSTS by default.
+
+        Raises:
+            QuotaExhausted: The remaining daily quota cannot pay for the request.
+        """
+        units = QUOTA_COSTS.get(call_type, 1) if units is None else units
+        # MongoDB field names cannot contain dots
+        call_key = call_type.replace(".", "_")
+        increments = {"Units": units, f"Calls.{call_key}": units}
+        if channel_id is not None:
+            increments[f"Channels.{channel_id}"] = units
+        day = quota_day()
+
+        if self.collection is None:
+            with self.lock:
+                self._load()
+                if self.totals["Units"] + units > self.daily_limit:
+                    raise QuotaExhausted(f"Daily API quota of {self.daily_limit} units is used up, {call_type} needs {units}")
+                self.totals["Units"] += units
+                self.totals["Calls"][call_key] = self.totals["Calls"].get(call_key, 0) + units
+                if channel_id is not None:
+                    self.totals["Channels"][channel_id] = self.totals["Channels"].get(channel_id, 0) + units
+            return
+
+        document = self.collection.find_one_and_update(
+            {"_id": day}, {"$inc": increments}, upsert = True, return_document = ReturnDocument.AFTER)
+        if document["Units"] > self.daily_limit:
+            self.collection.update_one({"_id": day}, {"$inc": {key: -value for key, value in increments.items()}})
+            raise QuotaExhausted(f"Daily API quota of {self.daily_limit} units is used up, {call_type} needs {units}")
+        with self.lock:
+            self._set_totals(day, document)
+
+    def used(self):
+        """
+        Returns:
+            int: Units spent today.
+        """
+        with self.lock:
+            self._load()
+            return self.totals["Units"]
+
+    def remaining(self):
+        """
+        Returns:
+            int: Units left today, never below zero.
+        """
+        return max(0, self.daily_limit - self.used())
+
+    def check(self, call_type: str):
+        """
+        Raises QuotaExhausted if the remaining quota cannot pay for the request.
+        """
+        units = QUOTA_COSTS.get(call_type, 1)
+        if self.remaining() < units:
+            raise QuotaExhausted(f"Daily API quota of {self.daily_limit} units is used up, {call_type} needs {units}")
+
+    def report(self):
+        """
+        Returns:
+            dict: Day, Used, Limit and Remaining units, and the units spent per call type and per channel.
+        """
+        with self.lock:
+            self._load()
+            used = self.totals["Units"]
+            return {
+                "Day": self.day,
+                "Used": used,
+                "Limit": self.daily_limit,
+                "Remaining": max(0, self.daily_limit - used),
+                "Calls": {call_key.replace("_", "."): units for call_key, units in self.totals["Calls"].items()},
+                "Channels": dict(self.totals["Channels"])
+            }
+
+
+# ==================================================       /     BUDGET SCHEDULING    /      =================================================== #
+def estimate_harvest_units(video_count: int, max_comments_per_video: int = None, stored_video_count: int = 0):
+    """
+    Estimates the units a harvest spends: one channels().list request, playlist and
+    video pages of 50 ids, and the comment pages of 100 threads of every new video.
+    Without a comment cap, one comment page per video is counted; plan_harvest caps
+    such harvests at DEFAULT_MAX_COMMENTS_PER_VIDEO so they spend no more.
+
+    Args:
+        video_count (int): Videos of the channel.
+        max_comments_per_video (int): Per-video comment cap, None for no cap.
+        stored_video_count (int): Videos already stored, which only get their statistics refreshed.
+
+    Returns:
+        int: Estimated quota units.
+    """
+    new_video_count = max(0, video_count - stored_video_count)
+    comment_pages = 1 if max_comments_per_video is None else math.ceil(max_comments_per_video / 100)
+    return (1
+            + math.ceil(video_count / 50)
+            + math.ceil(new_video_count / 50)
+            + math.ceil(stored_video_count / 50)
+            + new_video_count * comment_pages)
+
+
+def plan_harvest(video_count: int, remaining_units: int, max_comments_per_video: int = None,
+                 stored_video_count: int = 0):
+    """
+    Sizes a harvest to the remaining quota. A harvest without a per-video comment cap
+    gets DEFAULT_MAX_COMMENTS_PER_VIDEO, since a streamed harvest otherwise reads every
+    comment page the estimate cannot count. If the requested comments do not fit,
+    the per-video comment cap is lowered in steps of one comment page. A harvest
+    that does not fit even with one comment page per video is postponed.
+
+    Args:
+        video_count (int): Videos of the channel.
+        remaining_units (int): Units left today.
+        max_comments_per_video (int): Requested per-video comment cap, None for no cap.
+        stored_video_count (int): Videos already stored.
+
+    Returns:
+        dict: Status ("Scheduled", "Resized" or "Postponed"), Units (the estimate)
+            and Max comments per video (the cap to harvest with).
+    """
+    if max_comments_per_video is None:
+        max_comments_per_video = DEFAULT_MAX_COMMENTS_PER_VIDEO
+    plan = {
+        "Status": "Scheduled",
+        "Units": estimate_harvest_units(video_count, max_comments_per_video, stored_video_count),
+        "Max comments per video": max_comments_per_video
+    }
+    if plan["Units"] <= remaining_units:
+        return plan
+
+    smallest_units = estimate_harvest_units(video_count, 100, stored_video_count)
+    if smallest_units > remaining_units:
+        plan["Status"] = "Postponed"
+        return plan
+
+    # Largest number of comment pages per new video that still fits
+    new_video_count = max(1, video_count - stored_video_count)
+    comment_pages = min(1 + (remaining_units - smallest_units) // new_video_count, math.ceil(max_comments_per_video / 100))
+    plan["Status"] = "Resized"
+    plan["Max comments per video"] = comment_pages * 100
+    plan["Units"] = estimate_harvest_units(video_count, comment_pages * 100, stored_video_count)
+    return plan
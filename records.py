@@ -0,0 +1,257 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[Records]
+from dataclasses import dataclass, field
+
+#[Format dtype]
+import re
+from datetime import datetime, timezone
+
+
+# ==================================================       /     FIELD PARSING    /      =================================================== #
+# ISO-8601 durations of the API, e.g. PT1H2M3S
+DURATION_PATTERN = re.compile(r"^PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?$")
+
+
+def duration_to_seconds(duration_str: str):
+    """
+    Converts a duration string in the format "PT[X]H[X]M[X]S" to seconds.
+
+    Args:
+        duration_str (str): The duration string to convert.
+
+    Returns:
+        int: The duration in seconds, or 0 if the format is invalid.
+    """
+    match = DURATION_PATTERN.match(duration_str)
+
+    if not match:
+        return 0
+    hours = int(match.group(1) or 0) * 3600
+    minutes = int(match.group(2) or 0) * 60
+    seconds = int(match.group(3) or 0)
+    return hours + minutes + seconds
+
+
+def parse_count(value):
+    """
+    Returns:
+        int: A statistics count of the API, sent as a string, or None if it is hidden or missing.
+    """
+    return int(value) if value is not None else None
+
+
+def parse_timestamp(value):
+    """
+    Parses an ISO-8601 timestamp of the API, e.g. 2022-05-01T10:00:00Z.
+
+    Returns:
+        datetime: Naive UTC datetime, as MongoDB stores it, or None if the value is missing or not a timestamp.
+    """
+    if not value:
+        return None
+    try:
+        timestamp = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def parse_video_statistics(statistics: dict):
+    """
+    Returns:
+        dict: View, like, comment and favorite counts of a video's "statistics" part, as
+            stored in the "View_count", "Like_count", "Comment_count" and "Favorite_count" fields.
+    """
+    return {
+        "View_count": parse_count(statistics.get('viewCount')),
+        "Like_count": parse_count(statistics.get('likeCount')),
+        "Comment_count": parse_count(statistics.get('commentCount')),
+        "Favorite_count": parse_count(statistics.get('favoriteCount'))
+    }
+
+
+# ==================================================       /     RECORDS    /      =================================================== #
+@dataclass(slots=True)
+class ChannelRecord:
+    """
+    Fields of a channels().list item that the warehouse uses.
+    """
+    channel_id: str
+    name: str
+    description: str
+    subscription_count: int
+    video_count: int
+    view_count: int
+    playlist_id: str
+
+    @classmethod
+    def from_api(cls, channel_id: str, channel: dict):
+        statistics = channel['statistics']
+        return cls(
+            channel_id=channel_id,
+            name=channel["snippet"]["localized"]["title"],
+            description=channel['snippet']['description'],
+            subscription_count=parse_count(statistics.get('subscriberCount')),
+            video_count=parse_count(statistics.get('videoCount')),
+            view_count=parse_count(statistics.get('viewCount')),
+            playlist_id=channel['contentDetails']['relatedPlaylists']['uploads'])
+
+    def to_document(self):
+        """
+        Returns:
+            dict: The "Channel_Details" entry of a stored channel.
+        """
+        return {
+            "Channel_name": self.name,
+            "Channel_id": self.channel_id,
+            "Channel_description": self.description,
+            "Subscription_count": self.subscription_count,
+            "Video_count": self.video_count,
+            "View_count": self.view_count,
+            "Playlist_id": self.playlist_id
+        }
+
+
+@dataclass(slots=True)
+class CommentRecord:
+    """
+    Fields of a top-level comment that the warehouse uses.
+    """
+    comment_id: str
+    video_id: str
+    text: str
+    author: str
+    published_date: datetime
+
+    @classmethod
+    def from_api(cls, video_id: str, comment_thread: dict):
+        """
+        Args:
+            video_id (str): a unique identifier of YouTube video.
+            comment_thread (dict): An item of the commentThreads().list response.
+        """
+        comment = comment_thread['snippet']['topLevelComment']['snippet']
+        return cls(
+            comment_id=comment_thread['id'],
+            video_id=video_id,
+            text=comment['textDisplay'],
+            author=comment['authorDisplayName'],
+            published_date=parse_timestamp(comment['publishedAt']))
+
+    def to_document(self):
+        """
+        Returns:
+            dict: Comment details named as the columns of the Comment table.
+        """
+        return {
+            "Comment_id": self.comment_id,
+            "Video_id": self.video_id,
+            "Comment_text": self.text,
+            "Comment_author": self.author,
+            "Comment_published_date": self.published_date
+        }
+
+    def to_entry(self):
+        """
+        Returns:
+            dict: The "Comment_ID_{j}" entry of a video in the single channel document.
+        """
+        return {
+            'Comment_ID': self.comment_id,
+            'Comment_Text': self.text,
+            'Comment_Author': self.author,
+            'Comment_PublishedAt': self.published_date
+        }
+
+
+def comments_from_response(video_id: str, comment_response: dict):
+    """
+    Returns:
+        list: CommentRecord of each thread of a commentThreads().list response, empty for None.
+    """
+    if comment_response is None:
+        return []
+    return [CommentRecord.from_api(video_id, comment_thread) for comment_thread in comment_response['items']]
+
+
+@dataclass(slots=True)
+class VideoRecord:
+    """
+    Fields of a videos().list item that the warehouse uses, parsed once when the item
+    arrives. Everything else of the item (other thumbnail sizes, tags, localizations,
+    ...) is dropped, so a harvest holds only these fields until the videos are stored.
+    """
+    video_id: str
+    name: str
+    description: str
+    thumbnail: str
+    published_date: datetime
+    duration: int
+    view_count: int
+    like_count: int
+    comment_count: int
+    favorite_count: int
+    caption_status: str
+    comments: list = field(default_factory=list)
+
+    @classmethod
+    def from_api(cls, video: dict):
+        snippet = video["snippet"]
+        content_details = video.get('contentDetails', {})
+        duration = content_details.get('duration')
+        statistics = parse_video_statistics(video.get('statistics', {}))
+        return cls(
+            video_id=video["id"],
+            name=snippet["title"],
+            description=snippet['description'],
+            thumbnail=snippet.get("thumbnails", {}).get('default', {}).get('url'),
+            published_date=parse_timestamp(snippet['publishedAt']),
+            duration=duration_to_seconds(duration) if duration is not None else None,
+            view_count=statistics["View_count"],
+            like_count=statistics["Like_count"],
+            comment_count=statistics["Comment_count"],
+            favorite_count=statistics["Favorite_count"],
+            caption_status=content_details.get('caption'))
+
+    @classmethod
+    def from_document(cls, document: dict):
+        """
+        Rebuilds a record saved with to_document, e.g. by a harvest checkpoint.
+        """
+        return cls(
+            video_id=document["Video_id"],
+            name=document["Video_name"],
+            description=document["Description"],
+            thumbnail=document["Thumbnail"],
+            published_date=document["Published_date"],
+            duration=document["Duration"],
+            view_count=document["View_count"],
+            like_count=document["Like_count"],
+            comment_count=document["Comment_count"],
+            favorite_count=document["Favorite_count"],
+            caption_status=document["Caption_status"],
+            comments=[CommentRecord(comment["Comment_ID"], document["Video_id"], comment["Comment_Text"],
+                                    comment["Comment_Author"], comment["Comment_PublishedAt"])
+                      for comment in document.get("comments", {}).values()])
+
+    def to_document(self):
+        """
+        Returns:
+            dict: The "Video_ID_{i}" entry of a stored channel, with the attached comments keyed "Comment_ID_{j}".
+        """
+        return {
+            "Video_id": self.video_id,
+            "Video_name": self.name,
+            "Description": self.description,
+            "Thumbnail": self.thumbnail,
+            "Published_date": self.published_date,
+            "Duration": self.duration,
+            "View_count": self.view_count,
+            "Like_count": self.like_count,
+            "Comment_count": self.comment_count,
+            "Favorite_count": self.favorite_count,
+            "Caption_status": self.caption_status,
+            "comments": {f"Comment_ID_{index + 1}": comment.to_entry() for index, comment in enumerate(self.comments)}
+        }
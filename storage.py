@@ -0,0 +1,391 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[MongoDB]
+import pymongo
+from pymongo import ReplaceOne, UpdateOne
+
+#[Concurrency]
+import threading
+
+#[Format data]
+from harvester import format_video_data
+from records import CommentRecord
+
+#[Telemetry]
+from telemetry import TELEMETRY, Telemetry
+
+
+# ==================================================       /     CONNECTION    /      =================================================== #
+def connect_mongo():
+    """
+    Returns:
+        MongoClient: A client connected to the MongoDB server holding youtube_DB.
+            The client keeps its own pool of connections and is safe to share between threads.
+    """
+    return pymongo.MongoClient('MONGO-CLIENT-URL')
+
+
+def create_indexes(db):
+    """
+    Creates the indexes of the comment and normalized collections if missing.
+
+    Args:
+        db (Database): The youtube_DB database.
+    """
+    db["youtube_comments"].create_index("Channel_id")
+    db["youtube_comments"].create_index("Video_id")
+    NormalizedStore(db).create_indexes()
+
+
+# ==================================================       /     CHANNEL DOCUMENT    /      =================================================== #
+def store_channel_document(collection, channel_id: str, fetched_data: dict):
+    """
+    Inserts the harvested channel as one document, replacing any stored copy.
+
+    Args:
+        collection (Collection): youtube_DB.youtube_data collection.
+        channel_id (str): Unique Youtube channel id.
+        fetched_data (dict): Channel details and "Video_ID_{i}" entries from the harvest.
+    """
+    # define the data to insert
+    final_output_data = {
+        'Channel_Name': fetched_data["Channel_Details"]["Channel_name"],
+        "Channel_data": fetched_data
+        }
+
+    # insert data or create new document
+    collection.replace_one({"_id": channel_id}, final_output_data, upsert = True)
+
+
+def get_stored_video_keys(collection, channel_id: str):
+    """
+    Reads the video ids of a stored channel without loading its videos and comments.
+
+    Args:
+        collection (Collection): youtube_DB.youtube_data collection.
+        channel_id (str): Unique Youtube channel id.
+
+    Returns:
+        dict: The "Video_ID_{i}" key of each stored video, keyed by video id.
+            Empty if the channel is not stored.
+    """
+    pipeline = [
+        {"$match": {"_id": channel_id}},
+        {"$project": {"entries": {"$objectToArray": "$Channel_data"}}},
+        {"$unwind": "$entries"},
+        {"$match": {"entries.k": {"$regex": "^Video_ID_"}}},
+        {"$project": {"key": "$entries.k", "video_id": "$entries.v.Video_id"}}
+    ]
+    return {entry["video_id"]: entry["key"] for entry in collection.aggregate(pipeline)}
+
+
+def patch_channel_document(collection, channel_id: str, video_keys: dict, delta: dict):
+    """
+    Applies an incremental harvest to the stored channel document in place.
+    Channel details and video statistics are overwritten field by field and new
+    videos are appended after the last "Video_ID_{i}" key.
+
+    Args:
+        collection (Collection): youtube_DB.youtube_data collection.
+        channel_id (str): Unique Youtube channel id.
+        video_keys (dict): Stored "Video_ID_{i}" keys by video id, from get_stored_video_keys.
+        delta (dict): Result of HarvestEngine.harvest_delta.
+
+    Returns:
+        int: Number of videos appended.
+    """
+    channel_details = delta["channel_stats"]["Channel_Details"]
+    update = {"Channel_Name": channel_details["Channel_name"]}
+    for field, value in channel_details.items():
+        update[f"Channel_data.Channel_Details.{field}"] = value
+
+    # Statistics-only refresh of stored videos
+    for video_id, statistics in delta["statistics"].items():
+        key = video_keys[video_id]
+        for field, value in statistics.items():
+            update[f"Channel_data.{key}.{field}"] = value
+
+    # New videos continue the numbering of the stored ones
+    new_video_stats = format_video_data(delta["new_videos"], start=len(video_keys) + 1)
+    for key, video in new_video_stats.items():
+        update[f"Channel_data.{key}"] = video
+
+    collection.update_one({"_id": channel_id}, {"$set": update})
+    return len(new_video_stats)
+
+
+# ==================================================       /     COMMENTS    /      =================================================== #
+class CommentWriter:
+    """
+    Buffers streamed comments and upserts them into the comments collection in
+    fixed-size chunks, so memory stays flat however many comments a video has.
+    Comments are buffered as CommentRecord and turned into documents only when written.
+    Safe to share between harvest worker threads.
+
+    Args:
+        collection (Collection): youtube_DB.youtube_comments collection.
+        channel_id (str): Unique Youtube channel id the comments belong to.
+        chunk_size (int): Number of comments per bulk write.
+        on_flush (callable): Called after each write with the videos whose comments
+            are now all stored, e.g. HarvestCheckpoint.save_comment_videos_done.
+        telemetry (Telemetry): Times each bulk write, the process-wide TELEMETRY by default.
+    """
+
+    def __init__(self, collection, channel_id: str, chunk_size: int = 1000, on_flush=None, telemetry: Telemetry = None):
+        self.collection = collection
+        self.channel_id = channel_id
+        self.chunk_size = chunk_size
+        self.on_flush = on_flush
+        self.telemetry = telemetry if telemetry is not None else TELEMETRY
+        self.lock = threading.Lock()
+        self.buffer = []
+        self.done_video_ids = []
+        self.count = 0
+
+    def add(self, comment: CommentRecord):
+        with self.lock:
+            self.buffer.append(comment)
+            if len(self.buffer) >= self.chunk_size:
+                self._flush()
+
+    def mark_done(self, video_id: str):
+        """
+        Records that every comment of the video has been added.
+        """
+        with self.lock:
+            self.done_video_ids.append(video_id)
+
+    def flush(self):
+        """
+        Writes the comments still buffered.
+        """
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        # Writes run under the lock, so a video is reported done only after all its chunks are stored
+        if self.buffer:
+            with self.telemetry.stage("mongo_upsert", data="comments") as timing:
+                self.collection.bulk_write(
+                    [ReplaceOne({"_id": comment.comment_id}, {**comment.to_document(), "Channel_id": self.channel_id}, upsert = True)
+                     for comment in self.buffer],
+                    ordered = False)
+                timing["rows"] = len(self.buffer)
+            self.count += len(self.buffer)
+            self.buffer = []
+        if self.done_video_ids and self.on_flush is not None:
+            self.on_flush(self.done_video_ids)
+        self.done_video_ids = []
+
+
+# ==================================================       /     STORAGE LAYOUTS    /      =================================================== #
+# Columns of the Video and Comment tables, read straight from MongoDB by the migration
+VIDEO_COLUMNS = ["Video_Id", "Playlist_Id", "Video_Name", "Video_Description", "Published_date", "View_Count",
+                 "Like_Count", "Favorite_Count", "Comment_Count", "Duration", "Thumbnail", "Caption_Status"]
+COMMENT_COLUMNS = ["Comment_id", "Video_id", "Comment_text", "Comment_author", "Comment_published_date"]
+
+
+class ChannelDocumentStore:
+    """
+    Stores each channel as a single document in youtube_DB.youtube_data, with videos
+    as "Video_ID_{i}" keys. Streamed comments go to youtube_DB.youtube_comments.
+
+    Args:
+        db (Database): The youtube_DB database.
+    """
+
+    def __init__(self, db):
+        self.collection = db["youtube_data"]
+        self.comments = db["youtube_comments"]
+
+    def list_channels(self):
+        """
+        Returns:
+            dict: Channel name of each stored channel, keyed by channel id.
+        """
+        return {doc["_id"]: doc["Channel_Name"] for doc in self.collection.find({}, {"Channel_Name": 1})}
+
+    def get_stored_video_ids(self, channel_id: str):
+        return list(get_stored_video_keys(self.collection, channel_id))
+
+    def store_channel(self, channel_id: str, fetched_data: dict):
+        store_channel_document(self.collection, channel_id, fetched_data)
+
+    def apply_delta(self, channel_id: str, delta: dict):
+        video_keys = get_stored_video_keys(self.collection, channel_id)
+        return patch_channel_document(self.collection, channel_id, video_keys, delta)
+
+    def comment_writer(self, channel_id: str, chunk_size: int = 1000, on_flush=None):
+        return CommentWriter(self.comments, channel_id, chunk_size, on_flush)
+
+    def iter_comments(self, channel_id: str):
+        """
+        Returns:
+            Cursor: Streamed comments of the channel, with the Comment table columns.
+        """
+        return self.comments.find({"Channel_id": channel_id}, {"_id": 0, **{column: 1 for column in COMMENT_COLUMNS}})
+
+
+class NormalizedStore:
+    """
+    Stores channels, videos and comments as separate documents in the channels,
+    videos and comments collections of youtube_DB, so no document grows with the
+    size of a channel. Videos and comments are written with bulk upserts and indexed
+    by Channel_id and Video_id, see create_indexes.
+
+    Args:
+        db (Database): The youtube_DB database.
+        chunk_size (int): Number of documents per bulk write.
+    """
+
+    def __init__(self, db, chunk_size: int = 1000):
+        self.channels = db["channels"]
+        self.videos = db["videos"]
+        self.comments = db["comments"]
+        self.chunk_size = chunk_size
+
+    def create_indexes(self):
+        self.videos.create_index([("Channel_id", 1), ("Position", 1)])
+        self.comments.create_index("Channel_id")
+        self.comments.create_index("Video_id")
+
+    def _bulk_write(self, collection, operations):
+        for start in range(0, len(operations), self.chunk_size):
+            collection.bulk_write(operations[start:start + self.chunk_size], ordered = False)
+
+    def list_channels(self):
+        """
+        Returns:
+            dict: Channel name of each stored channel, keyed by channel id.
+        """
+        return {doc["_id"]: doc["Channel_name"] for doc in self.channels.find({}, {"Channel_name": 1})}
+
+    def get_stored_video_ids(self, channel_id: str):
+        return [doc["_id"] for doc in self.videos.find({"Channel_id": channel_id}, {"_id": 1})]
+
+    def _store_videos(self, channel_details: dict, video_stats: dict, first_position: int):
+        """
+        Upserts formatted videos and any comments attached to them.
+
+        Args:
+            channel_details (dict): "Channel_Details" entry of the harvest.
+            video_stats (dict): Formatted videos keyed "Video_ID_{i}", in playlist order.
+            first_position (int): Position of the first video in the channel.
+        """
+        video_operations = []
+        comment_operations = []
+        for position, video in enumerate(video_stats.values(), start=first_position):
+            video = dict(video)
+            comments = video.pop("comments", {})
+            video_operations.append(ReplaceOne(
+                {"_id": video["Video_id"]},
+                {**video, "Channel_id": channel_details["Channel_id"],
+                 "Playlist_id": channel_details["Playlist_id"], "Position": position},
+                upsert = True))
+            for comment in comments.values():
+                comment_operations.append(ReplaceOne(
+                    {"_id": comment["Comment_ID"]},
+                    {"Comment_id": comment["Comment_ID"],
+                     "Video_id": video["Video_id"],
+                     "Comment_text": comment["Comment_Text"],
+                     "Comment_author": comment["Comment_Author"],
+                     "Comment_published_date": comment["Comment_PublishedAt"],
+                     "Channel_id": channel_details["Channel_id"]},
+                    upsert = True))
+        self._bulk_write(self.videos, video_operations)
+        self._bulk_write(self.comments, comment_operations)
+
+    def store_channel(self, channel_id: str, fetched_data: dict):
+        """
+        Upserts the harvested channel and its videos, and removes videos of the
+        channel that are no longer in the harvest, along with their comments.
+
+        Args:
+            channel_id (str): Unique Youtube channel id.
+            fetched_data (dict): Channel details and "Video_ID_{i}" entries from the harvest.
+        """
+        channel_details = fetched_data["Channel_Details"]
+        self.channels.replace_one({"_id": channel_id}, channel_details, upsert = True)
+
+        video_stats = {key: video for key, video in fetched_data.items() if key != "Channel_Details"}
+        self._store_videos(channel_details, video_stats, first_position=1)
+
+        video_ids = [video["Video_id"] for video in video_stats.values()]
+        removed_video_ids = [doc["_id"] for doc in self.videos.find(
+            {"Channel_id": channel_id, "_id": {"$nin": video_ids}}, {"_id": 1})]
+        if removed_video_ids:
+            self.videos.delete_many({"_id": {"$in": removed_video_ids}})
+            self.comments.delete_many({"Video_id": {"$in": removed_video_ids}})
+
+    def apply_delta(self, channel_id: str, delta: dict):
+        """
+        Applies an incremental harvest: channel details and video statistics are
+        updated in place and new videos are appended after the stored ones.
+
+        Args:
+            channel_id (str): Unique Youtube channel id.
+            delta (dict): Result of HarvestEngine.harvest_delta.
+
+        Returns:
+            int: Number of videos appended.
+        """
+        channel_details = delta["channel_stats"]["Channel_Details"]
+        self.channels.update_one({"_id": channel_id}, {"$set": channel_details}, upsert = True)
+
+        # Statistics-only refresh of stored videos
+        self._bulk_write(self.videos, [
+            UpdateOne({"_id": video_id}, {"$set": statistics})
+            for video_id, statistics in delta["statistics"].items()])
+
+        # New videos continue the positions of the stored ones
+        stored_count = self.videos.count_documents({"Channel_id": channel_id})
+        new_video_stats = format_video_data(delta["new_videos"], start=stored_count + 1)
+        self._store_videos(channel_details, new_video_stats, first_position=stored_count + 1)
+        return len(new_video_stats)
+
+    def comment_writer(self, channel_id: str, chunk_size: int = 1000, on_flush=None):
+        return CommentWriter(self.comments, channel_id, chunk_size, on_flush)
+
+    def read_channel(self, channel_id: str):
+        """
+        Returns:
+            dict: Channel details of the stored channel.
+        """
+        return self.channels.find_one({"_id": channel_id})
+
+    def iter_videos(self, channel_id: str):
+        """
+        Returns:
+            CommandCursor: Videos of the channel in playlist order, with the Video table columns.
+        """
+        return self.videos.aggregate([
+            {"$match": {"Channel_id": channel_id}},
+            {"$sort": {"Position": 1}},
+            {"$project": {
+                "_id": 0,
+                "Video_Id": "$Video_id",
+                "Playlist_Id": "$Playlist_id",
+                "Video_Name": "$Video_name",
+                "Video_Description": "$Description",
+                "Published_date": "$Published_date",
+                "View_Count": "$View_count",
+                "Like_Count": "$Like_count",
+                "Favorite_Count": "$Favorite_count",
+                "Comment_Count": "$Comment_count",
+                "Duration": "$Duration",
+                "Thumbnail": "$Thumbnail",
+                "Caption_Status": "$Caption_status"}}
+        ])
+
+    def iter_comments(self, channel_id: str):
+        """
+        Returns:
+            Cursor: Comments of the channel, with the Comment table columns.
+        """
+        return self.comments.find({"Channel_id": channel_id}, {"_id": 0, **{column: 1 for column in COMMENT_COLUMNS}})
+
+
+# Storage layouts selectable for a harvest
+STORAGE_LAYOUTS = {
+    "normalized": NormalizedStore,
+    "document": ChannelDocumentStore
+}
@@ -0,0 +1,273 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[Concurrency]
+import threading
+import time
+from contextlib import contextmanager
+
+#[Metrics endpoint]
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# ==================================================       /     TELEMETRY    /      =================================================== #
+# Prefix of every exported metric name
+METRIC_PREFIX = "youtube_pipeline"
+
+# Help text of the counters, exported as <prefix>_<name>_total
+COUNTER_HELP = {
+    "api_requests": "API requests sent, retries included.",
+    "api_errors": "API requests that failed.",
+    "api_retries": "API requests sent again after a transient error.",
+    "api_response_bytes": "Bytes of successful API response bodies.",
+    "api_cache_hits": "API responses served from the response cache without a request.",
+    "api_not_modified": "Cached API responses revalidated with a 304 answer."
+}
+
+# Help text of the per-stage totals, exported as <prefix>_stage_<field>_total
+STAGE_HELP = {
+    "calls": "Calls of each pipeline stage.",
+    "seconds": "Seconds spent in each pipeline stage, summed over threads.",
+    "rows": "Rows handled by each pipeline stage.",
+    "errors": "Calls of each pipeline stage that raised."
+}
+
+
+class Telemetry:
+    """
+    Thread-safe counters and per-stage timings of harvests and migrations.
+
+    A stage is one timed step, e.g. a videos().list batch or the MySQL insert of one
+    table, named by its stage name and optional labels. For each stage the calls,
+    seconds, rows handled and failed calls are added up. Seconds are summed over
+    threads, so stages running concurrently can add up to more than the wall time,
+    and a stage nested in another is counted in both. Counters hold everything else,
+    like API requests, retries and response bytes per call type.
+
+    Totals only grow, like Prometheus counters. The totals of one run are the
+    difference of two snapshots, see since.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Calls, seconds, rows and errors of each stage, keyed by (name, labels)
+        self.stages = {}
+        # Value of each counter, keyed by (name, labels)
+        self.counters = {}
+
+    @staticmethod
+    def _key(name: str, labels: dict):
+        return name, tuple(sorted(labels.items()))
+
+    @contextmanager
+    def stage(self, name: str, **labels):
+        """
+        Times a with block as one call of a stage.
+
+        Args:
+            name (str): Stage name, e.g. "get_video_info".
+            **labels: Labels telling calls of the same stage apart, e.g. table="Video".
+
+        Yields:
+            dict: Set its "rows" to the number of rows the call handled.
+        """
+        timing = {"rows": 0}
+        failed = False
+        start_time = time.perf_counter()
+        try:
+            yield timing
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.record_stage(name, time.perf_counter() - start_time, timing["rows"], failed, **labels)
+
+    def record_stage(self, name: str, seconds: float, rows: int = 0, failed: bool = False, **labels):
+        """
+        Adds one call of a stage timed by the caller.
+        """
+        key = self._key(name, labels)
+        with self.lock:
+            totals = self.stages.setdefault(key, {"calls": 0, "seconds": 0.0, "rows": 0, "errors": 0})
+            totals["calls"] += 1
+            totals["seconds"] += seconds
+            totals["rows"] += rows
+            totals["errors"] += failed
+
+    def increment(self, name: str, value: float = 1, **labels):
+        """
+        Adds to a counter, e.g. increment("api_requests", call="youtube.videos.list").
+        """
+        key = self._key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def snapshot(self):
+        """
+        Returns:
+            Telemetry: A copy of the current totals.
+        """
+        copy = Telemetry()
+        with self.lock:
+            copy.stages = {key: dict(totals) for key, totals in self.stages.items()}
+            copy.counters = dict(self.counters)
+        return copy
+
+    def since(self, snapshot: "Telemetry"):
+        """
+        Returns:
+            Telemetry: What was added since the snapshot was taken. Runs overlapping
+                in the same process are counted in each other's difference.
+        """
+        current = self.snapshot()
+        difference = Telemetry()
+        for key, totals in current.stages.items():
+            before = snapshot.stages.get(key, {})
+            totals = {field: value - before.get(field, 0) for field, value in totals.items()}
+            if totals["calls"]:
+                difference.stages[key] = totals
+        for key, value in current.counters.items():
+            if value - snapshot.counters.get(key, 0):
+                difference.counters[key] = value - snapshot.counters.get(key, 0)
+        return difference
+
+    def counter(self, name: str):
+        """
+        Returns:
+            float: Total of a counter over all its labels.
+        """
+        with self.lock:
+            return sum(value for (counter_name, _), value in self.counters.items() if counter_name == name)
+
+    def summary(self):
+        """
+        Returns:
+            list: Stage, Calls, Rows, Errors, Seconds, ms/call and Rows/sec of every stage, slowest first.
+        """
+        with self.lock:
+            stages = [(name, labels, dict(totals)) for (name, labels), totals in self.stages.items()]
+        rows = []
+        for name, labels, totals in stages:
+            rows.append({
+                "Stage": name + "".join(f" [{value}]" for _, value in labels),
+                "Calls": totals["calls"],
+                "Rows": totals["rows"],
+                "Errors": totals["errors"],
+                "Seconds": round(totals["seconds"], 3),
+                "ms/call": round(1000 * totals["seconds"] / totals["calls"], 1),
+                "Rows/sec": round(totals["rows"] / totals["seconds"]) if totals["seconds"] and totals["rows"] else None
+            })
+        return sorted(rows, key=lambda row: row["Seconds"], reverse=True)
+
+    def request_summary(self):
+        """
+        Returns:
+            list: Call type, Requests, Retries, Errors, Bytes, Cache hits and Not modified of every API call type.
+        """
+        columns = {"api_requests": "Requests", "api_retries": "Retries", "api_errors": "Errors",
+                   "api_response_bytes": "Bytes", "api_cache_hits": "Cache hits", "api_not_modified": "Not modified"}
+        calls = {}
+        with self.lock:
+            for (name, labels), value in self.counters.items():
+                if name in columns:
+                    call_type = dict(labels).get("call", "unknown")
+                    row = calls.setdefault(call_type, {"Call type": call_type, **{column: 0 for column in columns.values()}})
+                    row[columns[name]] += value
+        return sorted(calls.values(), key=lambda row: row["Call type"])
+
+    def prometheus_text(self):
+        """
+        Renders every stage total and counter in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics page.
+        """
+        with self.lock:
+            stages = {key: dict(totals) for key, totals in self.stages.items()}
+            counters = dict(self.counters)
+
+        lines = []
+        for field, help_text in STAGE_HELP.items():
+            metric = f"{METRIC_PREFIX}_stage_{field}_total"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for (name, labels), totals in sorted(stages.items()):
+                lines.append(f"{metric}{_format_labels((('stage', name),) + labels)} {totals[field]}")
+
+        for name in sorted({name for name, _ in counters}):
+            metric = f"{METRIC_PREFIX}_{name}_total"
+            lines.append(f"# HELP {metric} {COUNTER_HELP.get(name, name)}")
+            lines.append(f"# TYPE {metric} counter")
+            for (counter_name, labels), value in sorted(counters.items()):
+                if counter_name == name:
+                    lines.append(f"{metric}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def print_summary(self, file=None):
+        """
+        Prints one line per stage and per API call type, for the command line workers.
+        """
+        for row in self.summary():
+            print(f"  {row['Stage']}: {row['Calls']} calls, {row['Rows']} rows, {row['Errors']} errors, "
+                  f"{row['Seconds']}s, {row['Rows/sec'] or 0} rows/sec", file=file)
+        for row in self.request_summary():
+            print(f"  {row['Call type']}: {row['Requests']} requests, {row['Retries']} retries, {row['Errors']} errors, "
+                  f"{row['Bytes']} bytes, {row['Cache hits']} cache hits", file=file)
+
+
+def _format_labels(labels: tuple):
+    # {name="value",...} with backslashes, quotes and newlines escaped
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+
+# Telemetry of the whole process, served by the metrics endpoint
+TELEMETRY = Telemetry()
+
+
+# ==================================================       /     METRICS ENDPOINT    /      =================================================== #
+class MetricsHandler(BaseHTTPRequestHandler):
+    """
+    Serves the server's telemetry on /metrics.
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+        data = self.server.telemetry.prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """
+    Prometheus scrape endpoint on http://<host>:<port>/metrics, served from a background thread.
+
+    Args:
+        telemetry (Telemetry): Totals to serve, the process-wide TELEMETRY by default.
+        port (int): Port to listen on.
+        host (str): Address to listen on.
+    """
+    daemon_threads = True
+
+    def __init__(self, telemetry: Telemetry = None, port: int = 9464, host: str = "127.0.0.1"):
+        super().__init__((host, port), MetricsHandler)
+        self.telemetry = telemetry if telemetry is not None else TELEMETRY
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,56 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[Tests]
+import os
+import sys
+from functools import partial
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+mongomock = pytest.importorskip("mongomock")
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+
+from harvester import Api_key_client, HarvestEngine
+from mock_youtube_api import MockChannelData, MockYouTubeServer
+
+
+# ==================================================       /     FIXTURES    /      =================================================== #
+def _bulk_write(collection, requests, ordered=True, **kwargs):
+    # mongomock's bulk_write rejects the arguments newer pymongo operations pass, so each operation is applied alone
+    for request in requests:
+        if isinstance(request, ReplaceOne):
+            collection.replace_one(request._filter, request._doc, upsert=request._upsert)
+        elif isinstance(request, UpdateOne):
+            collection.update_one(request._filter, request._doc, upsert=request._upsert)
+        elif isinstance(request, UpdateMany):
+            collection.update_many(request._filter, request._doc, upsert=request._upsert)
+        elif isinstance(request, InsertOne):
+            collection.insert_one(request._doc)
+        elif isinstance(request, DeleteOne):
+            collection.delete_one(request._filter)
+        elif isinstance(request, DeleteMany):
+            collection.delete_many(request._filter)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(mongomock.collection.Collection, "bulk_write", _bulk_write)
+    return mongomock.MongoClient()["youtube_DB"]
+
+
+@pytest.fixture(scope="session")
+def mock_api():
+    server = MockYouTubeServer(MockChannelData(videos_per_channel=40, comments_per_video=5)).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def make_engine(mock_api):
+    def make(**options):
+        return HarvestEngine(partial(Api_key_client, mock_api.endpoint), max_workers=4, requests_per_second=0,
+                             backoff_base=0.01, **options)
+    return make
@@ -0,0 +1,33 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[Tests]
+import pytest
+
+from checkpoint import HarvestCheckpoint
+from quota import QuotaExhausted, QuotaLedger
+from telemetry import Telemetry
+
+
+# ==================================================       /     HARVEST CHECKPOINT    /      =================================================== #
+def test_interrupted_harvest_resumes_from_its_checkpoint(db, make_engine):
+    telemetry = Telemetry()
+    complete, _, _ = make_engine(telemetry=telemetry).harvest("UCresume")
+    full_requests = telemetry.counter("api_requests")
+
+    # The quota runs out after the channel, playlist and video requests and some comment pages
+    with pytest.raises(QuotaExhausted):
+        make_engine(ledger=QuotaLedger(daily_limit=20)).harvest("UCresume", HarvestCheckpoint(db["checkpoints"], "UCresume"))
+
+    checkpoint = HarvestCheckpoint(db["checkpoints"], "UCresume")
+    assert checkpoint.has_progress() and checkpoint.playlist["complete"]
+    saved_comment_pages = len(checkpoint.comments)
+    assert len(checkpoint.video_batches) == 1 and 0 < saved_comment_pages < 40
+
+    telemetry = Telemetry()
+    resumed, _, _ = make_engine(telemetry=telemetry).harvest("UCresume", checkpoint)
+
+    assert resumed == complete
+    # Only the comment pages the first run did not save are requested again
+    assert telemetry.counter("api_requests") == full_requests - 3 - saved_comment_pages
+
+    checkpoint.clear()
+    assert not HarvestCheckpoint(db["checkpoints"], "UCresume").has_progress()
@@ -0,0 +1,126 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[Tests]
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+pytest.importorskip("duckdb")
+
+from columnar import DUCKDB_ANALYTICS_QUERIES, DUCKDB_PAGINATED_QUERIES, DuckDBWarehouse, export_parquet
+from storage import COMMENT_COLUMNS, VIDEO_COLUMNS
+from warehouse import page_query
+
+
+# ==================================================       /     FIXTURES    /      =================================================== #
+def channel_frames(channel_id: str, videos: list):
+    """
+    Builds the migration frames of a channel, see migration.read_channel_frames.
+
+    Args:
+        channel_id (str): Unique Youtube channel id.
+        videos (list): (Video_Id, Published_date, Like_Count, Comment_Count) of each video.
+    """
+    df_channel = pd.DataFrame([{"Channel_name": f"Channel {channel_id}", "Channel_id": channel_id,
+                                "Channel_description": "", "Subscription_count": 10,
+                                "Video_count": len(videos), "View_count": 100}])
+    df_playlist = pd.DataFrame([{"Playlist_id": f"UU{channel_id}", "Channel_id": channel_id}])
+    df_video = pd.DataFrame([{"Video_Id": video_id, "Playlist_Id": f"UU{channel_id}", "Video_Name": f"Video {video_id}",
+                              "Video_Description": "", "Published_date": pd.Timestamp(published),
+                              "View_Count": 1, "Like_Count": likes, "Favorite_Count": 0, "Comment_Count": comments,
+                              "Duration": 60, "Thumbnail": "", "Caption_Status": "false"}
+                             for video_id, published, likes, comments in videos], columns=VIDEO_COLUMNS)
+    df_comment = pd.DataFrame([{"Comment_id": f"{video_id}-c", "Video_id": video_id, "Comment_text": "text",
+                                "Comment_author": "author", "Comment_published_date": pd.Timestamp(published)}
+                               for video_id, published, _, _ in videos], columns=COMMENT_COLUMNS)
+    return df_channel, df_playlist, df_video, df_comment
+
+
+@pytest.fixture
+def warehouse(tmp_path):
+    warehouse = DuckDBWarehouse(str(tmp_path))
+    yield warehouse
+    warehouse.close()
+
+
+# ==================================================       /     DUCKDB ANALYTICS    /      =================================================== #
+def test_most_liked_and_commented_questions_list_every_tied_video(tmp_path, warehouse):
+    export_parquet(str(tmp_path), *channel_frames("UCa", [("a1", "2022-01-01", 5, 3), ("a2", "2022-02-01", 5, 3),
+                                                          ("a3", "2023-01-01", 1, 2)]))
+    export_parquet(str(tmp_path), *channel_frames("UCb", [("b1", "2021-01-01", 9, 1), ("b2", "2022-01-01", 2, 4)]))
+
+    with warehouse.cursor() as cur:
+        cur.execute(DUCKDB_ANALYTICS_QUERIES[5])
+        most_liked = sorted(cur.fetchall())
+        cur.execute(DUCKDB_ANALYTICS_QUERIES[10])
+        most_commented = sorted(cur.fetchall())
+
+    assert most_liked == [("Channel UCa", "Video a1", 5), ("Channel UCa", "Video a2", 5), ("Channel UCb", "Video b1", 9)]
+    assert most_commented == [("Channel UCa", "Video a1", 3), ("Channel UCa", "Video a2", 3), ("Channel UCb", "Video b2", 4)]
+
+
+# ==================================================       /     PARQUET EXPORT    /      =================================================== #
+def test_export_replaces_the_partitions_of_a_migrated_channel(tmp_path, warehouse):
+    export_parquet(str(tmp_path), *channel_frames("UCa", [("a1", "2021-05-01", 1, 1), ("a2", "2022-05-01", 2, 2)]))
+    export_parquet(str(tmp_path), *channel_frames("UCb", [("b1", "2022-05-01", 3, 3)]))
+    assert sorted(path.name for path in (tmp_path / "video" / "Channel_id=UCa").iterdir()) == ["Year=2021", "Year=2022"]
+
+    # Migrated again without its 2021 video
+    written = export_parquet(str(tmp_path), *channel_frames("UCa", [("a2", "2022-05-01", 5, 2)]))
+
+    assert written == 2
+    assert sorted(path.name for path in (tmp_path / "video" / "Channel_id=UCa").iterdir()) == ["Year=2022"]
+    with warehouse.cursor() as cur:
+        cur.execute("SELECT Video_Id, Like_Count FROM Video ORDER BY Video_Id")
+        assert cur.fetchall() == [("a2", 5), ("b1", 3)]
+        cur.execute("SELECT Comment_id FROM Comment ORDER BY Comment_id")
+        assert cur.fetchall() == [("a2-c",), ("b1-c",)]
+    assert not (tmp_path / ".staging").exists() or not any((tmp_path / ".staging").iterdir())
+
+
+def test_export_drops_rows_without_a_partition(tmp_path, caplog):
+    df_channel, df_playlist, df_video, df_comment = channel_frames("UCa", [("a1", "2022-05-01", 1, 1),
+                                                                          ("a2", "2022-06-01", 1, 1)])
+    df_video.loc[1, "Published_date"] = pd.NaT
+    orphan = pd.DataFrame([{"Comment_id": "x-c", "Video_id": "gone", "Comment_text": "text", "Comment_author": "author",
+                            "Comment_published_date": pd.Timestamp("2022-01-01")}])
+    df_comment = pd.concat([df_comment, orphan], ignore_index=True)
+
+    with caplog.at_level("WARNING", logger="columnar"):
+        written = export_parquet(str(tmp_path), df_channel, df_playlist, df_video, df_comment)
+
+    assert written == 1 + 2
+    assert "drops 1 video row(s)" in caplog.text and "drops 1 comment row(s)" in caplog.text
+    for table in ["video", "comment"]:
+        assert [path.name for path in (tmp_path / table).iterdir()] == ["Channel_id=UCa"]
+    assert [path.name for path in (tmp_path / "video" / "Channel_id=UCa").iterdir()] == ["Year=2022"]
+
+
+# ==================================================       /     DUCKDB QUESTIONS    /      =================================================== #
+def test_duckdb_questions_answer_from_the_exported_channels(tmp_path, warehouse):
+    export_parquet(str(tmp_path), *channel_frames("UCa", [("a1", "2021-05-01", 5, 1), ("a2", "2022-05-01", 2, 2),
+                                                          ("a3", "2022-07-01", 1, 0)]))
+    export_parquet(str(tmp_path), *channel_frames("UCb", [("b1", "2023-05-01", 3, 3)]))
+
+    with warehouse.cursor() as cur:
+        cur.execute(DUCKDB_ANALYTICS_QUERIES[2])
+        assert cur.fetchall() == [("Channel UCa", 3)]
+        cur.execute(DUCKDB_ANALYTICS_QUERIES[8])
+        assert sorted(row[1] for row in cur.fetchall()) == ["Video a2", "Video a3"]
+        cur.execute(DUCKDB_ANALYTICS_QUERIES[9])
+        assert sorted(cur.fetchall()) == [("Channel UCa", "00:01:00"), ("Channel UCb", "00:01:00")]
+
+        query = DUCKDB_PAGINATED_QUERIES[1]
+        sql, params = page_query(query, page_size=2, placeholder="?")
+        cur.execute(sql, params)
+        first_page = cur.fetchall()
+        sql, params = page_query(query, tuple(first_page[-1][2:]), page_size=2, placeholder="?")
+        cur.execute(sql, params)
+        second_page = cur.fetchall()
+    assert [row[:2] for row in first_page + second_page] == [
+        ("Channel UCa", "Video a1"), ("Channel UCa", "Video a2"), ("Channel UCa", "Video a3"), ("Channel UCb", "Video b1")]
+
+    # A new migration is picked up by the next cursor
+    export_parquet(str(tmp_path), *channel_frames("UCc", [("c1", "2022-01-01", 1, 1)]))
+    with warehouse.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM Channel")
+        assert cur.fetchone() == (3,)
@@ -0,0 +1,68 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[Tests]
+import pytest
+from functools import partial
+
+from harvester import Api_key_client, HarvestEngine, parse_channel_reference
+from http_cache import ResponseCache
+from mock_youtube_api import MockChannelData, MockYouTubeServer
+from telemetry import Telemetry
+
+
+# ==================================================       /     HARVEST ENGINE    /      =================================================== #
+def test_revalidated_responses_are_not_counted_as_errors(make_engine, tmp_path):
+    telemetry = Telemetry()
+    engine = make_engine(response_cache=ResponseCache(str(tmp_path)), telemetry=telemetry)
+    first, _, _ = engine.harvest("UCcache")
+
+    # Cached responses are revalidated, and the mock API answers 304 Not Modified
+    second, _, _ = engine.harvest("UCcache")
+
+    assert second == first
+    assert telemetry.counter("api_not_modified") > 0
+    assert telemetry.counter("api_errors") == 0
+
+
+def test_comment_cap_stops_before_requesting_the_next_page():
+    server = MockYouTubeServer(MockChannelData(comments_per_video=250)).start()
+    telemetry = Telemetry()
+    try:
+        engine = HarvestEngine(partial(Api_key_client, server.endpoint), requests_per_second=0, telemetry=telemetry)
+        # The cap fills the first page of 100 threads exactly
+        comments = list(engine.iter_video_comments("UCcap-1", max_comments=100))
+    finally:
+        server.stop()
+
+    assert len(comments) == 100
+    assert telemetry.counter("api_requests") == 1
+
+
+# ==================================================       /     CHANNEL REFERENCES    /      =================================================== #
+@pytest.mark.parametrize("reference, expected", [
+    ("UC_x5XG1OV2P6uZZ5FSM9Ttw", ("id", "UC_x5XG1OV2P6uZZ5FSM9Ttw")),
+    (" https://www.youtube.com/channel/UC_x5XG1OV2P6uZZ5FSM9Ttw?view=0 ", ("id", "UC_x5XG1OV2P6uZZ5FSM9Ttw")),
+    ("@GoogleDevelopers", ("handle", "@GoogleDevelopers")),
+    ("youtube.com/@GoogleDevelopers/videos", ("handle", "@GoogleDevelopers")),
+    ("https://m.youtube.com/c/GoogleDevelopers", ("handle", "@GoogleDevelopers")),
+    ("https://www.youtube.com/user/GoogleDevelopers", ("username", "GoogleDevelopers")),
+    ("GoogleDevelopers", ("username", "GoogleDevelopers")),
+    # Too short for a channel id
+    ("UCshort", ("username", "UCshort"))
+])
+def test_parse_channel_reference(reference, expected):
+    assert parse_channel_reference(reference) == expected
+
+
+def test_channel_ids_are_resolved_fifty_per_request(make_engine):
+    telemetry = Telemetry()
+    engine = make_engine(telemetry=telemetry)
+    channel_ids = [f"UC{number:022d}" for number in range(60)]
+    references = channel_ids + ["@handle", "UCinvalid000000000000000"]
+
+    resolved, channels = engine.resolve_channels(references)
+
+    # 2 id batches, and 1 handle lookup
+    assert telemetry.counter("api_requests") == 3
+    assert [resolved[channel_id] for channel_id in channel_ids] == channel_ids
+    assert resolved["@handle"] == "UChandle" and resolved["UCinvalid000000000000000"] is None
+    assert set(channels) == set(channel_ids) | {"UChandle"}
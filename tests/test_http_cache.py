@@ -0,0 +1,17 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[Tests]
+import os
+
+from http_cache import ResponseCache
+
+
+# ==================================================       /     RESPONSE CACHE    /      =================================================== #
+def test_caches_sharing_a_folder_stay_under_max_bytes(tmp_path):
+    # The Streamlit process and two job workers, each with its own ResponseCache
+    max_bytes = 20000
+    caches = [ResponseCache(str(tmp_path), max_bytes=max_bytes) for _ in range(3)]
+    for number in range(300):
+        caches[number % 3].set(f"https://example.com/videos?id={number}", {"items": ["x" * 900]}, etag=str(number))
+
+    folder_bytes = sum(entry.stat().st_size for entry in os.scandir(tmp_path) if entry.name.endswith(".json"))
+    assert folder_bytes <= max_bytes * 1.3
@@ -0,0 +1,22 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[Tests]
+from jobs import JobQueue
+
+
+# ==================================================       /     JOB QUEUE    /      =================================================== #
+def test_enqueue_keeps_one_active_job_per_channel(db):
+    queue = JobQueue(db["harvest_jobs"])
+    queue.create_indexes()
+
+    job_id = queue.enqueue("UCjob")
+    assert queue.enqueue("UCjob", {"storage_layout": "document"}) == job_id
+    assert queue.enqueue("UCother") != job_id
+
+    # Claimed jobs are still active, finished ones make room for a new job of the channel
+    claimed = queue.claim("worker")
+    assert claimed["_id"] == job_id and queue.enqueue("UCjob") == job_id
+    queue.finish(job_id, result={}, progress=None, run_summary=None)
+    new_job_id = queue.enqueue("UCjob")
+    assert new_job_id != job_id
+    assert db["harvest_jobs"].count_documents({"Channel_id": "UCjob"}) == 2
+    assert queue.get(new_job_id)["Status"] == "Queued"
@@ -0,0 +1,56 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[Tests]
+from migration import flatten_channel_document, read_channel_frames
+from pipeline import harvest_channel
+from storage import COMMENT_COLUMNS, VIDEO_COLUMNS
+
+
+# ==================================================       /     FIXTURES    /      =================================================== #
+def document_video(video_id: str, comment_ids: list):
+    return {
+        "Video_id": video_id, "Video_name": f"Name {video_id}", "Description": "", "Published_date": "2024-01-31T10:00:00Z",
+        "View_count": 10, "Like_count": None, "Favorite_count": 0, "Comment_count": len(comment_ids),
+        "Duration": 61, "Thumbnail": "https://i.ytimg.com/vi/default.jpg", "Caption_status": "false",
+        "comments": {
+            f"Comment_ID_{j}": {"Comment_ID": comment_id, "Comment_Text": f"Text {comment_id}",
+                                "Comment_Author": "Author", "Comment_PublishedAt": "2024-02-01T10:00:00Z"}
+            for j, comment_id in enumerate(comment_ids, 1)
+        }
+    }
+
+
+# ==================================================       /     MONGODB TO DATAFRAME    /      =================================================== #
+def test_flatten_channel_document_builds_video_and_comment_frames():
+    channel_data = {
+        "Channel_Details": {"Channel_name": "Channel", "Playlist_id": "UUflat"},
+        "Video_ID_1": document_video("v1", ["c1", "c2"]),
+        "Video_ID_2": document_video("v2", []),
+        "Video_ID_3": document_video("v3", ["c3"])
+    }
+    df_video, df_comment = flatten_channel_document(channel_data)
+
+    assert list(df_video.columns) == VIDEO_COLUMNS and list(df_comment.columns) == COMMENT_COLUMNS
+    assert df_video["Video_Id"].tolist() == ["v1", "v2", "v3"]
+    assert set(df_video["Playlist_Id"]) == {"UUflat"}
+    assert df_video.loc[0, "Video_Name"] == "Name v1" and df_video["Like_Count"].isna().all()
+    assert df_comment[["Comment_id", "Video_id"]].values.tolist() == [["c1", "v1"], ["c2", "v1"], ["c3", "v3"]]
+    assert df_comment.loc[2, "Comment_text"] == "Text c3"
+
+
+def test_flatten_channel_document_without_videos():
+    df_video, df_comment = flatten_channel_document({"Channel_Details": {"Playlist_id": "UUempty"}})
+    assert df_video.empty and df_comment.empty
+    assert list(df_video.columns) == VIDEO_COLUMNS
+
+
+def test_harvested_document_is_read_into_frames(db, make_engine, mock_api):
+    mock_api.data.channel_sizes["UCflat"] = 12
+    try:
+        harvest_channel(db, "UCflat", make_engine(), storage_layout="document")
+    finally:
+        del mock_api.data.channel_sizes["UCflat"]
+
+    df_channel, df_playlist, df_video, df_comment = read_channel_frames(db, "UCflat")
+    assert len(df_video) == 12 and df_video["Video_Id"].is_unique
+    assert len(df_comment) == 12 * 5 and df_comment["Comment_id"].is_unique
+    assert set(df_comment["Video_id"]) == set(df_video["Video_Id"])
@@ -0,0 +1,51 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[Tests]
+import pytest
+
+from checkpoint import HarvestCheckpoint
+from pipeline import harvest_channel
+from quota import QuotaExhausted, QuotaLedger
+from telemetry import Telemetry
+
+
+# ==================================================       /     HARVEST PIPELINE    /      =================================================== #
+def test_comments_fetched_before_quota_runs_out_are_stored_and_checkpointed(db, make_engine):
+    # 1 channels().list, 1 playlistItems().list and 1 videos().list request, then one comment page per video
+    engine = make_engine(ledger=QuotaLedger(daily_limit=20))
+
+    with pytest.raises(QuotaExhausted):
+        harvest_channel(db, "UCquota", engine, storage_layout="normalized", comment_chunk_size=1000)
+
+    stored_video_ids = set(db["comments"].distinct("Video_id"))
+    done_video_ids = HarvestCheckpoint(db["harvest_checkpoints"], "UCquota").comment_videos_done
+    assert db["comments"].count_documents({}) == 5 * len(stored_video_ids) > 0
+    assert done_video_ids == stored_video_ids
+
+
+def test_stored_channel_is_refreshed_incrementally(db, make_engine, mock_api):
+    mock_api.data.channel_sizes["UCdelta"] = 30
+    try:
+        engine = make_engine()
+        first = harvest_channel(db, "UCdelta", engine, storage_layout="document")
+        # A stored count the refresh overwrites
+        db["youtube_data"].update_one({"_id": "UCdelta"}, {"$set": {"Channel_data.Video_ID_1.View_count": -1}})
+
+        mock_api.data.channel_sizes["UCdelta"] = 35
+        telemetry = Telemetry()
+        engine.telemetry = telemetry
+        second = harvest_channel(db, "UCdelta", engine, storage_layout="document")
+    finally:
+        del mock_api.data.channel_sizes["UCdelta"]
+
+    assert (first["Mode"], first["New videos"]) == ("Full", 30)
+    assert (second["Mode"], second["Status"], second["New videos"], second["Updated videos"]) == ("Incremental", "Refreshed", 5, 30)
+    assert second["Comments"] == 5 * 5
+    # 1 channel, 1 playlist page, 1 page of new videos, 1 statistics page and 5 comment pages
+    assert telemetry.counter("api_requests") == 9
+
+    channel_data = db["youtube_data"].find_one({"_id": "UCdelta"})["Channel_data"]
+    video_keys = [key for key in channel_data if key.startswith("Video_ID_")]
+    assert len(video_keys) == 35
+    assert [channel_data[f"Video_ID_{i}"]["Video_id"] for i in range(31, 36)] == [f"UCdelta-{i}" for i in range(30, 35)]
+    assert channel_data["Video_ID_1"]["View_count"] >= 0
+    assert channel_data["Channel_Details"]["Video_count"] == 35
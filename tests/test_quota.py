@@ -0,0 +1,61 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[Tests]
+from functools import partial
+
+import pytest
+
+from harvester import Api_key_client, HarvestEngine
+from mock_youtube_api import MockChannelData, MockYouTubeServer
+from pipeline import harvest_channel, plan_harvests
+from quota import QuotaExhausted, QuotaLedger, plan_harvest
+
+
+# ==================================================       /     QUOTA LEDGER    /      =================================================== #
+def test_ledgers_sharing_a_collection_share_one_budget(db):
+    # Two processes, e.g. two job workers, charging the same stored day document
+    ledger_a = QuotaLedger(db["api_quota"], daily_limit=5)
+    ledger_b = QuotaLedger(db["api_quota"], daily_limit=5)
+    for _ in range(3):
+        ledger_a.charge("youtube.videos.list", "UCa")
+    for _ in range(2):
+        ledger_b.charge("youtube.commentThreads.list", "UCb")
+
+    with pytest.raises(QuotaExhausted):
+        ledger_a.charge("youtube.videos.list", "UCa")
+    with pytest.raises(QuotaExhausted):
+        ledger_b.check("youtube.videos.list")
+
+    # The refused request is not charged
+    report = ledger_b.report()
+    assert report["Used"] == 5 and report["Remaining"] == 0
+    assert report["Channels"] == {"UCa": 3, "UCb": 2}
+    assert ledger_a.remaining() == 0
+
+
+# ==================================================       /     BUDGET SCHEDULING    /      =================================================== #
+def test_plan_harvest_sizes_harvests_to_the_remaining_quota():
+    # 1 channels().list + 2 playlist pages + 2 video pages + 1 comment page for each of 100 videos
+    assert plan_harvest(100, 1000) == {"Status": "Scheduled", "Units": 105, "Max comments per video": 100}
+    assert plan_harvest(100, 1000, max_comments_per_video=500) == {"Status": "Scheduled", "Units": 505,
+                                                                     "Max comments per video": 500}
+    assert plan_harvest(100, 300, max_comments_per_video=500) == {"Status": "Resized", "Units": 205,
+                                                                    "Max comments per video": 200}
+    assert plan_harvest(100, 104)["Status"] == "Postponed"
+    # Stored videos only cost their statistics pages
+    assert plan_harvest(100, 1000, stored_video_count=90)["Units"] == 1 + 2 + 1 + 2 + 10
+
+
+def test_uncapped_harvest_spends_no_more_than_planned(db):
+    server = MockYouTubeServer(MockChannelData(videos_per_channel=10, comments_per_video=250)).start()
+    try:
+        engine = HarvestEngine(partial(Api_key_client, server.endpoint), max_workers=4, requests_per_second=0,
+                               ledger=QuotaLedger(db["api_quota"]))
+        plan = plan_harvests(db, ["UCplan"], engine)[0]
+        units_before = engine.ledger.used()
+        result = harvest_channel(db, "UCplan", engine, max_comments_per_video=plan["Max comments per video"])
+    finally:
+        server.stop()
+
+    assert plan["Status"] == "Scheduled" and plan["Max comments per video"] == 100
+    assert result["Comments"] == 10 * 100
+    assert engine.ledger.used() - units_before <= plan["Units"]
@@ -0,0 +1,99 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[Tests]
+import pytest
+from datetime import datetime
+
+from records import (ChannelRecord, CommentRecord, VideoRecord, comments_from_response, duration_to_seconds,
+                     parse_count, parse_timestamp)
+
+
+# ==================================================       /     FIXTURES    /      =================================================== #
+def api_video(**statistics):
+    return {
+        "id": "v1",
+        "snippet": {"title": "Title", "description": "About", "publishedAt": "2022-05-01T10:00:00Z",
+                    "thumbnails": {"default": {"url": "https://i.ytimg.com/vi/v1/default.jpg"},
+                                   "high": {"url": "https://i.ytimg.com/vi/v1/hqdefault.jpg"}},
+                    "tags": ["dropped"]},
+        "contentDetails": {"duration": "PT1H2M3S", "caption": "true"},
+        "statistics": statistics
+    }
+
+
+def api_comment_thread(comment_id: str):
+    return {"id": comment_id, "snippet": {"topLevelComment": {"snippet": {
+        "textDisplay": f"Text {comment_id}", "authorDisplayName": "Author", "publishedAt": "2022-05-02T10:00:00+02:00"}}}}
+
+
+# ==================================================       /     FIELD PARSING    /      =================================================== #
+@pytest.mark.parametrize("duration, seconds", [
+    ("PT1H2M3S", 3723), ("PT15M", 900), ("PT42S", 42), ("PT2H", 7200), ("P1DT2H", 0), ("", 0)
+])
+def test_duration_to_seconds(duration, seconds):
+    assert duration_to_seconds(duration) == seconds
+
+
+def test_parse_count_keeps_hidden_counts_missing():
+    assert parse_count("1234") == 1234
+    assert parse_count(None) is None
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2022-05-01T10:00:00Z", datetime(2022, 5, 1, 10)),
+    ("2022-05-01T12:30:00+02:00", datetime(2022, 5, 1, 10, 30)),
+    ("2022-05-01T10:00:00", datetime(2022, 5, 1, 10)),
+    ("yesterday", None), ("", None), (None, None)
+])
+def test_parse_timestamp_returns_naive_utc(value, expected):
+    assert parse_timestamp(value) == expected
+
+
+# ==================================================       /     RECORDS    /      =================================================== #
+def test_video_record_keeps_the_used_fields_typed():
+    video = VideoRecord.from_api(api_video(viewCount="10", likeCount="2", commentCount="1", favoriteCount="0"))
+
+    assert (video.video_id, video.name, video.duration, video.caption_status) == ("v1", "Title", 3723, "true")
+    assert video.thumbnail == "https://i.ytimg.com/vi/v1/default.jpg"
+    assert video.published_date == datetime(2022, 5, 1, 10)
+    assert (video.view_count, video.like_count, video.comment_count, video.favorite_count) == (10, 2, 1, 0)
+    assert not hasattr(video, "__dict__")
+
+
+def test_video_record_with_hidden_statistics():
+    item = api_video(viewCount="10")
+    del item["contentDetails"]
+    video = VideoRecord.from_api(item)
+
+    assert video.like_count is None and video.comment_count is None
+    assert video.duration is None and video.caption_status is None
+
+
+def test_video_document_round_trip_through_mongodb(db):
+    video = VideoRecord.from_api(api_video(viewCount="10", likeCount="2", commentCount="2", favoriteCount="0"))
+    video.comments = comments_from_response("v1", {"items": [api_comment_thread("c1"), api_comment_thread("c2")]})
+
+    db["records"].insert_one({"_id": "v1", **video.to_document()})
+    stored = db["records"].find_one({"_id": "v1"})
+
+    assert stored["comments"]["Comment_ID_2"] == {"Comment_ID": "c2", "Comment_Text": "Text c2", "Comment_Author": "Author",
+                                                  "Comment_PublishedAt": datetime(2022, 5, 2, 8)}
+    assert VideoRecord.from_document(stored) == video
+
+
+def test_comment_record_is_named_as_the_comment_table():
+    comment = CommentRecord.from_api("v1", api_comment_thread("c1"))
+    assert comment.to_document() == {"Comment_id": "c1", "Video_id": "v1", "Comment_text": "Text c1",
+                                     "Comment_author": "Author", "Comment_published_date": datetime(2022, 5, 2, 8)}
+    assert comments_from_response("v1", None) == []
+
+
+def test_channel_record_is_the_channel_details_entry():
+    channel = ChannelRecord.from_api("UCrecord", {
+        "snippet": {"localized": {"title": "Channel"}, "description": "About"},
+        "contentDetails": {"relatedPlaylists": {"uploads": "UUrecord"}},
+        # Hidden subscriber count
+        "statistics": {"videoCount": "3", "viewCount": "300", "hiddenSubscriberCount": True}
+    })
+    assert channel.to_document() == {"Channel_name": "Channel", "Channel_id": "UCrecord", "Channel_description": "About",
+                                     "Subscription_count": None, "Video_count": 3, "View_count": 300,
+                                     "Playlist_id": "UUrecord"}
@@ -0,0 +1,44 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[Tests]
+from storage import NormalizedStore
+
+
+# ==================================================       /     NORMALIZED STORE    /      =================================================== #
+def test_store_channel_removes_comments_of_removed_videos(db, make_engine):
+    store = NormalizedStore(db)
+    fetched_data, _, _ = make_engine().harvest("UCstore")
+    store.store_channel("UCstore", fetched_data)
+    removed_video_id = fetched_data.pop("Video_ID_1")["Video_id"]
+    assert db["comments"].count_documents({"Video_id": removed_video_id}) > 0
+
+    store.store_channel("UCstore", fetched_data)
+
+    assert db["videos"].count_documents({"_id": removed_video_id}) == 0
+    assert db["comments"].count_documents({"Video_id": removed_video_id}) == 0
+    assert db["comments"].count_documents({}) > 0
+
+
+def test_apply_delta_appends_new_videos_and_refreshes_statistics(db, make_engine, mock_api):
+    store = NormalizedStore(db)
+    mock_api.data.channel_sizes["UCnorm"] = 30
+    try:
+        engine = make_engine()
+        fetched_data, _, _ = engine.harvest("UCnorm")
+        store.store_channel("UCnorm", fetched_data)
+        db["videos"].update_one({"_id": "UCnorm-0"}, {"$set": {"Like_count": -1}})
+
+        mock_api.data.channel_sizes["UCnorm"] = 33
+        delta = engine.harvest_delta("UCnorm", store.get_stored_video_ids("UCnorm"))
+    finally:
+        del mock_api.data.channel_sizes["UCnorm"]
+
+    assert len(delta["statistics"]) == 30 and [video.video_id for video in delta["new_videos"]] == ["UCnorm-30", "UCnorm-31", "UCnorm-32"]
+    assert store.apply_delta("UCnorm", delta) == 3
+
+    videos = list(db["videos"].find({"Channel_id": "UCnorm"}).sort("Position", 1))
+    assert [video["Position"] for video in videos] == list(range(1, 34))
+    assert [video["_id"] for video in videos[-3:]] == ["UCnorm-30", "UCnorm-31", "UCnorm-32"]
+    assert videos[0]["Like_count"] >= 0
+    assert db["channels"].find_one({"_id": "UCnorm"})["Video_count"] == 33
+    # First-page comments attached to the new videos are stored as well
+    assert db["comments"].count_documents({"Video_id": {"$in": ["UCnorm-30", "UCnorm-31", "UCnorm-32"]}}) == 15
@@ -0,0 +1,202 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[Tests]
+import pytest
+
+#[Data]
+import pandas as pd
+import pymysql
+
+duckdb = pytest.importorskip("duckdb")
+
+from warehouse import PAGINATED_QUERIES, QueryCache, bulk_load, count_query, full_query, page_query
+
+
+# ==================================================       /     FIXTURES    /      =================================================== #
+@pytest.fixture
+def connection():
+    # The warehouse tables the paginated questions read, in an in-memory DuckDB database
+    connection = duckdb.connect()
+    connection.execute("CREATE TABLE Channel (Channel_id VARCHAR, Channel_name VARCHAR)")
+    connection.execute("CREATE TABLE Playlist (Playlist_id VARCHAR, Channel_id VARCHAR)")
+    connection.execute("""CREATE TABLE Video (Video_Id VARCHAR, Playlist_Id VARCHAR, Video_Name VARCHAR,
+                                              Like_Count BIGINT, Comment_Count BIGINT)""")
+    for channel in ["b", "a"]:
+        connection.execute("INSERT INTO Channel VALUES (?, ?)", (f"UC{channel}", f"Channel {channel}"))
+        connection.execute("INSERT INTO Playlist VALUES (?, ?)", (f"UU{channel}", f"UC{channel}"))
+        for number in range(7):
+            # Repeated names, so pages also break between videos of the same name
+            connection.execute("INSERT INTO Video VALUES (?, ?, ?, ?, ?)",
+                               (f"{channel}{number}", f"UU{channel}", f"Video {number % 3}", None, number))
+    yield connection
+    connection.close()
+
+
+class RecordingConnection:
+    """
+    Stands in for a pymysql connection: records every statement, the rows of
+    executemany calls and the lines of LOAD DATA files, and can refuse local files.
+    Statements starting with a key of row_counts return its row count.
+    """
+
+    def __init__(self, local_infile: bool = True, row_counts: dict = None):
+        self.local_infile = local_infile
+        self.row_counts = row_counts or {}
+        self.statements = []
+        self.batches = []
+        self.infile_lines = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql, params=None):
+        sql = " ".join(sql.split())
+        self.statements.append(sql)
+        if sql.startswith("LOAD DATA"):
+            if not self.local_infile:
+                raise pymysql.err.OperationalError(3948, "Loading local data is disabled")
+            with open(params[0], encoding="utf-8") as csv_file:
+                self.infile_lines = csv_file.read().splitlines()
+        return next((count for prefix, count in self.row_counts.items() if sql.startswith(prefix)), 0)
+
+    def executemany(self, sql, rows):
+        self.statements.append(sql)
+        self.batches.append(list(rows))
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.fixture
+def videos():
+    return pd.DataFrame({"Video_Id": ["v1", "v2", "v3"],
+                         "Video_Name": ['Say "hi"', "Two", None],
+                         "Like_Count": [1, None, 3]})
+
+
+# ==================================================       /     BULK LOAD    /      =================================================== #
+def test_bulk_load_inserts_in_chunks_with_missing_values_as_null(videos):
+    connection = RecordingConnection()
+    stats = bulk_load(connection, "Video", videos, chunk_size=2)
+
+    assert connection.statements[0] == "INSERT INTO Video (Video_Id, Video_Name, Like_Count) VALUES (%s,%s,%s)"
+    assert connection.batches == [[("v1", 'Say "hi"', 1.0), ("v2", "Two", None)], [("v3", None, 3.0)]]
+    assert connection.commits == 1 and connection.rollbacks == 0
+    assert stats["Method"] == "executemany" and stats["Rows"] == stats["Inserted"] == 3
+
+
+def test_bulk_load_uses_load_data_above_the_threshold(videos):
+    connection = RecordingConnection()
+    stats = bulk_load(connection, "Video", videos, infile_threshold=2)
+
+    assert stats["Method"] == "LOAD DATA" and not connection.batches
+    assert connection.infile_lines == ['"v1","Say ""hi""","1.0"', '"v2","Two",NULL', '"v3",NULL,"3.0"']
+
+
+def test_bulk_load_falls_back_to_executemany_without_local_infile(videos):
+    connection = RecordingConnection(local_infile=False)
+    stats = bulk_load(connection, "Video", videos, infile_threshold=2)
+
+    assert stats["Method"] == "executemany" and sum(map(len, connection.batches)) == 3
+    assert connection.rollbacks == 1 and connection.commits == 1
+
+
+def test_upsert_merges_a_deduplicated_staging_table(videos):
+    connection = RecordingConnection(row_counts={"UPDATE": 1, "INSERT INTO Video": 1})
+    stale_row = videos.iloc[[0]].assign(Video_Name="Old name")
+    stats = bulk_load(connection, "Video", pd.concat([stale_row, videos]), upsert=True)
+
+    create, load, update, insert = connection.statements[1:5]
+    assert connection.statements[0] == "DROP TEMPORARY TABLE IF EXISTS stage_Video"
+    assert create == "CREATE TEMPORARY TABLE stage_Video LIKE Video"
+    assert load.startswith("INSERT INTO stage_Video ")
+    # The last row of a repeated primary key is kept
+    assert [row[:2] for row in connection.batches[0]] == [("v1", 'Say "hi"'), ("v2", "Two"), ("v3", None)]
+    # Only rows whose values differ are updated, NULL-safe
+    assert update.endswith("WHERE NOT (T.Video_Name <=> S.Video_Name AND T.Like_Count <=> S.Like_Count)")
+    assert "SET T.Video_Name = S.Video_Name, T.Like_Count = S.Like_Count" in update
+    assert insert.endswith("WHERE NOT EXISTS (SELECT 1 FROM Video AS T WHERE T.Video_Id = S.Video_Id)")
+    assert connection.statements[5] == "DROP TEMPORARY TABLE stage_Video"
+    assert (stats["Rows"], stats["Updated"], stats["Inserted"], stats["Unchanged"]) == (3, 1, 1, 1)
+    assert connection.commits == 1
+
+
+def test_failed_upsert_is_rolled_back(videos):
+    class FailingConnection(RecordingConnection):
+        def executemany(self, sql, rows):
+            raise pymysql.err.IntegrityError(1062, "Duplicate entry")
+
+    connection = FailingConnection()
+    with pytest.raises(pymysql.err.IntegrityError):
+        bulk_load(connection, "Video", videos, upsert=True)
+    assert connection.rollbacks == 1 and connection.commits == 0
+
+
+# ==================================================       /     QUERY CACHE    /      =================================================== #
+def test_query_cache_reuses_rows_until_they_expire_or_the_warehouse_changes(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("warehouse.time.monotonic", lambda: clock[0])
+    loads = []
+
+    def load():
+        loads.append(clock[0])
+        return [("row", len(loads))]
+
+    cache = QueryCache(ttl=60)
+    assert cache.get_or_load(("mysql", 2), 1, load) == [("row", 1)]
+    clock[0] += 59
+    assert cache.get_or_load(("mysql", 2), 1, load) == [("row", 1)]
+    # A new warehouse version invalidates the entry before it expires
+    assert cache.get_or_load(("mysql", 2), 2, load) == [("row", 2)]
+    clock[0] += 61
+    assert cache.get_or_load(("mysql", 2), 2, load) == [("row", 3)]
+    assert cache.stats() == {"hits": 1, "misses": 3, "invalidations": 1, "entries": 1}
+
+
+def test_query_cache_drops_the_oldest_entry_first():
+    cache = QueryCache(max_entries=2)
+    for question in [2, 3, 5]:
+        cache.get_or_load(("mysql", question), 1, lambda: [question])
+
+    assert list(cache.entries) == [("mysql", 3), ("mysql", 5)]
+    cache.clear()
+    assert cache.stats()["entries"] == 0
+
+
+# ==================================================       /     KEYSET PAGINATION    /      =================================================== #
+@pytest.mark.parametrize("question", sorted(PAGINATED_QUERIES))
+def test_pages_cover_every_row_once_in_order(connection, question):
+    query = PAGINATED_QUERIES[question]
+    field_count = len(query["fields"].split(","))
+
+    pages = []
+    after_key = None
+    while True:
+        rows = connection.execute(*page_query(query, after_key, page_size=3, placeholder="?")).fetchall()
+        if not rows:
+            break
+        pages.append([row[:field_count] for row in rows])
+        after_key = tuple(rows[-1][field_count:])
+
+    assert all(len(page) <= 3 for page in pages)
+    assert [row for page in pages for row in page] == connection.execute(full_query(query)).fetchall()
+    assert sum(map(len, pages)) == connection.execute(count_query(query)).fetchone()[0] == 14
+
+
+def test_page_query_parameters():
+    query = PAGINATED_QUERIES[6]
+    sql, params = page_query(query, page_size=50)
+    assert sql.endswith("ORDER BY Video_Name, Video_Id LIMIT %s") and params == (50,)
+
+    sql, params = page_query(query, ("Video 1", "a4"), page_size=50)
+    assert "WHERE (Video_Name, Video_Id) > (%s, %s)" in sql and params == ("Video 1", "a4", 50)
@@ -0,0 +1,712 @@
+# ==================================================       /     IMPORT LIBRARY    /      =================================================== #
+#[MySQL]
+import pymysql
+
+#[Pandas]
+import pandas as pd
+
+#[Connection pool]
+import queue
+import threading
+from contextlib import contextmanager
+
+#[Temp file]
+import csv
+import os
+import re
+import tempfile
+import time
+
+
+# ==================================================       /     CONNECTION & SCHEMA    /      =================================================== #
+def connect_mysql(database: str = "youtube_sql_db"):
+    """
+    Opens a connection to the MySQL warehouse.
+
+    Args:
+        database (str): Database to use, None to connect without selecting one.
+
+    Returns:
+        Connection: A pymysql connection that allows LOAD DATA LOCAL INFILE.
+    """
+    return pymysql.connect(
+        host = 'HOST',
+        user='USER-NAME',
+        passwd='YOUR-PASSWORD',
+        database = database,
+        local_infile = True
+        )
+
+
+class MySQLPool:
+    """
+    Keeps open MySQL connections for reuse, so each query does not pay for a new
+    TCP connection, authentication and handshake. A connection taken from the pool
+    is pinged first and reopened if the server dropped it.
+
+    Args:
+        max_size (int): Maximum number of connections open at once. Callers wait when all are in use.
+        database (str): Database the connections use.
+    """
+
+    def __init__(self, max_size: int = 8, database: str = "youtube_sql_db"):
+        self.database = database
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(max_size)
+
+    @contextmanager
+    def connection(self):
+        """
+        Lends a healthy connection for the duration of a with block. A connection
+        that raised inside the block is closed instead of going back to the pool.
+
+        Yields:
+            Connection: A pymysql connection.
+        """
+        self.slots.acquire()
+        try:
+            try:
+                myconnection = self.idle.get_nowait()
+                # Health check, reconnects a connection the server closed
+                myconnection.ping(reconnect=True)
+            except queue.Empty:
+                myconnection = connect_mysql(self.database)
+            try:
+                yield myconnection
+            except Exception:
+                myconnection.close()
+                raise
+            self.idle.put(myconnection)
+        finally:
+            self.slots.release()
+
+    def close(self):
+        """
+        Closes the idle connections.
+        """
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def create_schema(database: str = "youtube_sql_db"):
+    """
+    Creates the warehouse database and the Channel, Playlist, Video and Comment tables if missing.
+
+    Args:
+        database (str): Database to create, benchmarks use their own.
+    """
+    # Create DB on MySQL
+    myconnection = connect_mysql(database=None)
+    with myconnection.cursor() as cur:
+        cur.execute(f"CREATE DATABASE IF NOT EXISTS {database}")
+    myconnection.close()
+
+    # Connect to SQL database
+    myconnection = connect_mysql(database)
+    with myconnection.cursor() as cur:
+        # Create SQL table
+        cur.execute("""CREATE TABLE IF NOT EXISTS Channel(
+                    Channel_name VARCHAR(255),
+                    Channel_id VARCHAR(255) PRIMARY KEY,
+                    Channel_description TEXT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci,
+                    Subscription_count BIGINT,
+                    Video_count INT,
+                    View_count BIGINT
+                    )""")
+
+        cur.execute("""CREATE TABLE IF NOT EXISTS Playlist(
+                    Playlist_id VARCHAR(255) PRIMARY KEY,
+                    Channel_id VARCHAR(255), 
+                    FOREIGN KEY (Channel_id) REFERENCES Channel(Channel_id)
+                    )""")
+
+        cur.execute("""CREATE TABLE IF NOT EXISTS Video(
+                    Video_Id VARCHAR(255) PRIMARY KEY,
+                    Playlist_Id VARCHAR(255),
+                    Video_Name VARCHAR(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci,
+                    Video_Description TEXT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci,
+                    Published_date VARCHAR(255),
+                    View_Count BIGINT,
+                    Like_Count BIGINT,
+                    Favorite_Count INT,
+                    Comment_Count BIGINT,
+                    Duration INT,
+                    Thumbnail VARCHAR(255),
+                    Caption_Status VARCHAR(255),
+                    FOREIGN KEY (Playlist_Id) REFERENCES Playlist(Playlist_id)
+                    )""")
+
+        cur.execute("""CREATE TABLE IF NOT EXISTS Comment(
+                    Comment_id VARCHAR(255) PRIMARY KEY,
+                    Video_id VARCHAR(255),
+                    Comment_text TEXT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci,
+                    Comment_author VARCHAR(255),
+                    Comment_published_date VARCHAR(255),
+                    FOREIGN KEY (Video_id) REFERENCES Video(Video_Id)
+                    )""")
+
+        # Version of the warehouse content, increased by every migration
+        cur.execute("""CREATE TABLE IF NOT EXISTS Warehouse_state(
+                    Id TINYINT PRIMARY KEY,
+                    Version BIGINT NOT NULL
+                    )""")
+        cur.execute("INSERT IGNORE INTO Warehouse_state (Id, Version) VALUES (1, 0)")
+
+        # Per-channel aggregates read by the analytics questions
+        cur.execute("""CREATE TABLE IF NOT EXISTS Channel_summary(
+                    Channel_id VARCHAR(255) PRIMARY KEY,
+                    Video_count INT,
+                    Total_duration BIGINT,
+                    Average_duration DOUBLE,
+                    Max_like_video_id VARCHAR(255),
+                    Max_like_count BIGINT,
+                    Max_comment_video_id VARCHAR(255),
+                    Max_comment_count BIGINT,
+                    FOREIGN KEY (Channel_id) REFERENCES Channel(Channel_id)
+                    )""")
+
+        cur.execute("""CREATE TABLE IF NOT EXISTS Channel_year_summary(
+                    Channel_id VARCHAR(255),
+                    Year INT,
+                    Video_count INT,
+                    PRIMARY KEY (Channel_id, Year),
+                    FOREIGN KEY (Channel_id) REFERENCES Channel(Channel_id)
+                    )""")
+
+        # Backfill the summaries of a warehouse migrated before they existed
+        cur.execute("SELECT EXISTS (SELECT 1 FROM Channel_summary), EXISTS (SELECT 1 FROM Channel)")
+        summary_exists, channel_exists = cur.fetchone()
+    myconnection.commit()
+
+    # Bring the tables above to the latest schema version
+    migrate_schema(myconnection)
+    if channel_exists and not summary_exists:
+        refresh_channel_summary(myconnection)
+    myconnection.close()
+
+
+# ==================================================       /     SCHEMA MIGRATIONS    /      =================================================== #
+# Versioned schema changes applied in order by migrate_schema. Append new versions, never edit applied ones.
+SCHEMA_MIGRATIONS = [
+    (1, "Typed publish dates and indexes for the analytics questions", [
+        # ISO-8601 strings stored by earlier migrations, e.g. 2022-05-01T10:00:00Z
+        """UPDATE Video SET Published_date = DATE_FORMAT(STR_TO_DATE(LEFT(Published_date, 19), '%Y-%m-%dT%H:%i:%s'), '%Y-%m-%d %H:%i:%s')
+           WHERE Published_date LIKE '%T%'""",
+        """UPDATE Comment SET Comment_published_date = DATE_FORMAT(STR_TO_DATE(LEFT(Comment_published_date, 19), '%Y-%m-%dT%H:%i:%s'), '%Y-%m-%d %H:%i:%s')
+           WHERE Comment_published_date LIKE '%T%'""",
+        "ALTER TABLE Video MODIFY Published_date DATETIME",
+        "ALTER TABLE Comment MODIFY Comment_published_date DATETIME",
+        "ALTER TABLE Video MODIFY Favorite_Count BIGINT",
+        # Q1: videos of a channel by name
+        "CREATE INDEX idx_video_playlist_name ON Video (Playlist_Id, Video_Name)",
+        # Q3: top videos by views
+        "CREATE INDEX idx_video_views ON Video (View_Count)",
+        # Q4, Q10 and the channel summary: comment counts of a channel
+        "CREATE INDEX idx_video_playlist_comments ON Video (Playlist_Id, Comment_Count)",
+        # Q5 and the channel summary: like counts of a channel
+        "CREATE INDEX idx_video_playlist_likes ON Video (Playlist_Id, Like_Count)",
+        # Q6: likes of every video ordered by name
+        "CREATE INDEX idx_video_name_likes ON Video (Video_Name, Like_Count)",
+        # Q8 and the year summary: videos published in a date range
+        "CREATE INDEX idx_video_published ON Video (Published_date, Playlist_Id)",
+        # Q2: channels with the most videos
+        "CREATE INDEX idx_channel_video_count ON Channel (Video_count)",
+        # Comments of a video in publish order
+        "CREATE INDEX idx_comment_video_published ON Comment (Video_id, Comment_published_date)"
+    ]),
+    (2, "Index for the keyset pages of question 6", [
+        # Q6 pages: InnoDB appends the Video_Id primary key, so the index is ordered by (Video_Name, Video_Id)
+        "CREATE INDEX idx_video_name ON Video (Video_Name)"
+    ])
+]
+
+
+# MySQL commits every DDL statement on its own, so a version that failed halfway has some of
+# its indexes already; CREATE INDEX statements are skipped for indexes that exist
+CREATE_INDEX_PATTERN = re.compile(r"^\s*CREATE INDEX (\w+) ON (\w+)", re.IGNORECASE)
+
+
+def _index_exists(cur, table: str, index_name: str):
+    cur.execute("""SELECT COUNT(*) FROM information_schema.STATISTICS
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s""", (table, index_name))
+    return cur.fetchone()[0] > 0
+
+
+def migrate_schema(connection):
+    """
+    Applies the SCHEMA_MIGRATIONS newer than the version recorded in the
+    Schema_version table. Each version is recorded as soon as it is applied, so
+    an interrupted run continues with the next pending version. Statements are
+    safe to run again: indexes that already exist are not created twice.
+
+    Args:
+        connection (Connection): MySQL connection.
+
+    Returns:
+        int: The schema version after migrating.
+    """
+    with connection.cursor() as cur:
+        cur.execute("""CREATE TABLE IF NOT EXISTS Schema_version(
+                    Version INT PRIMARY KEY,
+                    Description VARCHAR(255),
+                    Applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                    )""")
+        cur.execute("SELECT COALESCE(MAX(Version), 0) FROM Schema_version")
+        current_version = cur.fetchone()[0]
+
+        for version, description, statements in SCHEMA_MIGRATIONS:
+            if version <= current_version:
+                continue
+            for statement in statements:
+                index = CREATE_INDEX_PATTERN.match(statement)
+                if index and _index_exists(cur, index.group(2), index.group(1)):
+                    continue
+                cur.execute(statement)
+            cur.execute("INSERT INTO Schema_version (Version, Description) VALUES (%s, %s)", (version, description))
+            connection.commit()
+            current_version = version
+    return current_version
+
+
+# ==================================================       /     CHANNEL SUMMARY    /      =================================================== #
+def refresh_channel_summary(connection, channel_id: str = None):
+    """
+    Recomputes the Channel_summary and Channel_year_summary rows of one channel
+    from its videos, so the dashboard reads per-channel aggregates instead of
+    scanning the Video table. Only the given channel's videos are read.
+
+    Args:
+        connection (Connection): MySQL connection.
+        channel_id (str): Channel to refresh, None to rebuild every channel.
+    """
+    channel_filter = "WHERE P.Channel_id = %s" if channel_id is not None else ""
+    params = (channel_id,) if channel_id is not None else None
+    try:
+        with connection.cursor() as cur:
+            cur.execute(f"""REPLACE INTO Channel_summary (Channel_id, Video_count, Total_duration, Average_duration,
+                                                          Max_like_video_id, Max_like_count,
+                                                          Max_comment_video_id, Max_comment_count)
+                            SELECT P.Channel_id, COUNT(V.Video_Id), COALESCE(SUM(V.Duration), 0), AVG(V.Duration),
+                                (SELECT V2.Video_Id FROM Video AS V2 INNER JOIN Playlist AS P2 ON V2.Playlist_Id = P2.Playlist_id
+                                 WHERE P2.Channel_id = P.Channel_id ORDER BY V2.Like_Count DESC, V2.Video_Id LIMIT 1),
+                                MAX(V.Like_Count),
+                                (SELECT V2.Video_Id FROM Video AS V2 INNER JOIN Playlist AS P2 ON V2.Playlist_Id = P2.Playlist_id
+                                 WHERE P2.Channel_id = P.Channel_id ORDER BY V2.Comment_Count DESC, V2.Video_Id LIMIT 1),
+                                MAX(V.Comment_Count)
+                            FROM Playlist AS P LEFT JOIN Video AS V ON V.Playlist_Id = P.Playlist_id
+                            {channel_filter}
+                            GROUP BY P.Channel_id""", params)
+
+            if channel_id is not None:
+                cur.execute("DELETE FROM Channel_year_summary WHERE Channel_id = %s", params)
+            else:
+                cur.execute("DELETE FROM Channel_year_summary")
+            cur.execute(f"""INSERT INTO Channel_year_summary (Channel_id, Year, Video_count)
+                            SELECT P.Channel_id, YEAR(V.Published_date), COUNT(*)
+                            FROM Video AS V INNER JOIN Playlist AS P ON V.Playlist_Id = P.Playlist_id
+                            {channel_filter}
+                            GROUP BY P.Channel_id, YEAR(V.Published_date)""", params)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+
+
+# ==================================================       /     QUERY CACHE    /      =================================================== #
+def warehouse_version(cur):
+    """
+    Returns:
+        int: The current warehouse version, see bump_warehouse_version.
+    """
+    cur.execute("SELECT Version FROM Warehouse_state WHERE Id = 1")
+    row = cur.fetchone()
+    return row[0] if row else 0
+
+
+def bump_warehouse_version(connection):
+    """
+    Marks the warehouse content as changed, which invalidates cached query results
+    in every process that reads the version.
+
+    Args:
+        connection (Connection): MySQL connection.
+    """
+    with connection.cursor() as cur:
+        cur.execute("""INSERT INTO Warehouse_state (Id, Version) VALUES (1, 1)
+                       ON DUPLICATE KEY UPDATE Version = Version + 1""")
+    connection.commit()
+
+
+class QueryCache:
+    """
+    Caches query results by key with a time to live. An entry is also dropped
+    when the warehouse version it was loaded at is no longer current.
+    Safe to share between sessions.
+
+    Args:
+        ttl (float): Seconds a result is reused.
+        max_entries (int): Number of results kept, the oldest is dropped first.
+    """
+
+    def __init__(self, ttl: float = 600, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get_or_load(self, key, version: int, load):
+        """
+        Args:
+            key (tuple): Question and parameters of the query.
+            version (int): Current warehouse version.
+            load (callable): Runs the query and returns its rows.
+
+        Returns:
+            The cached or freshly loaded rows.
+        """
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry_version, expires_at, rows = entry
+                if entry_version == version and expires_at > now:
+                    self.hits += 1
+                    return rows
+                if entry_version != version:
+                    self.invalidations += 1
+            self.misses += 1
+
+        rows = load()
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = (version, now + self.ttl, rows)
+            while len(self.entries) > self.max_entries:
+                self.entries.pop(next(iter(self.entries)))
+        return rows
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        """
+        Returns:
+            dict: hits, misses, invalidations and entries.
+        """
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "invalidations": self.invalidations, "entries": len(self.entries)}
+
+
+# ==================================================       /     ANALYTICS QUERIES    /      =================================================== #
+# Questions of the dashboard answered by a single query, keyed by question number
+ANALYTICS_QUERIES = {
+    2: "SELECT Channel_name, Video_count FROM Channel WHERE Video_count IN (SELECT MAX(Video_count) FROM Channel)",
+    3: """SELECT T3.Channel_name, T1.video_Name, T1.View_count FROM Video AS T1
+           INNER JOIN Playlist AS T2 ON T1.Playlist_Id = T2.Playlist_id
+           INNER JOIN Channel AS T3 ON T2.Channel_id = T3.Channel_id
+           ORDER BY T1.View_count DESC LIMIT 10""",
+    # Q5 and Q10 list every video tied at the channel's maximum, found through (Playlist_Id, count) indexes
+    5: """SELECT T3.Channel_name, T1.video_Name, T2.Max_like_count FROM Channel_summary AS T2
+           INNER JOIN Playlist AS T4 ON T4.Channel_id = T2.Channel_id
+           INNER JOIN Video AS T1 ON T1.Playlist_Id = T4.Playlist_id AND T1.Like_Count = T2.Max_like_count
+           INNER JOIN Channel AS T3 ON T2.Channel_id = T3.Channel_id
+           ORDER BY T2.Max_like_count DESC""",
+    7: "SELECT Channel_name, View_count FROM Channel",
+    8: """SELECT T3.Channel_name as Channel_names, T1.video_Name, T1.Published_date FROM Video AS T1
+           INNER JOIN Playlist AS T2 ON T1.Playlist_Id = T2.Playlist_id
+           INNER JOIN Channel AS T3 ON T2.Channel_id = T3.Channel_id
+           WHERE T1.Published_date >= '2022-01-01' AND T1.Published_date < '2023-01-01'""",
+    9: """SELECT T3.Channel_name, TIME_FORMAT(SEC_TO_TIME(T2.Average_duration), "%T") AS Duration FROM Channel_summary AS T2
+           INNER JOIN Channel AS T3 ON T2.Channel_id = T3.Channel_id
+           WHERE T2.Video_count > 0
+           ORDER BY Duration""",
+    10: """SELECT T3.Channel_name, T1.video_Name, T2.Max_comment_count FROM Channel_summary AS T2
+           INNER JOIN Playlist AS T4 ON T4.Channel_id = T2.Channel_id
+           INNER JOIN Video AS T1 ON T1.Playlist_Id = T4.Playlist_id AND T1.Comment_Count = T2.Max_comment_count
+           INNER JOIN Channel AS T3 ON T2.Channel_id = T3.Channel_id
+           ORDER BY T2.Max_comment_count DESC"""
+}
+
+# Questions listing every video, read one page at a time with page_query. The order keys
+# are Video columns of one index followed by the Video_Id primary key, so each page is read
+# from the index: Q1 and Q4 list the videos channel by channel through idx_video_playlist_name,
+# Q6 by name through idx_video_name
+PAGINATED_QUERIES = {
+    1: {
+        "fields": "T3.Channel_name, T1.video_Name",
+        "from": """Video AS T1
+                   INNER JOIN Playlist AS T2 ON T1.Playlist_Id = T2.Playlist_id
+                   INNER JOIN Channel AS T3 ON T2.Channel_id = T3.Channel_id""",
+        "order_keys": ["T1.Playlist_Id", "T1.Video_Name", "T1.Video_Id"]
+    },
+    4: {
+        "fields": "T3.Channel_name, T1.Video_Name, T1.Comment_Count",
+        "from": """Video AS T1
+                   INNER JOIN Playlist AS T2 ON T1.Playlist_Id = T2.Playlist_id
+                   INNER JOIN Channel AS T3 ON T2.Channel_id = T3.Channel_id""",
+        "order_keys": ["T1.Playlist_Id", "T1.Video_Name", "T1.Video_Id"]
+    },
+    6: {
+        "fields": "Video_Name, Like_Count",
+        "from": "Video",
+        "order_keys": ["Video_Name", "Video_Id"]
+    }
+}
+
+
+def page_query(query: dict, after_key: tuple = None, page_size: int = 100, placeholder: str = "%s"):
+    """
+    Builds the query of one page of a PAGINATED_QUERIES entry with keyset pagination:
+    the page starts after the order keys of the previous page's last row. When an index
+    serves the order keys, as it does for every PAGINATED_QUERIES entry, a deep page
+    costs the same as the first; keys on joined or unindexed columns sort the whole
+    result for every page. The order keys are selected after the fields.
+
+    Args:
+        query (dict): An entry of PAGINATED_QUERIES.
+        after_key (tuple): Order keys of the previous page's last row, None for the first page.
+        page_size (int): Number of rows per page.
+        placeholder (str): Parameter marker of the driver, "?" for DuckDB.
+
+    Returns:
+        tuple: SQL and its parameters.
+    """
+    key_list = ", ".join(query["order_keys"])
+    sql = f"SELECT {query['fields']}, {key_list} FROM {query['from']}"
+    params = (page_size,)
+    if after_key is not None:
+        sql += f" WHERE ({key_list}) > ({', '.join([placeholder] * len(query['order_keys']))})"
+        params = (*after_key, page_size)
+    return sql + f" ORDER BY {key_list} LIMIT {placeholder}", params
+
+
+def count_query(query: dict):
+    """
+    Returns:
+        str: SQL counting the rows of a PAGINATED_QUERIES entry.
+    """
+    return f"SELECT COUNT(*) FROM {query['from']}"
+
+
+def full_query(query: dict):
+    """
+    Returns:
+        str: SQL of every row of a PAGINATED_QUERIES entry, in page order.
+    """
+    return f"SELECT {query['fields']} FROM {query['from']} ORDER BY {', '.join(query['order_keys'])}"
+
+
+# ==================================================       /     EXPORT    /      =================================================== #
+def export_query_csv(connection, sql: str, path: str, columns: list, params: tuple = None, chunk_size: int = 10000):
+    """
+    Streams the result of a query to a CSV file. Rows are read with an unbuffered
+    server-side cursor chunk by chunk, so the full result is never held in memory.
+
+    Args:
+        connection (Connection): MySQL connection.
+        sql (str): Query to export.
+        path (str): CSV file to write.
+        columns (list): Header row.
+        params (tuple): Query parameters.
+        chunk_size (int): Number of rows fetched per round trip.
+
+    Returns:
+        int: Number of rows written.
+    """
+    row_count = 0
+    with open(path, "w", encoding="utf-8", newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(columns)
+        with connection.cursor(pymysql.cursors.SSCursor) as cur:
+            cur.execute(sql, params)
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                writer.writerows(rows)
+                row_count += len(rows)
+    return row_count
+
+
+# ==================================================       /     BULK LOAD    /      =================================================== #
+# Primary key of each warehouse table, used to match rows on upsert
+PRIMARY_KEYS = {
+    "Channel": "Channel_id",
+    "Playlist": "Playlist_id",
+    "Video": "Video_Id",
+    "Comment": "Comment_id"
+}
+
+
+def dataframe_rows(df: pd.DataFrame):
+    """
+    Converts a DataFrame to plain Python row tuples, with missing values as None.
+
+    Args:
+        df (DataFrame): Rows to insert, columns named as the table columns.
+
+    Returns:
+        list: A list of row tuples.
+    """
+    df = df.astype(object).where(df.notna(), None)
+    return list(df.itertuples(index=False, name=None))
+
+
+def insert_rows(connection, table: str, columns: list, rows: list, chunk_size: int = 1000):
+    """
+    Inserts rows with executemany in fixed-size chunks. The caller commits.
+
+    Args:
+        connection (Connection): MySQL connection.
+        table (str): Table name.
+        columns (list): Column names, in the order of the row values.
+        rows (list): Row tuples.
+        chunk_size (int): Number of rows per executemany call.
+    """
+    insert_sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({','.join(['%s'] * len(columns))})"
+    with connection.cursor() as cur:
+        for start in range(0, len(rows), chunk_size):
+            cur.executemany(insert_sql, rows[start:start + chunk_size])
+
+
+def _csv_field(value):
+    # Unquoted NULL is read back as SQL NULL, quotes inside a field are doubled
+    if value is None:
+        return "NULL"
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def load_data_infile(connection, table: str, columns: list, rows: list):
+    """
+    Loads rows through LOAD DATA LOCAL INFILE from a temporary CSV file. The caller commits.
+    The connection must be opened with local_infile=True.
+
+    Args:
+        connection (Connection): MySQL connection.
+        table (str): Table name.
+        columns (list): Column names, in the order of the row values.
+        rows (list): Row tuples.
+    """
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", encoding="utf-8", newline="", delete=False) as csv_file:
+        for row in rows:
+            csv_file.write(",".join(_csv_field(value) for value in row) + "\n")
+    try:
+        with connection.cursor() as cur:
+            cur.execute(f"""LOAD DATA LOCAL INFILE %s INTO TABLE {table}
+                            CHARACTER SET utf8mb4
+                            FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+                            LINES TERMINATED BY '\\n'
+                            ({', '.join(columns)})""", (csv_file.name,))
+    finally:
+        os.remove(csv_file.name)
+
+
+def _load_rows(connection, table: str, columns: list, rows: list, chunk_size: int, infile_threshold: int):
+    """
+    Loads rows with LOAD DATA above infile_threshold rows, otherwise with executemany.
+
+    Returns:
+        str: The load method used.
+    """
+    if len(rows) > infile_threshold:
+        try:
+            load_data_infile(connection, table, columns, rows)
+            return "LOAD DATA"
+        except pymysql.err.OperationalError:
+            # local_infile disabled on client or server
+            connection.rollback()
+    insert_rows(connection, table, columns, rows, chunk_size)
+    return "executemany"
+
+
+def merge_staging_table(connection, table: str, staging_table: str, columns: list):
+    """
+    Merges a staging table into its target table. Existing rows are updated only
+    where a value differs, and rows with a new primary key are inserted.
+
+    Args:
+        connection (Connection): MySQL connection.
+        table (str): Target table name.
+        staging_table (str): Staging table with the same columns.
+        columns (list): Column names to merge.
+
+    Returns:
+        tuple: Number of rows updated and number of rows inserted.
+    """
+    primary_key = PRIMARY_KEYS[table]
+    value_columns = [column for column in columns if column != primary_key]
+    with connection.cursor() as cur:
+        updated = 0
+        if value_columns:
+            # <=> is NULL-safe equality, so unchanged rows are left untouched
+            updated = cur.execute(f"""UPDATE {table} AS T JOIN {staging_table} AS S ON T.{primary_key} = S.{primary_key}
+                                      SET {', '.join(f'T.{column} = S.{column}' for column in value_columns)}
+                                      WHERE NOT ({' AND '.join(f'T.{column} <=> S.{column}' for column in value_columns)})""")
+        inserted = cur.execute(f"""INSERT INTO {table} ({', '.join(columns)})
+                                   SELECT {', '.join(f'S.{column}' for column in columns)} FROM {staging_table} AS S
+                                   WHERE NOT EXISTS (SELECT 1 FROM {table} AS T WHERE T.{primary_key} = S.{primary_key})""")
+    return updated, inserted
+
+
+def bulk_load(connection, table: str, df: pd.DataFrame, chunk_size: int = 1000, infile_threshold: int = 100000,
+              upsert: bool = False):
+    """
+    Loads a DataFrame into a table in a single transaction. Tables with more rows
+    than infile_threshold go through LOAD DATA LOCAL INFILE, falling back to
+    chunked executemany if the server refuses local files.
+
+    With upsert, rows are first loaded into a temporary staging table and then
+    merged, so the migration can be re-run for a channel: only new or changed
+    rows are written.
+
+    Args:
+        connection (Connection): MySQL connection.
+        table (str): Table name.
+        df (DataFrame): Rows to insert, columns named as the table columns.
+        chunk_size (int): Number of rows per executemany call.
+        infile_threshold (int): Row count above which LOAD DATA is used.
+        upsert (bool): Merge into existing rows instead of plain INSERT.
+
+    Returns:
+        dict: Table, row counts, load method, seconds taken and rows per second.
+    """
+    if upsert:
+        df = df.drop_duplicates(PRIMARY_KEYS[table], keep="last")
+    columns = list(df.columns)
+    rows = dataframe_rows(df)
+    start_time = time.perf_counter()
+    try:
+        if upsert:
+            staging_table = f"stage_{table}"
+            with connection.cursor() as cur:
+                cur.execute(f"DROP TEMPORARY TABLE IF EXISTS {staging_table}")
+                cur.execute(f"CREATE TEMPORARY TABLE {staging_table} LIKE {table}")
+            method = _load_rows(connection, staging_table, columns, rows, chunk_size, infile_threshold)
+            updated, inserted = merge_staging_table(connection, table, staging_table, columns)
+            with connection.cursor() as cur:
+                cur.execute(f"DROP TEMPORARY TABLE {staging_table}")
+        else:
+            method = _load_rows(connection, table, columns, rows, chunk_size, infile_threshold)
+            updated, inserted = 0, len(rows)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    seconds = time.perf_counter() - start_time
+    return {
+        "Table": table,
+        "Rows": len(rows),
+        "Inserted": inserted,
+        "Updated": updated,
+        "Unchanged": len(rows) - inserted - updated,
+        "Method": method,
+        "Seconds": round(seconds, 3),
+        "Rows/sec": round(len(rows) / seconds) if seconds else None
+    }
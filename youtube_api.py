@@ -1,18 +1,36 @@
 # ==================================================       /     IMPORT LIBRARY    /      =================================================== #
 #[API]
-import googleapiclient.discovery
+from harvester import Api_key_client, HarvestEngine
+from http_cache import ResponseCache
 
 #[MongoDB]
 import pymongo
+from storage import connect_mongo, create_indexes
+from pipeline import plan_harvests, combined_status_report
+from jobs import JobQueue
+from quota import QuotaLedger
 
 #[MySQL]
-import pymysql
+from warehouse import (MySQLPool, QueryCache, create_schema, export_query_csv, warehouse_version,
+                       ANALYTICS_QUERIES, PAGINATED_QUERIES, count_query, page_query, full_query)
+from migration import list_stored_channels, migrate_channel, iter_migrate_channels
+
+#[DuckDB]
+from columnar import (DuckDBWarehouse, DUCKDB_ANALYTICS_QUERIES, DUCKDB_PAGINATED_QUERIES, duckdb_available,
+                      parquet_available)
+
+#[Telemetry]
+from telemetry import TELEMETRY, MetricsServer
 
 #[Pandas]
 import pandas as pd
 
-#[Format dtype]
-import re
+#[Export]
+import os
+
+#[Workers]
+import subprocess
+import sys
 
 #[UI]
 import streamlit as st
@@ -26,289 +44,426 @@ st.set_page_config(
     layout = "wide")
 st.title(":red[YouTube Data Harvesting and Warehouse using SQL, MongoDB and Streamlit]")
 
+# Harvest concurrency: requests in flight and request rate cap across workers
+HARVEST_MAX_WORKERS = 8
+HARVEST_REQUESTS_PER_SECOND = 10
+
+# YouTube Data API units available per day
+DAILY_API_QUOTA = 10000
+
+# On-disk API response cache: folder, size limit, and seconds a response is reused without revalidation.
+# 0 revalidates every response with its ETag, so refreshed statistics are never served stale
+HTTP_CACHE_DIR = ".http_cache"
+HTTP_CACHE_MAX_BYTES = 512 * 1024 * 1024
+HTTP_CACHE_MAX_AGE = 0
+
+# MongoDB storage layouts, see storage.STORAGE_LAYOUTS
+STORAGE_LAYOUT_OPTIONS = {"Normalized collections": "normalized", "Single channel document": "document"}
+
+# Number of comments written to MongoDB per bulk write
+COMMENT_CHUNK_SIZE = 1000
+
+# Rows per executemany call, and table size above which LOAD DATA LOCAL INFILE is used
+MYSQL_CHUNK_SIZE = 1000
+MYSQL_INFILE_THRESHOLD = 100000
+
+# MySQL connections kept open for reuse across reruns
+MYSQL_POOL_SIZE = 8
+
+# Seconds a cached query result is reused, unless a migration changes the warehouse first
+QUERY_CACHE_TTL = 600
+
+# Parquet dataset written by each migration, read by the DuckDB query engine
+PARQUET_DIR = "parquet"
+
+# Engines that can answer the questions: MySQL, or embedded DuckDB on the Parquet dataset
+QUERY_ENGINE_OPTIONS = {"MySQL": "mysql", "DuckDB on Parquet files": "duckdb"}
+
+# Rows shown per page for questions listing every video, and folder for their CSV exports
+QUERY_PAGE_SIZE = 100
+EXPORT_DIR = "exports"
+
+# Port of the Prometheus metrics endpoint, http://localhost:<port>/metrics; job workers use the next ports
+METRICS_PORT = 9464
+
+# Worker processes running queued harvests, channels each harvests at once, and seconds between progress updates
+JOB_WORKER_PROCESSES = 2
+JOB_WORKER_CONCURRENCY = 2
+JOB_POLL_SECONDS = 2
+
+
+# ==================================================       /     CONNECTIONS    /      =================================================== #
+# Clients are created once per server process and shared by all sessions and reruns
+@st.cache_resource
+def get_mongo_client():
+    return connect_mongo()
+
+
+@st.cache_resource
+def get_mysql_pool():
+    return MySQLPool(max_size=MYSQL_POOL_SIZE)
+
+
+@st.cache_resource
+def get_query_cache():
+    return QueryCache(ttl=QUERY_CACHE_TTL)
+
+
+@st.cache_resource
+def get_duckdb_warehouse():
+    return DuckDBWarehouse(PARQUET_DIR)
+
+
+@st.cache_resource
+def get_quota_ledger():
+    return QuotaLedger(get_mongo_client()["youtube_DB"]["api_quota"], daily_limit=DAILY_API_QUOTA)
+
+
+@st.cache_resource
+def get_harvest_engine():
+    # API clients and cached responses are reused by every harvest
+    return HarvestEngine(Api_key_client, max_workers=HARVEST_MAX_WORKERS, requests_per_second=HARVEST_REQUESTS_PER_SECOND,
+                         ledger=get_quota_ledger(),
+                         response_cache=ResponseCache(HTTP_CACHE_DIR, HTTP_CACHE_MAX_BYTES, HTTP_CACHE_MAX_AGE))
+
+
+@st.cache_resource
+def get_metrics_server():
+    # Stage timings and API counters of every session, None if the port is taken
+    try:
+        return MetricsServer(TELEMETRY, METRICS_PORT).start()
+    except OSError:
+        return None
+
+
+@st.cache_resource
+def get_job_queue():
+    queue = JobQueue(get_mongo_client()["youtube_DB"]["harvest_jobs"])
+    queue.create_indexes()
+    return queue
+
+
+@st.cache_resource
+def start_job_workers():
+    """
+    Starts the worker processes that run queued harvests. They share the request
+    rate cap and stop when this server process exits.
+    """
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pipeline.py")
+    return [subprocess.Popen([sys.executable, script, "worker",
+                              "--concurrency", str(JOB_WORKER_CONCURRENCY),
+                              "--threads", str(HARVEST_MAX_WORKERS),
+                              "--requests-per-second", str(HARVEST_REQUESTS_PER_SECOND / JOB_WORKER_PROCESSES),
+                              "--daily-quota", str(DAILY_API_QUOTA),
+                              "--http-cache", HTTP_CACHE_DIR,
+                              "--cache-max-age", str(HTTP_CACHE_MAX_AGE),
+                              "--metrics-port", str(METRICS_PORT + 1 + number),
+                              "--parent-pid", str(os.getpid())])
+            for number in range(JOB_WORKER_PROCESSES)]
+
+
+@st.cache_resource
+def init_storage():
+    """
+    Creates the MySQL schema and the MongoDB indexes once, at startup.
+    """
+    create_schema()
+    create_indexes(get_mongo_client()["youtube_DB"])
+    return True
+
+
+def get_mongo_db():
+    """
+    Returns the youtube_DB database of the shared client, recreating the client
+    if the server does not answer a ping.
+    """
+    client = get_mongo_client()
+    try:
+        client.admin.command("ping")
+    except pymongo.errors.PyMongoError:
+        get_mongo_client.clear()
+        client = get_mongo_client()
+    return client["youtube_DB"]
+
+
+mysql_pool = get_mysql_pool()
+quota_ledger = get_quota_ledger()
+# Pick up quota spent by other processes since the last rerun
+quota_ledger.refresh()
+query_cache = get_query_cache()
+metrics_server = get_metrics_server()
+job_queue = get_job_queue()
+start_job_workers()
+try:
+    init_storage()
+except Exception as e:
+    st.warning(f"Database setup could not be completed, it is retried on the next rerun: {e}")
+
+
+# ==================================================       /     RUN SUMMARY    /      =================================================== #
+def show_run_summary(stages: list, requests: list, collapsed: bool = True):
+    """
+    Shows where the time of a harvest or migration went: calls, rows and seconds of
+    each stage, and for harvests the API requests, retries and bytes per call type.
+
+    Args:
+        stages (list): Stage totals of the run, see Telemetry.summary.
+        requests (list): API request totals of the run, see Telemetry.request_summary.
+        collapsed (bool): Show the summary in an expander, False inside another expander.
+    """
+    if not collapsed:
+        st.markdown("**Run summary**")
+    with st.expander("Run summary") if collapsed else st.container():
+        if requests:
+            col1, col2, col3 = st.columns(3)
+            col1.metric("API requests", int(sum(row["Requests"] for row in requests)))
+            col2.metric("Retries", int(sum(row["Retries"] for row in requests)))
+            col3.metric("Response data", f'{sum(row["Bytes"] for row in requests) / (1024 * 1024):.1f} MB')
+        st.dataframe(pd.DataFrame(stages), hide_index=True)
+        if requests:
+            st.dataframe(pd.DataFrame(requests), hide_index=True)
+        if metrics_server is not None:
+            st.caption(f"Totals since startup are served to Prometheus on http://localhost:{METRICS_PORT}/metrics, "
+                       f"and those of the job workers on the next {JOB_WORKER_PROCESSES} ports")
+
 
 # ==================================================       /     DATA COLLECTION SECTION    /      =================================================== #
 st.header(":violet[Data Collection] :envelope_with_arrow:")
 
 channel_id = st.text_input("Enter a YouTube Channel-id:")
+storage_layout = st.radio("MongoDB storage layout", list(STORAGE_LAYOUT_OPTIONS), horizontal=True)
+incremental = st.checkbox("Refresh already stored channels incrementally (new videos and statistics only)", value=True)
+
+# Comment pages read per video; 0 keeps the one page of 100 the quota plan counts
+col1, col2 = st.columns(2)
+with col1:
+    max_comments_per_video = st.number_input("Max comments per video (0 = one page of 100)", min_value=0, value=0, step=100)
+with col2:
+    max_comments_total = st.number_input("Max comments per channel (0 = all)", min_value=0, value=0, step=1000)
 
 # Initial value for session state
 if "button_clicked" not in st.session_state:
     st.session_state["button_clicked"] = False
+# Harvest jobs queued from this session, newest first
+if "job_ids" not in st.session_state:
+    st.session_state["job_ids"] = []
 
 # Button to trigger state change
 if st.button("Collect and Store Data"):
     st.session_state["button_clicked"] = True
 
-    with st.spinner("Fetching Data..."):
-        def Api_key_client():
-            """
-            Creates a client object for interacting with an API using an API key.
-
-            Returns:
-                object: An object representing the API client
-            """
-            api_key = "YOUR-API-KEY"
-            api_service_name = "youtube"
-            api_version = "v3"
-            youtube = googleapiclient.discovery.build(api_service_name, api_version, developerKey=api_key)
-            return youtube
-
-        # Create API client
-        youtube = Api_key_client()
-
-        def get_channel_info(channel_id: str):
-            """
-            Collects channel infromation from YouTube API.
-
-            Args:
-                Channel_id (str): Unique Youtube chnanel id.
-            
-            Returns:
-                dict: A dict containing channel information or None if entered invalid channel-id.
-            """
-            try:
-                channel_response = youtube.channels().list(
-                    part= "snippet,contentDetails,statistics",
-                    id= channel_id
-                ).execute()
-
-                # Input validation
-                if "items" not in channel_response:
-                    st.error("Please enter an valid channel-id.")
-                    return None
-                return channel_response
-            
-            except Exception as e:
-                st.error("Error: ", e)
-                return None
-
-
-        # Extract neccessary info from channel response
-        channel_data = get_channel_info(channel_id)
-        channel_name = channel_data["items"][0]["snippet"]["localized"]["title"]
-        channel_video_count = channel_data['items'][0]['statistics']['videoCount']
-        channel_subscriber_count = channel_data['items'][0]['statistics']['subscriberCount']
-        channel_view_count = channel_data['items'][0]['statistics']['viewCount']
-        channel_description = channel_data['items'][0]['snippet']['description']
-        channel_playlist_id = channel_data['items'][0]['contentDetails']['relatedPlaylists']['uploads']
-
-        # Channel data into dict
-        channel_stats = {
-            "Channel_Details": {
-                "Channel_name": channel_name,
-                "Channel_id": channel_id,
-                "Channel_description": channel_description,
-                "Subscription_count": channel_subscriber_count,
-                "Video_count": channel_video_count,
-                "View_count": channel_view_count,
-                "Playlist_id": channel_playlist_id
-            }
-        }
-
-
-        def get_video_ids(channel_playlist_id: str):
-            """
-            Collects video ids of videos available in playlist.
-
-            Args:
-                channel_playlist_id (str): Unique playlist id from channel.
-
-            Returns:
-                list: A list of video ids.
-            """
-            video_ids = []
-            next_page_token = None
-
-            while True:
-                # Generate playlist details
-                playlist_response = youtube.playlistItems().list(
-                    playlistId = channel_playlist_id,
-                    part = "contentDetails",
-                    pageToken = next_page_token
-                ).execute()
-
-                # Store video id of each video in playlist
-                for item in playlist_response['items']:
-                    video_ids.append(item["contentDetails"]["videoId"])
-
-                # Check if there's next page in playlist
-                next_page_token = playlist_response.get("nextPageToken")
-
-                if next_page_token is None:
-                    break
-            return video_ids
-
-
-        def duration_to_seconds(duration_str: str):
-            """
-            Converts a duration string in the format "PT[X]H[X]M[X]S" to seconds.
-
-            Args:
-                duration_str (str): The duration string to convert.
-
-            Returns:
-                int: The duration in seconds, or None if the format is invalid.
-            """
-            match = re.match(r"^PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?$", duration_str)
-
-            if not match:
-                return 0
-            hours = int(match.group(1) or 0) * 3600
-            minutes = int(match.group(2) or 0) * 60
-            seconds = int(match.group(3) or 0)
-            return hours + minutes + seconds
-
-
-        # Collect video ids
-        video_ids = get_video_ids(channel_playlist_id)
-
-        def get_video_comments(video_id: str, max_comments_per_video=100):
-            """
-            Collects all the comment details of a video
-
-            Args:
-                video_id (str): a unique identifier of YouTube video.
-                max_comments_per_video (int): Comment count.
-
-            Returns:
-                dict: A dict containing comment details. 
-            """
-            comment_response = youtube.commentThreads().list(
-                part= "snippet",
-                videoId= video_id,
-                maxResults= max_comments_per_video,
-                ).execute()     
-            return comment_response
-
-
-        def get_video_info(video_ids: list):
-            """
-            Collects video information along with comments information.
-
-            Args:
-                video_ids (list): A list of video ids
-
-            Returns:
-                dict: A dict with video details.
-            """
-            video_info = []
-            for video_id in video_ids:
-                video_response = youtube.videos().list(
-                    part='snippet,statistics,contentDetails',
-                    id=video_id
-                ).execute()
-                video = video_response["items"][0]
-
-                # Get comments 
-                try:
-                    video['comment_threads'] = get_video_comments(video_id, max_comments_per_video=100)
-                except:
-                    video['comment_threads'] = None
-
-                # Format duration
-                duration = video.get('contentDetails', {}).get('duration', 'Not Available')
-                if duration != 'Not Available':
-                    duration = duration_to_seconds(duration)
-                video['contentDetails']['duration'] = duration
-
-                video_info.append(video)
-            return video_info
-
-
-        # Fetch Video and Comment Data
-        video_data = get_video_info(video_ids)
-
-        # Format video data with comments
-        video_stats = {}
-        for i, video in enumerate(video_data):
-            # store required details
-            video_id = video["id"]
-            video_name = video["snippet"]["title"]
-            description = video['snippet']['description']
-            thumbnail = video["snippet"]["thumbnails"]['default']['url']
-            published_date = video['snippet']['publishedAt']
-            duration = video['contentDetails']['duration']
-            views = video['statistics']['viewCount']
-            likes = video['statistics'].get('likeCount')
-            comment_count = video['statistics'].get('commentCount')
-            favorite_count = video['statistics']['favoriteCount']
-            caption_status = video['contentDetails']['caption']
-            comments = {}
-
-            # To add comments info of each video
-            if video[f"comment_threads"] is not None:
-                comments = {}
-                for index, comment_thread in enumerate(video['comment_threads']['items']):
-                    comment = comment_thread['snippet']['topLevelComment']['snippet']
-                    comment_id = comment_thread['id']
-                    comment_text = comment['textDisplay']
-                    comment_author = comment['authorDisplayName']
-                    comment_published_at = comment['publishedAt']
-
-                    comments[f"Comment_ID_{index + 1}"] = {
-                        'Comment_ID': comment_id,
-                        'Comment_Text': comment_text,
-                        'Comment_Author': comment_author,
-                        'Comment_PublishedAt': comment_published_at
-                    }
-
-            # Process comment data into video data as dictionary
-            video_stats[f"Video_ID_{i+1}"] = {
-                "Video_id": video_id,
-                "Video_name": video_name,
-                "Description": description,
-                "Thumbnail": thumbnail,
-                "Published_date": published_date,
-                "Duration": duration,
-                "View_count": views,
-                "Like_count": likes,
-                "Comment_count": comment_count,
-                "Favorite_count": favorite_count,
-                "Caption_status": caption_status,
-                "comments": comments
-            }
-
-        # Combine channel details and video details to a dictionary
-        fetched_data = {**channel_stats, **video_stats}
-
-
-        # Connect to MongoDB & upload the data
-        client = pymongo.MongoClient('MONGO-CLIENT-URL')
-        mydb = client["youtube_DB"]
-        collection = mydb["youtube_data"]
-
-        # define the data to insert
-        final_output_data = {
-            'Channel_Name': channel_name,
-            "Channel_data": fetched_data
-            }
-
-        # insert data or create new document
-        upload = collection.replace_one({"_id": channel_id}, final_output_data, upsert = True)
-
-        # Display a success message of upload
-        st.success('The channel details are uploaded successfully!', icon="✅")
-
-        # close connection
-        client.close()
+    try:
+        # Size the harvest to the quota left today
+        plan = plan_harvests(get_mongo_db(), [channel_id], get_harvest_engine(), storage_layout=STORAGE_LAYOUT_OPTIONS[storage_layout],
+                             incremental=incremental, max_comments_per_video=max_comments_per_video or None)[0]
+    except Exception as e:
+        st.error(f"Error: {e}")
+        st.stop()
+
+    # Input validation
+    if plan["Status"] == "Invalid channel":
+        st.error("Please enter an valid channel-id.")
+        st.stop()
+    if plan["Status"] == "Postponed":
+        st.warning(f'The harvest needs about {plan["Units"]} API quota units but only {quota_ledger.remaining()} are left today. '
+                   'It is postponed until the quota resets at midnight Pacific Time.')
+        st.stop()
+    if plan["Status"] == "Resized":
+        st.info(f'Comments are capped at {plan["Max comments per video"]} per video to fit the API quota left today.')
+
+    # The worker processes harvest the channel, the page only follows its progress
+    job_id = job_queue.enqueue(channel_id, {
+        "storage_layout": STORAGE_LAYOUT_OPTIONS[storage_layout],
+        "incremental": incremental,
+        "max_comments_per_video": plan["Max comments per video"],
+        "max_comments_total": max_comments_total or None,
+        "comment_chunk_size": COMMENT_CHUNK_SIZE
+    })
+    st.session_state["job_ids"] = [job_id] + [queued_id for queued_id in st.session_state["job_ids"] if queued_id != job_id]
+    st.caption(f'Harvest of {channel_id} queued, estimated at {plan["Units"]} API quota units.')
+
+# Many channels at once, as ids, @handles, usernames or channel URLs
+with st.expander("Bulk ingestion"):
+    bulk_text = st.text_area("Channels, one per line (ids, @handles, usernames or channel URLs)")
+    bulk_file = st.file_uploader("or a file with one channel per line", type=["txt", "csv"])
+
+    if st.button("Collect and Store all Channels"):
+        lines = bulk_text.splitlines()
+        if bulk_file is not None:
+            lines += bulk_file.getvalue().decode("utf-8").splitlines()
+        references = list(dict.fromkeys(line.strip() for line in lines if line.strip() and not line.startswith("#")))
+
+        engine = get_harvest_engine()
+        try:
+            # Channel metadata 50 channels per request, reused by the plans and the jobs
+            channel_ids_by_reference, channels = engine.resolve_channels(references)
+            resolved_ids = list(dict.fromkeys(bulk_id for bulk_id in channel_ids_by_reference.values() if bulk_id is not None))
+            plans = plan_harvests(get_mongo_db(), resolved_ids, engine, storage_layout=STORAGE_LAYOUT_OPTIONS[storage_layout],
+                                  incremental=incremental, max_comments_per_video=max_comments_per_video or None,
+                                  channels=channels)
+        except Exception as e:
+            st.error(f"Error: {e}")
+            st.stop()
+
+        bulk_job_ids = {}
+        for plan in plans:
+            if plan["Status"] in ("Scheduled", "Resized"):
+                bulk_job_ids[plan["Channel_id"]] = job_queue.enqueue(plan["Channel_id"], {
+                    "storage_layout": STORAGE_LAYOUT_OPTIONS[storage_layout],
+                    "incremental": incremental,
+                    "max_comments_per_video": plan["Max comments per video"],
+                    "max_comments_total": max_comments_total or None,
+                    "comment_chunk_size": COMMENT_CHUNK_SIZE,
+                    "channel_data": channels[plan["Channel_id"]]
+                })
+        st.session_state["bulk_ingestion"] = {"references": references, "channel_ids": channel_ids_by_reference,
+                                              "plans": plans, "job_ids": bulk_job_ids}
+        st.caption(f'{len(bulk_job_ids)} of {len(references)} channel(s) queued, estimated at '
+                   f'{sum(plan["Units"] for plan in plans if plan["Channel_id"] in bulk_job_ids)} API quota units.')
+
+
+def format_seconds(seconds: float):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m {seconds:02d}s" if minutes else f"{seconds}s"
+
+
+def show_job(job: dict):
+    """
+    Shows the live progress of a queued or running harvest job, or the result of a finished one.
+    """
+    progress = job["Progress"] or {}
+    if job["Status"] in ("Queued", "Running"):
+        total_videos = progress.get("Total videos")
+        text = f'{job["Channel_id"]}: {job["Status"].lower()}'
+        if progress:
+            text += f', {progress["Videos"]} of {total_videos if total_videos is not None else "?"} videos, {progress["Comments"]} comments'
+            if progress["ETA seconds"] is not None:
+                text += f', about {format_seconds(progress["ETA seconds"])} left'
+        st.progress(min(1.0, progress["Videos"] / total_videos) if total_videos else 0.0, text=text)
+        return
+
+    if job["Status"] == "Failed":
+        st.error(f'The harvest of {job["Channel_id"]} failed: {job["Error"]}')
+        return
+
+    result = job["Result"]
+    if result["Status"] == "Invalid channel":
+        st.error(f'{job["Channel_id"]} is not a valid channel-id.')
+        return
+
+    if result["Resumed"]:
+        st.info(f'Resumed the previous harvest of {result["Channel_name"]} from its last checkpoint.')
+
+    # Report deleted or private videos
+    missing_video_ids = result["Missing video ids"]
+    if missing_video_ids:
+        st.warning(f"{len(missing_video_ids)} video(s) are deleted or private and were skipped: {', '.join(missing_video_ids)}")
+
+    # Report videos that failed after retries, so the channel can be refreshed again
+    if result["Skipped"]:
+        st.warning(f'{len(result["Skipped"])} video(s) failed after retries and were skipped. '
+                   'They are listed below so they can be collected again.')
+        st.dataframe(pd.DataFrame(result["Skipped"]), hide_index=True)
+
+    # Display a success message of upload
+    seconds = format_seconds(job["Finished"] - job["Started"])
+    if result["Status"] == "Refreshed":
+        st.success(f'{result["Channel_name"]} is refreshed in {seconds}: {result["New videos"]} new video(s) added, {result["Updated videos"]} video(s) updated, {result["Comments"]} comment(s) stored.', icon="✅")
+    else:
+        st.success(f'{result["Channel_name"]} is uploaded successfully in {seconds}! {result["Comments"]} comment(s) stored.', icon="✅")
+    st.caption(f'Used {quota_ledger.report()["Channels"].get(job["Channel_id"], 0)} API quota units today for this channel.')
+    if job["Run summary"]:
+        show_run_summary(job["Run summary"]["Stages"], job["Run summary"]["Requests"])
+
+
+def show_bulk_ingestion(bulk: dict, jobs: dict):
+    """
+    Shows one combined status report of a bulk ingestion, with a row per channel given.
+    """
+    statuses = []
+    for bulk_id, job_id in bulk["job_ids"].items():
+        job = jobs.get(job_id)
+        if job is None:
+            continue
+        if job["Status"] == "Done":
+            statuses.append({**job["Result"], "Seconds": round(job["Finished"] - job["Started"], 3)})
+        else:
+            progress = job["Progress"] or {}
+            statuses.append({"Channel_id": bulk_id, "Status": job["Status"], "Error": job["Error"],
+                             "New videos": progress.get("Videos"), "Comments": progress.get("Comments")})
+
+    finished = sum(status["Status"] not in ("Queued", "Running") for status in statuses)
+    st.progress(finished / len(statuses) if statuses else 1.0,
+                text=f'Bulk ingestion: {finished} of {len(statuses)} queued channel(s) finished, {len(bulk["references"])} given')
+    st.dataframe(pd.DataFrame(combined_status_report(bulk["references"], bulk["channel_ids"], bulk["plans"], statuses)),
+                 hide_index=True)
+
+
+def show_session_jobs():
+    bulk = st.session_state.get("bulk_ingestion")
+    jobs = job_queue.get_many(st.session_state["job_ids"] + (list(bulk["job_ids"].values()) if bulk else []))
+    for job_id in st.session_state["job_ids"]:
+        if job_id in jobs:
+            show_job(jobs[job_id])
+    if bulk:
+        show_bulk_ingestion(bulk, jobs)
+    # Rerun the whole page once the last job finishes, which stops the polling
+    if st.session_state.get("jobs_polling") and not any(job["Status"] in ("Queued", "Running") for job in jobs.values()):
+        st.session_state["jobs_polling"] = False
+        st.rerun()
+
+
+# Poll the jobs of this session while any is still queued or running
+session_bulk = st.session_state.get("bulk_ingestion")
+session_jobs = job_queue.get_many(st.session_state["job_ids"] + (list(session_bulk["job_ids"].values()) if session_bulk else []))
+st.session_state["jobs_polling"] = any(job["Status"] in ("Queued", "Running") for job in session_jobs.values())
+if st.session_state["jobs_polling"]:
+    st.fragment(show_session_jobs, run_every=JOB_POLL_SECONDS)()
+else:
+    show_session_jobs()
+
+# Jobs of every session and worker
+with st.expander("Harvest jobs"):
+    recent_jobs = job_queue.list_jobs()
+    st.dataframe(pd.DataFrame([{
+        "Channel id": job["Channel_id"],
+        "Status": job["Status"],
+        "Videos": (job["Progress"] or {}).get("Videos"),
+        "Total videos": (job["Progress"] or {}).get("Total videos"),
+        "Comments": (job["Progress"] or {}).get("Comments"),
+        "ETA seconds": (job["Progress"] or {}).get("ETA seconds") if job["Status"] == "Running" else None,
+        "Created": pd.to_datetime(job["Created"], unit="s"),
+        "Worker": job["Worker"],
+        "Error": job["Error"]
+    } for job in recent_jobs]), hide_index=True)
+
+# API quota spent today by every harvest sharing the key
+quota_report = quota_ledger.report()
+st.progress(min(1.0, quota_report["Used"] / quota_report["Limit"]),
+            text=f'API quota {quota_report["Day"]}: {quota_report["Used"]} of {quota_report["Limit"]} units used, {quota_report["Remaining"]} left')
+with st.expander("API quota usage"):
+    col1, col2 = st.columns(2)
+    with col1:
+        st.dataframe(pd.DataFrame(list(quota_report["Calls"].items()), columns=["Call type", "Units"]), hide_index=True)
+    with col2:
+        st.dataframe(pd.DataFrame(list(quota_report["Channels"].items()), columns=["Channel id", "Units"]), hide_index=True)
 
 
 # ==================================================       /     DATA MIGRATION SECTION    /      =================================================== #
 # Fetch Data from MongoDB to Migrate Data to MySQL
 st.header(":violet[Data Migration] :arrow_right:")
 
-# Create a connection with MongoClient
-client = pymongo.MongoClient('MONGO-CLIENT-URL')
-mydb = client["youtube_DB"]
-collection = mydb["youtube_data"]
+# Shared MongoDB connection
+mydb = get_mongo_db()
 
-# Collect the channel names 
-channel_names = []
-for channel in collection.find():
-    channel_names.append(channel["Channel_Name"])
+# Collect the channel names of both storage layouts
+stored_channels = list_stored_channels(mydb)
+channel_ids_by_name = {name: stored_channel_id for stored_channel_id, name in stored_channels.items()}
 
-channel_name = st.selectbox("Choose channel for MySQL Migration", options= channel_names)
+channel_name = st.selectbox("Choose channel for MySQL Migration", options= list(channel_ids_by_name))
+upsert_migration = st.checkbox("Update channels already in MySQL (only new or changed rows are written)", value=True)
+migration_options = {"upsert": upsert_migration, "chunk_size": MYSQL_CHUNK_SIZE, "infile_threshold": MYSQL_INFILE_THRESHOLD,
+                     "pool": mysql_pool, "parquet_dir": PARQUET_DIR if parquet_available() else None}
 
 # Initial value for session state
 if "migration_button_clicked" not in st.session_state:
@@ -317,147 +472,40 @@ if "migration_button_clicked" not in st.session_state:
 # Button to trigger state change
 if st.button("Migarte to MySQL"):
     st.session_state["migration_button_clicked"] = True
+    run_start = TELEMETRY.snapshot()
 
     with st.spinner("Warehousing Data..."):
-        # Fetch document with the specified channel name
-        document = collection.find_one({"Channel_Name":channel_name})
-        client.close()
-
-        # Dictionary to DataFrame conversion
-        dict_channel = {
-            "Channel_name": document['Channel_Name'],
-            "Channel_id": document['_id'],
-            "Channel_description": document['Channel_data']['Channel_Details']['Channel_description'],
-            "Subscription_count": document['Channel_data']['Channel_Details']['Subscription_count'],
-            "Video_count": document['Channel_data']['Channel_Details']['Video_count'],
-            "View_count": document['Channel_data']['Channel_Details']['View_count'],
-            }
-        df_channel = pd.DataFrame.from_dict(dict_channel, orient='index').T
-
-
-        dict_playlist = {"Playlist_id": document['Channel_data']['Channel_Details']["Playlist_id"],
-                        "Channel_id": document['_id'],
-                        }
-        df_playlist = pd.DataFrame.from_dict(dict_playlist, orient= "index").T
-
-
-        list_video = []
-        for i in range(1,len(document['Channel_data'])):
-            video_details_dict = {
-                'Video_Id': document['Channel_data'][f"Video_ID_{i}"]['Video_id'],
-                'Playlist_Id':document['Channel_data']['Channel_Details']['Playlist_id'],
-                'Video_Name': document['Channel_data'][f"Video_ID_{i}"]['Video_name'],
-                'Video_Description': document['Channel_data'][f"Video_ID_{i}"]['Description'],
-                'Published_date': document['Channel_data'][f"Video_ID_{i}"]['Published_date'],
-                'View_Count': document['Channel_data'][f"Video_ID_{i}"]['View_count'],
-                'Like_Count': document['Channel_data'][f"Video_ID_{i}"]['Like_count'],
-                'Favorite_Count': document['Channel_data'][f"Video_ID_{i}"]['Favorite_count'],
-                'Comment_Count': document['Channel_data'][f"Video_ID_{i}"]['Comment_count'],
-                'Duration': document['Channel_data'][f"Video_ID_{i}"]['Duration'],
-                'Thumbnail': document['Channel_data'][f"Video_ID_{i}"]['Thumbnail'],
-                'Caption_Status': document['Channel_data'][f"Video_ID_{i}"]['Caption_status']
-                }
-            list_video.append(video_details_dict)
-        df_video = pd.DataFrame(list_video)
-
-        list_comment = []
-        for i in range(1,len(document['Channel_data'])):
-            comments_section = document['Channel_data'][f"Video_ID_{i}"]['comments']
-            if len(comments_section) != 0:
-                for j in range(1, len(comments_section)+1):
-                    comment_details_dict = {
-                        "Comment_id": document['Channel_data'][f"Video_ID_{i}"]["comments"][f"Comment_ID_{j}"]['Comment_ID'],
-                        "Video_id": document['Channel_data'][f"Video_ID_{i}"]['Video_id'],
-                        "Comment_text": document['Channel_data'][f"Video_ID_{i}"]["comments"][f"Comment_ID_{j}"]['Comment_Text'],
-                        "Comment_author": document['Channel_data'][f"Video_ID_{i}"]["comments"][f"Comment_ID_{j}"]['Comment_Author'],
-                        "Comment_published_date": document['Channel_data'][f"Video_ID_{i}"]["comments"][f"Comment_ID_{j}"]['Comment_PublishedAt']
-                    }
-                list_comment.append(comment_details_dict)
-
-        df_comment = pd.DataFrame(list_comment)
-
-
-        # Create DB on MySQL
-        myconnection = pymysql.connect(
-            host = 'HOST',
-            user='USER-NAME',
-            passwd='YOUR-PASSWORD'
-            )
-        cur = myconnection.cursor()
-        cur.execute("CREATE DATABASE IF NOT EXISTS youtube_sql_db")
-        cur.close()
-        myconnection.close()
-
-        # Connect to SQL database
-        myconnection = pymysql.connect(
-            host = 'HOST',
-            user='USER-NAME',
-            passwd='YOUR-PASSWORD',
-            database = "youtube_sql_db"
-            )
-        cur = myconnection.cursor()
-
-        # Create SQL table
-        cur.execute("""CREATE TABLE IF NOT EXISTS Channel(
-                    Channel_name VARCHAR(255),
-                    Channel_id VARCHAR(255) PRIMARY KEY,
-                    Channel_description TEXT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci,
-                    Subscription_count BIGINT,
-                    Video_count INT,
-                    View_count BIGINT
-                    )""")
-
-        cur.execute("""CREATE TABLE IF NOT EXISTS Playlist(
-                    Playlist_id VARCHAR(255) PRIMARY KEY,
-                    Channel_id VARCHAR(255), 
-                    FOREIGN KEY (Channel_id) REFERENCES Channel(Channel_id)
-                    )""")
-
-        cur.execute("""CREATE TABLE IF NOT EXISTS Video(
-                    Video_Id VARCHAR(255) PRIMARY KEY,
-                    Playlist_Id VARCHAR(255),
-                    Video_Name VARCHAR(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci,
-                    Video_Description TEXT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci,
-                    Published_date VARCHAR(255),
-                    View_Count BIGINT,
-                    Like_Count BIGINT,
-                    Favorite_Count INT,
-                    Comment_Count BIGINT,
-                    Duration INT,
-                    Thumbnail VARCHAR(255),
-                    Caption_Status VARCHAR(255),
-                    FOREIGN KEY (Playlist_Id) REFERENCES Playlist(Playlist_id)
-                    )""")
-
-        cur.execute("""CREATE TABLE IF NOT EXISTS Comment(
-                    Comment_id VARCHAR(255) PRIMARY KEY,
-                    Video_id VARCHAR(255),
-                    Comment_text TEXT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci,
-                    Comment_author VARCHAR(255),
-                    Comment_published_date VARCHAR(255),
-                    FOREIGN KEY (Video_id) REFERENCES Video(Video_Id)
-                    )""")
-
-        # Insert channel, playlist, video and comment dataframe into SQL table
-        channel_insert_sql = "INSERT INTO Channel (Channel_name, Channel_id, Channel_description, Subscription_count, Video_count, View_count) VALUES (%s,%s,%s,%s,%s,%s)"
-        for i in range(0,len(df_channel)):
-            cur.execute(channel_insert_sql,tuple(df_channel.iloc[i]))
-            myconnection.commit()
-
-        playlist_insert_sql = "INSERT INTO Playlist (Playlist_id, Channel_id) VALUES (%s,%s)"
-        for i in range(0,len(df_playlist)):
-            cur.execute(playlist_insert_sql,tuple(df_playlist.iloc[i]))
-            myconnection.commit()
-
-        video_insert_sql = "INSERT INTO Video (Video_Id, Playlist_Id, Video_Name, Video_Description, Published_date, View_Count, Like_Count, Favorite_Count, Comment_Count, Duration, Thumbnail, Caption_Status) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)"
-        for i in range(0,len(df_video)):
-            cur.execute(video_insert_sql,tuple(df_video.iloc[i]))
-            myconnection.commit()
-
-        comment_insert_sql = "INSERT INTO Comment (Comment_id, Video_id, Comment_text, Comment_author, Comment_published_date) VALUES (%s,%s,%s,%s,%s)"
-        for i in range(0,len(df_comment)):
-            cur.execute(comment_insert_sql,tuple(df_comment.iloc[i]))
-            myconnection.commit()
+        load_report = migrate_channel(mydb, channel_ids_by_name[channel_name], **migration_options)
+
+    # Display the load time of each table
+    st.success('The channel data is migrated successfully!', icon="✅")
+    st.dataframe(pd.DataFrame(load_report), hide_index=True)
+    run = TELEMETRY.since(run_start)
+    show_run_summary(run.summary(), run.request_summary())
+
+# Batch migration of several channels in parallel
+with st.expander("Batch migration"):
+    batch_channel_names = st.multiselect("Channels to migrate", options= list(channel_ids_by_name), default= list(channel_ids_by_name))
+    batch_workers = st.slider("Channels migrated in parallel", min_value=1, max_value=16, value=4)
+
+    if st.button("Migrate selected channels to MySQL"):
+        batch_channel_ids = [channel_ids_by_name[name] for name in batch_channel_names]
+        progress = st.progress(0.0, text="Warehousing Data...")
+        run_start = TELEMETRY.snapshot()
+        batch_report = []
+        for done, status in enumerate(iter_migrate_channels(mydb, batch_channel_ids, workers=batch_workers, **migration_options), start=1):
+            status["Channel_name"] = stored_channels[status["Channel_id"]]
+            batch_report.append(status)
+            progress.progress(done / len(batch_channel_ids), text=f"{done}/{len(batch_channel_ids)} channels: {status['Channel_name']} {status['Status'].lower()}")
+
+        failed = [status for status in batch_report if status["Status"] == "Failed"]
+        if failed:
+            st.error(f"{len(failed)} of {len(batch_report)} channel(s) failed to migrate.")
+        else:
+            st.success(f"{len(batch_report)} channel(s) migrated successfully!", icon="✅")
+        st.dataframe(pd.DataFrame(batch_report), hide_index=True)
+        run = TELEMETRY.since(run_start)
+        show_run_summary(run.summary(), run.request_summary(), collapsed=False)
 
 
 # ==================================================       /     CHANNEL DATA ANALYSIS    /      =================================================== #
@@ -468,42 +516,96 @@ st.header(":violet[Channel Data Analysis] :gear:")
 check_channel = st.checkbox("View Uploaded Channel Details")
 
 if check_channel:
-    # Connect to SQL database
-    connection = pymysql.connect(
-        host = 'HOST',
-        user='USER-NAME',
-        passwd='YOUR-PASSWORD',
-        db="youtube_sql_db"
-        )
-    cur = connection.cursor()
-    cur.execute("SELECT Channel_id, Channel_name, Video_count FROM Channel")
-    result = cur.fetchall()
+    # Borrow a pooled SQL connection
+    with mysql_pool.connection() as connection:
+        with connection.cursor() as cur:
+            cur.execute("SELECT Channel_id, Channel_name, Video_count FROM Channel")
+            result = cur.fetchall()
     df_viewChannel = pd.DataFrame(result, columns=["Channel ID", "Channel Name", "Video Count"]).reset_index(drop=True)
     df_viewChannel.index += 1
     st.dataframe(df_viewChannel)
-    connection.close()
 
 
 # ==================================================       /     DATA EXTRACTION SECTION    /      =================================================== #
 # Query the SQL data
 st.subheader(":violet[Extract Channel Data]")
 
-# Connect to SQL database
-try:
-    Query_connection = pymysql.connect(
-        host = 'HOST',
-        user='USER-NAME',
-        passwd='YOUR-PASSWORD',
-        db="youtube_sql_db"
-        )
-    cur = Query_connection.cursor()
-except:
-    print('Database connection could not be established.')
-
 # Initial value for session state
 if "selectbox_enabled" not in st.session_state:
     st.session_state["selectbox_enabled"] = False
 
+def cached_fetchall(cur, question: str, sql: str, params: tuple = None):
+    """
+    Runs a query through the shared result cache. Cached rows are reused until
+    they expire or a migration changes the warehouse version.
+
+    Args:
+        cur (Cursor): Cursor of a pooled SQL connection.
+        question (str): The selected question, part of the cache key.
+        sql (str): Query to run.
+        params (tuple): Query parameters, part of the cache key.
+
+    Returns:
+        list: The result rows.
+    """
+    def load():
+        cur.execute(sql, params)
+        return cur.fetchall()
+    version = duckdb_warehouse.version() if query_engine == "duckdb" else warehouse_version(cur)
+    return query_cache.get_or_load((query_engine, question, sql, params), version, load)
+
+
+def show_paginated_query(question: str, query: dict, columns: list, page_size: int = QUERY_PAGE_SIZE):
+    """
+    Shows one page of a query result with page controls, the total row count and
+    a CSV export. Pages are read with keyset pagination, see warehouse.page_query.
+
+    Args:
+        question (str): The selected question, keys the page state and the cache.
+        query (dict): An entry of PAGINATED_QUERIES.
+        columns (list): Column names of the fields shown.
+        page_size (int): Number of rows per page.
+    """
+    # Order keys of the last row of every page before the current one
+    page_state = st.session_state.setdefault(f"page_state:{question}", {"page_keys": [], "last_key": None})
+
+    total_rows = cached_fetchall(cur, question, count_query(query))[0][0]
+    total_pages = max(1, -(-total_rows // page_size))
+
+    # Page buttons move the keyset before the rerun, so the controls below reflect the new page
+    col1, col2, col3 = st.columns([1, 1, 4])
+    with col1:
+        st.button("Previous page", key=f"previous:{question}", disabled=not page_state["page_keys"],
+                  on_click=lambda: page_state["page_keys"].pop())
+    with col2:
+        st.button("Next page", key=f"next:{question}", disabled=len(page_state["page_keys"]) + 1 >= total_pages,
+                  on_click=lambda: page_state["page_keys"].append(page_state["last_key"]))
+
+    # Rows after the last row of the previous page
+    after_key = page_state["page_keys"][-1] if page_state["page_keys"] else None
+    rows = cached_fetchall(cur, question, *page_query(query, after_key, page_size, placeholder=query_placeholder))
+    if rows:
+        page_state["last_key"] = tuple(rows[-1][len(columns):])
+
+    page = len(page_state["page_keys"])
+    with col3:
+        st.write(f"Page {page + 1} of {total_pages} ({total_rows} rows)")
+
+    df = pd.DataFrame([row[:len(columns)] for row in rows], columns=columns).reset_index(drop=True)
+    df.index += page * page_size + 1
+    st.dataframe(df)
+
+    # Full result streamed to a CSV file on the server
+    if st.button("Export all rows to CSV", key=f"export:{question}"):
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        export_path = os.path.join(EXPORT_DIR, f"question_{question.split('.')[0]}.csv")
+        if query_engine == "duckdb":
+            exported = duckdb_warehouse.export_csv(full_query(query), export_path, columns)
+        else:
+            exported = export_query_csv(Query_connection, full_query(query), export_path, columns)
+        st.success(f"{exported} rows exported to {os.path.abspath(export_path)}")
+
+
 # Function to execute the chosen query
 def execute_query(selected_option: str):
     """
@@ -516,19 +618,10 @@ def execute_query(selected_option: str):
         DataFrame: The extracted info is displayed in table.
     """
     if selected_option == "1. What are the names of all the videos and their corresponding channels?":
-        cur.execute("""SELECT T3.Channel_name, T1.video_Name FROM Video AS T1
-                        INNER JOIN Playlist AS T2 ON T1.Playlist_Id = T2.Playlist_id
-                        INNER JOIN Channel AS T3 ON T2.Channel_id = T3.Channel_id
-                        ORDER BY T3.Channel_name ASC
-                    """)
-        result1 = cur.fetchall()
-        df1 = pd.DataFrame(result1, columns=["Channel Name", "Video Name"]).reset_index(drop=True)
-        df1.index += 1
-        st.dataframe(df1)
+        show_paginated_query(selected_option, paginated_queries[1], ["Channel Name", "Video Name"])
 
     elif selected_option == "2. Which channels have the most number of videos, and how many videos do they have?":
-        cur.execute("SELECT Channel_name, Video_count FROM Channel WHERE Video_count IN (SELECT MAX(Video_count) FROM Channel)")
-        result2 = cur.fetchall()
+        result2 = cached_fetchall(cur, selected_option, analytics_queries[2])
         df2 = pd.DataFrame(result2, columns=["Channel Name", "Total number of Videos"]).reset_index(drop=True)
         df2.index += 1
         st.dataframe(df2)
@@ -536,12 +629,7 @@ def execute_query(selected_option: str):
     elif selected_option == "3. What are the top 10 most viewed videos and their respective channels?":
         col1, col2 = st.columns(2)
         with col1:
-            cur.execute("""SELECT T3.Channel_name, T1.video_Name, T1.View_count FROM Video AS T1
-                            INNER JOIN Playlist AS T2 ON T1.Playlist_Id = T2.Playlist_id
-                            INNER JOIN Channel AS T3 ON T2.Channel_id = T3.Channel_id
-                            ORDER BY T1.View_count DESC LIMIT 10
-                        """)
-            result3 = cur.fetchall()
+            result3 = cached_fetchall(cur, selected_option, analytics_queries[3])
             df3 = pd.DataFrame(result3, columns=["Channel Name", "Video Name", "Views"]).reset_index(drop=True)
             df3.index += 1
             st.dataframe(df3)
@@ -555,28 +643,12 @@ def execute_query(selected_option: str):
             st.plotly_chart(fig_topvc, use_container_width=True)
 
     elif selected_option == "4. How many comments were made on each video, and what are their corresponding channel names?":
-        cur.execute("""SELECT T3.Channel_name, T1.Video_Name, T1.Comment_Count FROM Video AS T1
-                        INNER JOIN Playlist AS T2 ON T1.Playlist_Id = T2.Playlist_id
-                        INNER JOIN Channel AS T3 ON T2.Channel_id = T3.Channel_id 
-                        ORDER BY T3.Channel_name
-                    """)
-        result4 = cur.fetchall()
-        df4 = pd.DataFrame(result4, columns=["Channel Name", "Video Name", "Comment Count"]).reset_index(drop=True)
-        df4.index += 1
-        st.dataframe(df4)
+        show_paginated_query(selected_option, paginated_queries[4], ["Channel Name", "Video Name", "Comment Count"])
 
     elif selected_option == "5. Which videos have the highest number of likes, and what are their corresponding channel names?":
         col1, col2 = st.columns(2)
         with col1:
-            cur.execute("""SELECT T3.Channel_name, T1.video_Name, T1.Like_Count FROM Video AS T1
-                            INNER JOIN Playlist AS T2 ON T1.Playlist_Id = T2.Playlist_id
-                            INNER JOIN Channel AS T3 ON T2.Channel_id = T3.Channel_id
-                            WHERE T1.Like_Count = (SELECT MAX(Like_Count) FROM Video AS V2 
-                                                    INNER JOIN Playlist AS T2 ON V2.Playlist_Id = T2.Playlist_id 
-                                                    WHERE T2.Channel_id = T3.Channel_id)
-                            ORDER BY T1.Like_Count DESC
-                        """)
-            result5 = cur.fetchall()
+            result5 = cached_fetchall(cur, selected_option, analytics_queries[5])
             df5 = pd.DataFrame(result5, columns=["Channel Name", "Video Name", "Like Count"]).reset_index(drop=True)
             df5.index += 1
             st.dataframe(df5)
@@ -590,17 +662,12 @@ def execute_query(selected_option: str):
             st.plotly_chart(fig_vc, use_container_width=True) 
 
     elif selected_option == "6. What is the total number of likes for each video, and what are their corresponding video names?":
-        cur.execute("SELECT Video_Name, Like_Count FROM Video ORDER BY Video_Name")
-        result6 = cur.fetchall()
-        df6 = pd.DataFrame(result6, columns=["Video Name", "Like Count"]).reset_index(drop=True)
-        df6.index += 1
-        st.dataframe(df6)
+        show_paginated_query(selected_option, paginated_queries[6], ["Video Name", "Like Count"])
 
     elif selected_option == "7. What is the total number of views for each channel, and what are their corresponding channel names?":
         col1, col2 = st.columns(2)
         with col1:
-            cur.execute("SELECT Channel_name, View_count FROM Channel")
-            result7 = cur.fetchall()
+            result7 = cached_fetchall(cur, selected_option, analytics_queries[7])
             df7 = pd.DataFrame(result7, columns=["Channel Name", "Total number of views"]).reset_index(drop=True)
             df7.index += 1
             st.dataframe(df7)
@@ -614,12 +681,7 @@ def execute_query(selected_option: str):
             st.plotly_chart(fig_vc, use_container_width=True) 
 
     elif selected_option == "8. What are the names of all the channels that have published videos in the year 2022?":
-        cur.execute("""SELECT T3.Channel_name as Channel_names, T1.video_Name, T1.Published_date FROM Video AS T1
-                        INNER JOIN Playlist AS T2 ON T1.Playlist_Id = T2.Playlist_id
-                        INNER JOIN Channel AS T3 ON T2.Channel_id = T3.Channel_id
-                        WHERE YEAR(T1.Published_date) = "2022"
-                    """)
-        result8 = cur.fetchall()
+        result8 = cached_fetchall(cur, selected_option, analytics_queries[8])
         df8 = pd.DataFrame(result8, columns=["Channel Name", "Video Name", "Published Date"]).reset_index(drop=True)
         df8.index += 1
         st.dataframe(df8)
@@ -627,13 +689,7 @@ def execute_query(selected_option: str):
     elif selected_option == "9. What is the average duration of all videos in each channel, and what are their corresponding channel names?":
         col1, col2 = st.columns(2)
         with col1:
-            cur.execute("""SELECT T3.Channel_name, TIME_FORMAT(SEC_TO_TIME(AVG(T1.Duration)), "%T") AS Duration FROM Video AS T1
-                            INNER JOIN Playlist AS T2 ON T1.Playlist_Id = T2.Playlist_id
-                            INNER JOIN Channel AS T3 ON T2.Channel_id = T3.Channel_id
-                            GROUP BY T3.Channel_id
-                            ORDER BY Duration
-                        """)
-            result9 = cur.fetchall()
+            result9 = cached_fetchall(cur, selected_option, analytics_queries[9])
             df9 = pd.DataFrame(result9, columns=["Channel Name", "Average Duration of Videos"]).reset_index(drop=True)
             df9.index += 1
             st.dataframe(df9)
@@ -649,15 +705,7 @@ def execute_query(selected_option: str):
     elif selected_option == "10. Which videos have the highest number of comments, and what are their corresponding channel names?":
         col1, col2 = st.columns(2)
         with col1:
-            cur.execute("""SELECT T3.Channel_name, T1.video_Name, T1.Comment_Count FROM Video AS T1
-                            INNER JOIN Playlist AS T2 ON T1.Playlist_Id = T2.Playlist_id
-                            INNER JOIN Channel AS T3 ON T2.Channel_id = T3.Channel_id
-                            WHERE T1.Comment_Count = (SELECT MAX(Comment_Count) FROM Video AS V2 
-                                                        INNER JOIN Playlist AS T2 ON V2.Playlist_Id = T2.Playlist_id 
-                                                        WHERE T2.Channel_id = T3.Channel_id)
-                            ORDER BY T1.Comment_Count DESC 
-                        """)
-            result10 = cur.fetchall()
+            result10 = cached_fetchall(cur, selected_option, analytics_queries[10])
             df10 = pd.DataFrame(result10, columns=["Channel Name", "Video Name", "Comment Count"]).reset_index(drop=True)
             df10.index += 1
             st.dataframe(df10)
@@ -687,9 +735,33 @@ selected_option = st.selectbox(
 
 st.write("Question: ", selected_option)
 
+# Engine answering the question, with its version of the queries
+query_engine = QUERY_ENGINE_OPTIONS[st.radio("Query engine", options= list(QUERY_ENGINE_OPTIONS), horizontal=True)]
+if query_engine == "duckdb":
+    analytics_queries, paginated_queries, query_placeholder = DUCKDB_ANALYTICS_QUERIES, DUCKDB_PAGINATED_QUERIES, "?"
+else:
+    analytics_queries, paginated_queries, query_placeholder = ANALYTICS_QUERIES, PAGINATED_QUERIES, "%s"
+
 if selected_option:
     st.session_state["selectbox_enabled"] = True
-    execute_query(selected_option)
 
-# Close MySQL connection
-Query_connection.close()
+    if query_engine == "duckdb":
+        if not duckdb_available() or not parquet_available():
+            st.error("The DuckDB engine needs the duckdb and pyarrow packages.")
+        elif not get_duckdb_warehouse().has_data():
+            st.warning(f"No Parquet files in {os.path.abspath(PARQUET_DIR)} yet, migrate a channel first.")
+        else:
+            # Each rerun queries through a cursor of its own
+            duckdb_warehouse = get_duckdb_warehouse()
+            with duckdb_warehouse.cursor() as cur:
+                execute_query(selected_option)
+    else:
+        # Borrow a pooled SQL connection for the query
+        with mysql_pool.connection() as Query_connection:
+            with Query_connection.cursor() as cur:
+                execute_query(selected_option)
+
+# Query cache statistics
+cache_stats = query_cache.stats()
+st.caption(f"Query cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+           f"{cache_stats['invalidations']} invalidations, {cache_stats['entries']} cached results")